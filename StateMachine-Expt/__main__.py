@@ -0,0 +1,7 @@
+"""Entry point for ``python StateMachine-Expt <command>``; see ``cli.py``."""
+
+import sys
+
+from cli import main
+
+sys.exit(main())
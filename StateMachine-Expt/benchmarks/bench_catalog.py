@@ -0,0 +1,157 @@
+"""
+Benchmark: ProductCatalog lookups, affordability queries and repricing.
+
+Builds a seeded catalog of many SKUs, applies random price changes while
+checking every ``affordable`` answer against a linear scan, and checks that
+stock, journal and ledger store catalog items (including one added after the
+inventory) by their catalog index.  Then times slot
+lookups, affordability queries (bisect vs scan) and single-SKU repricing
+(index update vs re-sorting the whole catalog).
+
+    python StateMachine-Expt/benchmarks/bench_catalog.py [--skus N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+from event_sinks import NULL_SINK  # noqa: E402
+from product_catalog import CatalogItem, ProductCatalog  # noqa: E402
+from state_pattern_example import VendingMachine  # noqa: E402
+from vending_engine import EV_DISPENSE, EV_INSERT, EV_RETURN, EV_SELECT  # noqa: E402
+from vending_inventory import FleetInventory  # noqa: E402
+from vending_journal import VendingJournal, recover  # noqa: E402
+from vending_ledger import MoneyLedger  # noqa: E402
+
+
+def build_catalog(rng: random.Random, skus: int) -> ProductCatalog:
+    catalog = ProductCatalog()
+    for i in range(skus):
+        sku = f"SKU{i:06d}"
+        catalog.add(sku, CatalogItem(sku, f"Item {i}", rng.randrange(50, 500, 5)), f"{chr(65 + i % 26)}{i // 26 + 1}")
+    return catalog
+
+
+def scan_affordable(catalog: ProductCatalog, balance: int) -> list:
+    return sorted((p.price_cents, sku) for sku, p in catalog if p.price_cents <= balance)
+
+
+def check_index(seed: int, skus: int = 2_000, updates: int = 2_000) -> None:
+    """Raise AssertionError if the price index disagrees with a scan."""
+    rng = random.Random(seed)
+    catalog = build_catalog(rng, skus)
+    names = [sku for sku, _ in catalog]
+    for _ in range(updates):
+        sku = rng.choice(names)
+        catalog.set_price(sku, rng.randrange(50, 500, 5))
+        if rng.random() < 0.05:
+            balance = rng.randrange(0, 600, 5)
+            assert catalog.affordable(balance) == scan_affordable(catalog, balance), f"affordable({balance})"
+
+    order = [(slot[0], int(slot[1:])) for slot, _ in catalog.slots()]
+    assert order == sorted(order), "slots() should sort by row, then slot number"
+
+    machine = VendingMachine(sink=NULL_SINK, catalog=catalog)
+    slot, product = catalog.slots()[0]
+    machine.insert_coin(5.00)
+    machine.select_product(slot)
+    assert machine.get_selected_product() is product, "slot lookup through the state handler"
+
+
+def check_stores(seed: int, events: int = 5_000) -> None:
+    """Raise AssertionError if stock, journal or ledger mishandle catalog items."""
+    rng = random.Random(seed)
+    catalog = build_catalog(rng, 20)
+    inventory = FleetInventory(2, capacity=3, catalog=catalog)
+    late = catalog.add("LATE", CatalogItem("LATE", "Late item", 100), "Z1")
+    slots = [slot for slot, _ in catalog.slots()]
+    script = []
+    for _ in range(events):
+        roll = rng.random()
+        if roll < 0.4:
+            script.append((EV_INSERT, rng.choice((0.25, 1.00, 2.00))))
+        elif roll < 0.7:
+            script.append((EV_SELECT, rng.choice(slots)))
+        elif roll < 0.9:
+            script.append((EV_DISPENSE, None))
+        else:
+            script.append((EV_RETURN, None))
+
+    ledger = MoneyLedger()
+    booked = VendingMachine(sink=NULL_SINK, stock=inventory.machine(0), catalog=catalog)
+    journaled = VendingMachine(sink=NULL_SINK, stock=inventory.machine(1), catalog=catalog)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.journal")
+        with VendingJournal(path, snapshot_interval=100) as journal:
+            for event, arg in script:
+                ledger.record(0, booked, event, arg)
+                journal.record(journaled, event, arg)
+        recovered = recover(path, sink=NULL_SINK, stock=inventory.machine(1), catalog=catalog)
+        assert recovered.snapshot() == journaled.snapshot(), "recovery with a custom catalog"
+
+    taken = (inventory.capacity - inventory.levels[0].astype(int)).tolist()
+    taken[catalog.index(late)] = 0  # its column started empty
+    sold = dict(enumerate(ledger.settle().units_sold.tolist()))
+    assert sum(taken), "expected some sales"
+    assert all(sold.get(i, 0) == n for i, n in enumerate(taken)), "ledger units vs stock taken"
+
+
+def time_calls(fn, args) -> float:
+    """Microseconds per call of fn(arg)."""
+    start = time.perf_counter()
+    for arg in args:
+        fn(arg)
+    return (time.perf_counter() - start) / len(args) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--skus", type=int, default=10_000)
+    parser.add_argument("--calls", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    check_index(args.seed)
+    check_stores(args.seed)
+
+    rng = random.Random(args.seed)
+    catalog = build_catalog(rng, args.skus)
+    slots = [slot for slot, _ in catalog.slots()]
+    skus = [sku for sku, _ in catalog]
+    balances = [rng.randrange(0, 600, 5) for _ in range(args.calls)]
+    repricing = [(rng.choice(skus), rng.randrange(50, 500, 5)) for _ in range(args.calls)]
+
+    def resort(change):
+        sku, price = change
+        catalog.get(sku).price_cents = price
+        return sorted((p.price_cents, s) for s, p in catalog)
+
+    lookup = time_calls(catalog.get, [rng.choice(slots) for _ in range(args.calls)])
+    count = time_calls(catalog.count_affordable, balances)
+    bisect_list = time_calls(catalog.affordable, balances)
+    scan = time_calls(lambda b: scan_affordable(catalog, b), balances[: max(1, args.calls // 20)])
+    update = time_calls(lambda change: catalog.set_price(*change), repricing)
+    rebuild = time_calls(resort, repricing[: max(1, args.calls // 20)])
+
+    print(f"skus:                    {args.skus:,}")
+    print(f"slot lookup:             {lookup:>10.2f} us")
+    print(f"count_affordable:        {count:>10.2f} us")
+    print(f"affordable (bisect):     {bisect_list:>10.2f} us")
+    print(f"affordable (scan):       {scan:>10.2f} us")
+    print(f"set_price:               {update:>10.2f} us")
+    print(f"reprice + full re-sort:  {rebuild:>10.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: change-making under coin inventory limits.
+
+First checks ``make_change`` against an exhaustive search on random small
+stocks, then times three cases: the cached unlimited-coin table when the
+stock covers the optimum, the bounded table reused across calls, and
+rebuilding the bounded table after every stock change.
+
+    python StateMachine-Expt/benchmarks/bench_change.py [--calls N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import random
+import sys
+import time
+from pathlib import Path
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+from vending_change import (  # noqa: E402
+    TABLE_SIZE,
+    US_DENOMINATIONS,
+    CoinInventory,
+    bounded_change_table,
+    make_change,
+)
+
+DENOMINATION_SETS = (US_DENOMINATIONS, (1, 3, 4), (5, 20, 25, 50), (10, 25, 60))
+
+
+def brute_force(amount, denominations, stock):
+    """Fewest coins for ``amount`` by trying every combination, or None."""
+    best = None
+    for counts in itertools.product(*(range(s + 1) for s in stock)):
+        if sum(c * d for c, d in zip(counts, denominations)) == amount:
+            if best is None or sum(counts) < best:
+                best = sum(counts)
+    return best
+
+
+def check_optimal(seed: int, trials: int = 300) -> None:
+    """Raise AssertionError if make_change is not minimal within the stock."""
+    rng = random.Random(seed)
+    for _ in range(trials):
+        denominations = rng.choice(DENOMINATION_SETS)
+        stock = [rng.randint(0, 4) for _ in denominations]
+        amount = rng.randrange(0, 200, min(denominations))
+        counts = make_change(amount, denominations, stock)
+        expected = brute_force(amount, denominations, stock)
+        if counts is None:
+            assert expected is None, f"{amount} from {stock}: missed a {expected}-coin solution"
+            continue
+        assert all(c <= s for c, s in zip(counts, stock)), f"{amount}: {counts} exceeds {stock}"
+        assert sum(c * d for c, d in zip(counts, denominations)) == amount, f"{amount}: {counts} is wrong"
+        assert sum(counts) == expected, f"{amount} from {stock}: {sum(counts)} coins, best is {expected}"
+
+
+def time_calls(fn, amounts) -> float:
+    """Microseconds per call of fn(amount)."""
+    start = time.perf_counter()
+    for amount in amounts:
+        fn(amount)
+    return (time.perf_counter() - start) / len(amounts) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    check_optimal(args.seed)
+
+    rng = random.Random(args.seed)
+    amounts = [rng.randrange(0, 200, 5) for _ in range(args.calls)]
+
+    full = CoinInventory({5: 50, 10: 50, 25: 50, 100: 20})
+    # No quarters: the unlimited optimum rarely fits, so the bounded table is used.
+    short = CoinInventory({5: 40, 10: 40, 25: 0, 100: 20})
+    rebuilds = amounts[: max(1, args.calls // 100)]
+
+    def rebuild(amount):
+        table = bounded_change_table(short.denominations, short.stock, TABLE_SIZE)
+        return table, amount
+
+    print(f"calls:                  {args.calls:,}")
+    print(f"stock covers optimum:   {time_calls(full.change_for, amounts):>8.2f} us/call")
+    print(f"bounded table cached:   {time_calls(short.change_for, amounts):>8.2f} us/call")
+    print(f"bounded table rebuilt:  {time_calls(rebuild, rebuilds):>8.2f} us/call")
+    print(f"exact change only:      {short.exact_change_only()} (no quarters), {full.exact_change_only()} (full)")
+
+
+if __name__ == "__main__":
+    main()
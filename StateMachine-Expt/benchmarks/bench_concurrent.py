@@ -0,0 +1,101 @@
+"""
+Benchmark: ConcurrentVendingFleet throughput and lost-update check.
+
+Each thread runs a seeded random event stream against random machines of a
+shared fleet and tallies, from the ``(before, after)`` snapshots, how much
+money each event took in or paid out.  Dispenses go through
+``compare_and_transition``.  After every run, money taken in minus money paid
+out must equal the balance the fleet still holds; a lost or doubled update
+breaks that.  Runs with striped locks are compared with a single global lock
+(``--stripes 1``) at each thread count.  Threads only scale on a free-threaded
+(no-GIL) build, and the report says which build is running.
+
+    python StateMachine-Expt/benchmarks/bench_concurrent.py [--threads 1,2,4,8] [--events N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import sysconfig
+import threading
+import time
+from pathlib import Path
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+from vending_concurrent import ConcurrentVendingFleet  # noqa: E402
+from vending_engine import EV_DISPENSE, random_events  # noqa: E402
+
+
+def run(threads: int, stripes: int, machines: int, events: int, seed: int) -> float:
+    """Events/sec for one configuration; raises AssertionError on lost updates."""
+    fleet = ConcurrentVendingFleet(machines, stripes=stripes)
+    per_thread = events // threads
+    streams = []
+    for i in range(threads):
+        rng = random.Random(seed * 1_000 + i)
+        streams.append([(rng.randrange(machines), event, arg) for event, arg in random_events(rng, per_thread)])
+    totals = [[0, 0] for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def drive(index: int) -> None:
+        tally = totals[index]
+        apply = fleet.apply
+        cas = fleet.compare_and_transition
+        barrier.wait()
+        for machine_id, event, arg in streams[index]:
+            if event == EV_DISPENSE:
+                applied, before, after = cas(machine_id, "Product Selected", event)
+                if not applied:
+                    continue
+            else:
+                before, after = apply(machine_id, event, arg)
+            moved = after[1] - before[1]
+            if moved > 0:
+                tally[0] += moved
+            else:
+                tally[1] -= moved
+
+    workers = [threading.Thread(target=drive, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    credited = sum(t[0] for t in totals)
+    paid = sum(t[1] for t in totals)
+    held = fleet.total_balance()
+    assert credited - paid == held, f"lost updates: in {credited} - out {paid} != held {held}"
+    return per_thread * threads / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", default="1,2,4,8")
+    parser.add_argument("--events", type=int, default=400_000)
+    parser.add_argument("--machines", type=int, default=1_000)
+    parser.add_argument("--stripes", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    free_threaded = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    print(f"python {sys.version.split()[0]}, free-threaded build: {free_threaded}, GIL enabled: {gil}")
+    print(f"{'threads':>7} {f'{args.stripes} stripes':>14} {'global lock':>14}   (events/sec)")
+    for threads in (int(n) for n in args.threads.split(",")):
+        striped = run(threads, args.stripes, args.machines, args.events, args.seed)
+        single = run(threads, 1, args.machines, args.events, args.seed)
+        print(f"{threads:>7} {striped:>14,.0f} {single:>14,.0f}")
+    print("no lost updates in any run")
+
+
+if __name__ == "__main__":
+    main()
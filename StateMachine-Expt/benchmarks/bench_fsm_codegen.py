@@ -0,0 +1,123 @@
+"""
+Benchmark: generated FSM engines vs hand-written class dispatch.
+
+Checks the engine generated from ``VENDING_SPEC`` against ``VendingMachine``
+event by event, then times the class-based path, the compiled table and the
+generated engine on the same seeded stream, plus ``SimpleTrafficLight``
+against its generated engine.  Also reports how long generating the module
+takes compared with loading it from the on-disk cache.
+
+    python StateMachine-Expt/benchmarks/bench_fsm_codegen.py [--events N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+import fsm_spec  # noqa: E402
+from event_sinks import NULL_SINK  # noqa: E402
+from fsm_spec import SIMPLE_TRAFFIC_LIGHT_SPEC, VENDING_SPEC, load_engine  # noqa: E402
+from simple_traffic_light import SimpleTrafficLight  # noqa: E402
+from state_pattern_example import VendingMachine  # noqa: E402
+from vending_engine import CompiledVendingMachine, apply_to_machine, random_events  # noqa: E402
+
+
+def check_equivalence(engine_class, events) -> None:
+    machine = VendingMachine(sink=NULL_SINK)
+    engine = engine_class()
+    for i, (event, arg) in enumerate(events):
+        apply_to_machine(machine, event, arg)
+        apply_to_machine(engine, event, arg)
+        observed = (machine.get_current_state(), machine.get_balance(), machine.get_selected_product())
+        expected = (engine.get_current_state(), engine.balance / 100, engine.selected)
+        assert observed == expected, f"event {i}: class path {observed} != generated {expected}"
+
+
+def bound_calls(machine, events):
+    """Pre-resolve each event to a bound method so only dispatch is timed."""
+    methods = (machine.insert_coin, machine.select_product, machine.dispense_product,
+               machine.return_change, machine.set_out_of_order, machine.set_operational)
+    return [(methods[event], arg) for event, arg in events]
+
+
+def time_calls(calls) -> float:
+    start = time.perf_counter()
+    for method, arg in calls:
+        if arg is None:
+            method()
+        else:
+            method(arg)
+    return time.perf_counter() - start
+
+
+def time_generation() -> tuple:
+    with tempfile.TemporaryDirectory() as tmp:
+        fsm_spec._loaded.clear()
+        start = time.perf_counter()
+        load_engine(VENDING_SPEC, cache_dir=tmp)
+        cold = time.perf_counter() - start
+        fsm_spec._loaded.clear()
+        start = time.perf_counter()
+        load_engine(VENDING_SPEC, cache_dir=tmp)
+        cached = time.perf_counter() - start
+    return cold, cached
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=500_000)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    cold, cached = time_generation()
+    vending_engine_class = load_engine(VENDING_SPEC)
+    light_engine_class = load_engine(SIMPLE_TRAFFIC_LIGHT_SPEC)
+
+    events = random_events(random.Random(args.seed), args.events)
+    check_equivalence(vending_engine_class, events[:50_000])
+
+    class_seconds = time_calls(bound_calls(VendingMachine(sink=NULL_SINK), events))
+    table = CompiledVendingMachine()
+    start = time.perf_counter()
+    fire = table.fire
+    for event, arg in events:
+        fire(event, arg)
+    table_seconds = time.perf_counter() - start
+    generated_seconds = time_calls(bound_calls(vending_engine_class(), events))
+
+    steps = args.events
+    light = SimpleTrafficLight()
+    start = time.perf_counter()
+    next_light = light.next_light
+    for _ in range(steps):
+        next_light()
+    light_class_seconds = time.perf_counter() - start
+    generated_light = light_engine_class()
+    start = time.perf_counter()
+    next_light = generated_light.next_light
+    for _ in range(steps):
+        next_light()
+    light_generated_seconds = time.perf_counter() - start
+    assert light.get_status()["color"] == generated_light.get_current_state()
+
+    n = len(events)
+    print(f"generate module:      {cold * 1000:>10.2f} ms (cached load {cached * 1000:.2f} ms)")
+    print(f"vending class path:   {n / class_seconds:>12,.0f} events/sec")
+    print(f"vending table:        {n / table_seconds:>12,.0f} events/sec")
+    print(f"vending generated:    {n / generated_seconds:>12,.0f} events/sec")
+    print(f"light class path:     {steps / light_class_seconds:>12,.0f} steps/sec")
+    print(f"light generated:      {steps / light_generated_seconds:>12,.0f} steps/sec")
+
+
+if __name__ == "__main__":
+    main()
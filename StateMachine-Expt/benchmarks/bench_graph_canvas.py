@@ -0,0 +1,73 @@
+"""
+Benchmark: StateGraphCanvas active-state updates on a large graph.
+
+Builds a graph of N nodes (a ring plus a chord from every node), then times
+``set_active`` (incremental outline update) against a full ``redraw()`` per
+update.  Needs a display; on headless machines run it under a virtual X
+server, e.g. ``xvfb-run python ...``.
+
+    python StateMachine-Expt/benchmarks/bench_graph_canvas.py [--nodes N] [--updates N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+import tkinter as tk
+from pathlib import Path
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+from ui.tk_state_graph import GraphEdge, GraphNode, StateGraphCanvas  # noqa: E402
+
+
+def build_graph(count: int):
+    nodes = [GraphNode(f"S{i}", f"S{i}") for i in range(count)]
+    edges = [GraphEdge(f"S{i}", f"S{(i + 1) % count}", "next") for i in range(count)]
+    edges += [GraphEdge(f"S{i}", f"S{(i * 7 + 3) % count}") for i in range(count)]
+    return nodes, edges
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=500)
+    parser.add_argument("--updates", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    canvas = StateGraphCanvas(root, width=1200, height=1200, node_radius=8)
+    canvas.pack()
+    canvas.set_graph(*build_graph(args.nodes))
+    root.update()
+
+    rng = random.Random(args.seed)
+    keys = [f"S{rng.randrange(args.nodes)}" for _ in range(args.updates)]
+
+    start = time.perf_counter()
+    for key in keys:
+        canvas.set_active(key)
+    root.update()
+    incremental = time.perf_counter() - start
+
+    full_updates = max(1, args.updates // 100)
+    start = time.perf_counter()
+    for key in keys[:full_updates]:
+        canvas._active_key = key
+        canvas.redraw()
+    root.update()
+    full = time.perf_counter() - start
+
+    root.destroy()
+    print(f"nodes:         {args.nodes:,} ({2 * args.nodes:,} edges)")
+    print(f"set_active:    {args.updates / incremental:>12,.0f} updates/sec")
+    print(f"full redraw:   {full_updates / full:>12,.0f} updates/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark: headless SVG/PNG export of a vending-machine state trace.
+
+First checks the renderers on the vending graph:
+- each PNG decodes back to its pixels;
+- a highlight frame differs from the plain frame only on the active node's
+  outline;
+- each SVG frame is well-formed and highlights exactly the active node.
+
+It then runs a seeded random trace of ``--events`` events through a
+VendingMachine, collects the active state after each event, and times:
+
+- writing ``--frames`` SVG and PNG frame files, with the static layer cached;
+- rendering frames from scratch (a new renderer per frame), for comparison;
+- one animated SVG covering the whole trace.
+
+No display is needed.
+
+    python StateMachine-Expt/benchmarks/bench_graph_render.py [--events 100000] [--frames 10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from xml.dom import minidom
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+from event_sinks import NULL_SINK  # noqa: E402
+from fsm_spec import VENDING_SPEC, graph_edges  # noqa: E402
+from state_pattern_example import VendingMachine  # noqa: E402
+from ui.graph_layout import ACTIVE_OUTLINE_WIDTH, GraphEdge, GraphNode, layout_graph  # noqa: E402
+from ui.graph_render import PngGraphRenderer, SvgGraphRenderer, write_frames  # noqa: E402
+from vending_engine import apply_to_machine, random_events  # noqa: E402
+
+
+def vending_layout():
+    nodes = [GraphNode(state, state) for state in VENDING_SPEC["states"]]
+    edges = [GraphEdge(src, dst, label) for src, dst, label in graph_edges(VENDING_SPEC)]
+    return layout_graph(nodes, edges, 620, 300)
+
+
+def state_trace(seed: int, events: int) -> list:
+    machine = VendingMachine(sink=NULL_SINK)
+    trace = []
+    for event, arg in random_events(random.Random(seed), events):
+        apply_to_machine(machine, event, arg)
+        trace.append(machine.get_current_state())
+    return trace
+
+
+def decode_png(data: bytes, width: int) -> bytes:
+    """Pixels of a PNG written by encode_png (one IDAT, filter 0 on every row)."""
+    start = data.index(b"IDAT") + 4
+    length = int.from_bytes(data[start - 8:start - 4], "big")
+    raw = zlib.decompress(data[start:start + length])
+    return b"".join(raw[i + 1:i + 1 + width] for i in range(0, len(raw), width + 1))
+
+
+def check_render() -> None:
+    """Raise AssertionError if a frame is wrong."""
+    layout = vending_layout()
+    png = PngGraphRenderer(layout)
+    svg = SvgGraphRenderer(layout)
+    plain = png.pixels(None)
+    assert decode_png(png.render(None), layout.width) == plain, "PNG round trip"
+
+    for node in layout.nodes:
+        pixels = png.pixels(node.key)
+        assert decode_png(png.render(node.key), layout.width) == pixels, f"PNG round trip for {node.key}"
+        x, y = node.center
+        reach = layout.node_radius + ACTIVE_OUTLINE_WIDTH
+        for index in (i for i in range(len(pixels)) if pixels[i] != plain[i]):
+            px, py = index % layout.width, index // layout.width
+            assert abs(px - x) <= reach and abs(py - y) <= reach, f"{node.key} highlight strays to {(px, py)}"
+
+        document = minidom.parseString(svg.render(node.key))
+        active = [c for c in document.getElementsByTagName("circle")
+                  if c.getAttribute("stroke-width") == str(ACTIVE_OUTLINE_WIDTH)]
+        assert len(active) == 1, f"{node.key}: {len(active)} highlighted circles"
+        assert (active[0].getAttribute("cx"), active[0].getAttribute("cy")) == (str(x), str(y)), node.key
+
+    minidom.parseString(svg.animate(state_trace(1, 500)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--frames", type=int, default=10_000, help="frame files to write per format")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    check_render()
+
+    layout = vending_layout()
+    trace = state_trace(args.seed, args.events)
+    frames = trace[: args.frames]
+    scratch = trace[: max(1, args.frames // 100)]
+    directory = tempfile.mkdtemp()
+    try:
+        print(f"trace: {len(trace):,} events, {len(frames):,} frames written per format\n")
+        print(f"{'format':<8} {'cached frames/sec':>18} {'from scratch':>14}")
+        for name, renderer_class in (("svg", SvgGraphRenderer), ("png", PngGraphRenderer)):
+            start = time.perf_counter()
+            write_frames(renderer_class(layout), frames, str(Path(directory) / name))
+            cached = len(frames) / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for key in scratch:
+                renderer_class(layout).frame(key)
+            fresh = len(scratch) / (time.perf_counter() - start)
+            print(f"{name:<8} {cached:>18,.0f} {fresh:>14,.0f}")
+    finally:
+        shutil.rmtree(directory)
+
+    start = time.perf_counter()
+    document = SvgGraphRenderer(layout).animate(trace)
+    elapsed = time.perf_counter() - start
+    print(f"\nanimated SVG of {len(trace):,} events: {len(document) / 1024:,.0f} KiB in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: transaction log ingest throughput and memory.
+
+Writes seeded CSV and JSONL logs, ingests each with the compiled engine and
+with ``VendingMachine`` objects, and reports MB/s and events/sec.  Peak
+traced memory is measured for a log a quarter of the size and for the full
+log; with chunked parsing the two should be close (the difference is the
+per-machine state, not the log).
+
+    python StateMachine-Expt/benchmarks/bench_ingest.py [--events N] [--machines N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+from vending_ingest import ingest, write_sample_log  # noqa: E402
+
+
+def peak_kib(path: str) -> float:
+    tracemalloc.start()
+    try:
+        ingest(path)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=2_000_000)
+    parser.add_argument("--machines", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    print(f"{'log':<7} {'engine':<9} {'MB':>7} {'MB/s':>7} {'events/sec':>12} {'anomalies':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ("csv", "jsonl"):
+            path = os.path.join(tmp, f"log.{fmt}")
+            write_sample_log(path, args.machines, args.events, args.seed)
+            reports = {engine: ingest(path, engine=engine) for engine in ("compiled", "objects")}
+            assert reports["compiled"].final_states() == reports["objects"].final_states()
+            for engine, report in reports.items():
+                print(f"{fmt:<7} {engine:<9} {report.bytes / 1e6:>7.1f} {report.mb_per_sec():>7.1f} "
+                      f"{report.events / report.seconds:>12,.0f} {sum(report.anomaly_counts.values()):>10,}")
+
+        small = os.path.join(tmp, "small.csv")
+        large = os.path.join(tmp, "large.csv")
+        write_sample_log(small, args.machines, args.events // 4, args.seed)
+        write_sample_log(large, args.machines, args.events, args.seed)
+        print(f"\npeak traced memory: {peak_kib(small):,.0f} KiB for {args.events // 4:,} events, "
+              f"{peak_kib(large):,.0f} KiB for {args.events:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Benchmark: product inventory and the fleet restock index.
+
+First replays a seeded batch with small stock (so products sell out) through
+``VendingFleet.apply(..., inventory=...)`` and through ``VendingMachine``
+objects sharing a second inventory, and checks that machines and stock
+agree, and that taking from an empty slot is refused by both ``take`` and
+``take_many`` without changing the stock.  Then it runs a large fleet and
+compares restock queries answered from the bucketed index with full scans of
+the stock array.
+
+    python StateMachine-Expt/benchmarks/bench_inventory.py [--machines N] [--events N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+from event_sinks import NULL_SINK  # noqa: E402
+from state_pattern_example import VendingMachine  # noqa: E402
+from vending_engine import EV_INSERT, EV_SELECT, STATE_NAMES, apply_to_machine  # noqa: E402
+from vending_fleet import PRODUCTS, VendingFleet, random_fleet_events  # noqa: E402
+from vending_inventory import FleetInventory  # noqa: E402
+
+
+def check_against_machines(seed: int, machines: int = 200, events: int = 20_000) -> None:
+    """Raise AssertionError if the fleet and VendingMachine paths disagree."""
+    rng = np.random.default_rng(seed)
+    ids, evs, args = random_fleet_events(rng, machines, events)
+
+    fleet = VendingFleet(machines)
+    fleet_stock = FleetInventory(machines, capacity=3)
+    fleet.apply(ids, evs, args, inventory=fleet_stock)
+
+    object_stock = FleetInventory(machines, capacity=3)
+    reference = [VendingMachine(sink=NULL_SINK, stock=object_stock.machine(i)) for i in range(machines)]
+    for machine_id, event, arg in zip(ids.tolist(), evs.tolist(), args.tolist()):
+        if event == EV_INSERT:
+            value = arg / 100
+        elif event == EV_SELECT:
+            value = PRODUCTS[arg]
+        else:
+            value = None
+        apply_to_machine(reference[machine_id], event, value)
+
+    for machine_id, machine in enumerate(reference):
+        selected = machine.get_selected_product()
+        expected = (machine.get_current_state(), machine.get_balance_cents(),
+                    PRODUCTS.index(selected) if selected else -1)
+        observed = (STATE_NAMES[fleet.state[machine_id]], int(fleet.balance[machine_id]),
+                    int(fleet.selected[machine_id]))
+        assert observed == expected, f"machine {machine_id}: fleet {observed} != reference {expected}"
+    assert np.array_equal(fleet_stock.levels, object_stock.levels), "stock levels differ"
+    assert fleet_stock.below(1), "seeded run should sell something out"
+    check_index(fleet_stock)
+    check_index(object_stock)
+
+
+def check_index(inventory: FleetInventory) -> None:
+    """Raise AssertionError if the bucketed index disagrees with a scan."""
+    lowest = inventory.levels.min(axis=1)
+    totals = inventory.levels.sum(axis=1)
+    for level in range(inventory.capacity + 1):
+        assert sorted(inventory.below(level)) == np.flatnonzero(lowest < level).tolist(), f"below({level})"
+    emptiest = inventory.emptiest(10)
+    assert [units for units, _ in emptiest] == np.sort(totals)[:10].tolist(), "emptiest(10)"
+    assert all(totals[machine_id] == units for units, machine_id in emptiest), "emptiest ids"
+
+
+def check_empty_take() -> None:
+    """Raise AssertionError if taking from an empty slot changes the stock."""
+    inventory = FleetInventory(3, capacity=1)
+    inventory.take(0, 1)
+    before = inventory.levels.copy()
+    for take in (lambda: inventory.take(0, 1),
+                 lambda: inventory.take_many([2, 0], [1, 1]),
+                 lambda: inventory.take_many([2, 2], [3, 3])):
+        try:
+            take()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("took a unit that was not there")
+        assert np.array_equal(inventory.levels, before), "refused take changed the stock"
+    assert inventory.below(1) == [0], "index after refused takes"
+    check_index(inventory)
+
+
+def time_calls(fn, repeat: int) -> float:
+    """Microseconds per call of fn()."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--machines", type=int, default=200_000)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--batches", type=int, default=5)
+    parser.add_argument("--capacity", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    check_against_machines(args.seed)
+    check_empty_take()
+
+    rng = np.random.default_rng(args.seed)
+    batches = [random_fleet_events(rng, args.machines, args.events) for _ in range(args.batches)]
+
+    plain = VendingFleet(args.machines)
+    start = time.perf_counter()
+    for batch in batches:
+        plain.apply(*batch)
+    plain_seconds = time.perf_counter() - start
+
+    fleet = VendingFleet(args.machines)
+    inventory = FleetInventory(args.machines, capacity=args.capacity)
+    start = time.perf_counter()
+    for batch in batches:
+        fleet.apply(*batch, inventory=inventory)
+    stock_seconds = time.perf_counter() - start
+    check_index(inventory)
+
+    total = args.events * args.batches
+    levels = inventory.levels
+    print(f"machines:              {args.machines:,} x {len(PRODUCTS)} products ({levels.nbytes:,} bytes of stock)")
+    print(f"events:                {total:,}")
+    print(f"apply without stock:   {total / plain_seconds:>12,.0f} events/sec")
+    print(f"apply with stock:      {total / stock_seconds:>12,.0f} events/sec")
+    print(f"below(3):              {time_calls(lambda: inventory.below(3), 20):>12,.1f} us "
+          f"({len(inventory.below(3)):,} machines)")
+    print(f"  scan:                {time_calls(lambda: np.flatnonzero(levels.min(axis=1) < 3), 20):>12,.1f} us")
+    print(f"emptiest(10):          {time_calls(lambda: inventory.emptiest(10), 200):>12,.1f} us")
+    print(f"  scan:                {time_calls(lambda: np.argpartition(levels.sum(axis=1), 10)[:10], 20):>12,.1f} us")
+
+
+if __name__ == "__main__":
+    main()
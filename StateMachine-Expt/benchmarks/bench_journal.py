@@ -0,0 +1,138 @@
+"""
+Benchmark: VendingJournal write throughput and crash recovery time.
+
+First checks that a machine whose coin tubes refuse some dispenses
+(``exact_change_only``) and whose stock refuses some selects (``sold_out``)
+recovers to its live state, and that recovery rejects a file that is not a
+journal and records with an unknown kind, event or product.  Then writes a
+seeded event stream to a temporary journal (raw appends, then
+journal-and-apply through a VendingMachine), recovers it, and checks the
+recovered machine matches the live one.  Recovery replays only the events
+after the latest snapshot, so its cost does not grow with ``--events``.
+
+    python StateMachine-Expt/benchmarks/bench_journal.py [--events N] [--snapshot-interval N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+from event_sinks import NULL_SINK, RingBufferSink  # noqa: E402
+from state_pattern_example import VendingMachine  # noqa: E402
+from vending_change import CoinInventory  # noqa: E402
+from vending_engine import EV_INSERT, EV_SELECT, PRODUCTS, random_events  # noqa: E402
+from vending_inventory import FleetInventory  # noqa: E402
+from vending_journal import NO_PRODUCT, R_EVENT, RECORD, VendingJournal, recover  # noqa: E402
+
+
+def check_refusals(seed: int, events: int = 20_000) -> None:
+    """Raise AssertionError if events refused by coins or stock change recovery."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "refusals.journal")
+        coins = CoinInventory({25: 2})
+        inventory = FleetInventory(1, capacity=2)
+        sink = RingBufferSink(capacity=events * 4)
+        machine = VendingMachine(sink=sink, coins=coins, stock=inventory.machine(0))
+        with VendingJournal(path, snapshot_interval=1_000) as journal:
+            for event, arg in random_events(random.Random(seed), events):
+                journal.record(machine, event, arg)
+        assert sink.events("exact_change_only"), "expected some exact_change_only refusals"
+        assert sink.events("sold_out"), "expected some sold_out refusals"
+        recovered = recover(path, sink=NULL_SINK, coins=coins, stock=inventory.machine(0))
+        restored = recovered.snapshot()
+        assert restored == machine.snapshot(), f"recovered {restored} != live {machine.snapshot()}"
+
+
+def check_corruption() -> None:
+    """Raise AssertionError if a damaged journal recovers instead of raising ValueError."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "damaged.journal")
+        with VendingJournal(path) as journal:
+            journal.append_event(EV_INSERT, NO_PRODUCT, 100)
+        with open(path, "rb") as file:
+            good = file.read()
+
+        damaged = {
+            "not a vending machine journal": b"\x13\x37junk",
+            "unknown record kind": good + RECORD.pack(9, EV_INSERT, NO_PRODUCT, 0, 0),
+            "unknown event": good + RECORD.pack(R_EVENT, 7, NO_PRODUCT, 0, 0),
+            "product index": good + RECORD.pack(R_EVENT, EV_SELECT, len(PRODUCTS), 0, 0),
+        }
+        for expected, data in damaged.items():
+            with open(path, "wb") as file:
+                file.write(data)
+            try:
+                recover(path, sink=NULL_SINK)
+            except ValueError as exc:
+                assert expected in str(exc), f"{expected}: got {exc}"
+            else:
+                raise AssertionError(f"{expected}: recovered without an error")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--snapshot-interval", type=int, default=100_000)
+    parser.add_argument("--sync-every", type=int, default=0, help="records between fsyncs (0 = only on close)")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    check_refusals(args.seed)
+    check_corruption()
+    events = random_events(random.Random(args.seed), args.events)
+    raw = [
+        (event, PRODUCTS.index(arg) if event == EV_SELECT else NO_PRODUCT,
+         round(arg * 100) if event == EV_INSERT else 0)
+        for event, arg in events
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path = os.path.join(tmp, "raw.journal")
+        with VendingJournal(raw_path, sync_every=args.sync_every) as journal:
+            append = journal.append_event
+            start = time.perf_counter()
+            for event, product, amount in raw:
+                append(event, product, amount)
+            journal.flush()
+            raw_seconds = time.perf_counter() - start
+
+        path = os.path.join(tmp, "machine.journal")
+        machine = VendingMachine(sink=NULL_SINK)
+        with VendingJournal(path, snapshot_interval=args.snapshot_interval,
+                            sync_every=args.sync_every) as journal:
+            record = journal.record
+            start = time.perf_counter()
+            for event, arg in events:
+                record(machine, event, arg)
+            journal.flush()
+            record_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        recovered = recover(path, sink=NULL_SINK)
+        recover_seconds = time.perf_counter() - start
+
+        live = (machine.get_current_state(), machine.get_balance(), machine.get_selected_product())
+        restored = (recovered.get_current_state(), recovered.get_balance(), recovered.get_selected_product())
+        assert live == restored, f"recovered {restored} != live {live}"
+
+        size = os.path.getsize(path)
+
+    print(f"events:            {args.events:,} ({size / 1e6:,.1f} MB journal)")
+    print(f"raw appends:       {args.events / raw_seconds:>12,.0f} events/sec")
+    print(f"journal + apply:   {args.events / record_seconds:>12,.0f} events/sec")
+    print(f"recovery:          {recover_seconds * 1000:>12,.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
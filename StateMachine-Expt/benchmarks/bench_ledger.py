@@ -0,0 +1,121 @@
+"""
+Benchmark: MoneyLedger settlement against the float-dollar path.
+
+First checks that a ledger fed by ``VendingFleet.apply`` and one fed by
+``MoneyLedger.record`` on ``VendingMachine`` objects agree with each other
+and with the machines' balances.  Then runs a large fleet with a ledger
+attached and compares settling it in one pass over the integer columns with
+totalling the same sales one at a time in float dollars, the way the
+float-priced ``VendingMachine`` used to.
+
+    python StateMachine-Expt/benchmarks/bench_ledger.py [--machines N] [--events N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+from event_sinks import NULL_SINK  # noqa: E402
+from state_pattern_example import VendingMachine  # noqa: E402
+from vending_engine import EV_INSERT, EV_SELECT  # noqa: E402
+from vending_fleet import PRODUCTS, VendingFleet, random_fleet_events  # noqa: E402
+from vending_ledger import K_SALE, MoneyLedger  # noqa: E402
+
+
+def check_against_machines(seed: int, machines: int = 200, events: int = 20_000) -> None:
+    """Raise AssertionError if the fleet ledger disagrees with per-object recording."""
+    rng = np.random.default_rng(seed)
+    ids, evs, args = random_fleet_events(rng, machines, events)
+
+    fleet = VendingFleet(machines)
+    fleet_ledger = MoneyLedger()
+    fleet.apply(ids, evs, args, ledger=fleet_ledger)
+
+    reference = [VendingMachine(sink=NULL_SINK) for _ in range(machines)]
+    object_ledger = MoneyLedger()
+    for machine_id, event, arg in zip(ids.tolist(), evs.tolist(), args.tolist()):
+        if event == EV_INSERT:
+            value = arg / 100
+        elif event == EV_SELECT:
+            value = PRODUCTS[arg]
+        else:
+            value = None
+        object_ledger.record(machine_id, reference[machine_id], event, value)
+
+    balances = np.array([m.get_balance_cents() for m in reference], dtype=np.int64)
+    assert np.array_equal(object_ledger.machine_net(machines), balances), "object ledger != balances"
+    assert np.array_equal(fleet_ledger.machine_net(machines), balances), "fleet ledger != balances"
+
+    fleet_totals = fleet_ledger.settle()
+    object_totals = object_ledger.settle()
+    for name in fleet_totals._fields:
+        a, b = getattr(fleet_totals, name), getattr(object_totals, name)
+        assert np.array_equal(a, b), f"{name}: fleet {a} != objects {b}"
+
+
+def settle_floats(ledger: MoneyLedger) -> list:
+    """Total sales per product one entry at a time in float dollars."""
+    prices = [product.price for product in PRODUCTS]
+    revenue = [0.0] * len(PRODUCTS)
+    _, kind, product, _ = ledger.entries()
+    for k, p in zip(kind.tolist(), product.tolist()):
+        if k == K_SALE:
+            revenue[p] += prices[p]
+    return revenue
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--machines", type=int, default=100_000)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--batches", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    check_against_machines(args.seed)
+
+    rng = np.random.default_rng(args.seed)
+    fleet = VendingFleet(args.machines)
+    ledger = MoneyLedger()
+    start = time.perf_counter()
+    for _ in range(args.batches):
+        fleet.apply(*random_fleet_events(rng, args.machines, args.events), ledger=ledger)
+    record_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    settlement = ledger.settle()
+    int_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    float_revenue = settle_floats(ledger)
+    float_seconds = time.perf_counter() - start
+
+    drift = sum(abs(round(dollars * 100) - cents) for dollars, cents
+                in zip(float_revenue, settlement.revenue_cents.tolist()))
+    exact = sum(dollars * 100 == cents for dollars, cents
+                in zip(float_revenue, settlement.revenue_cents.tolist()))
+
+    print(f"machines:        {args.machines:,}")
+    print(f"events:          {args.events * args.batches:,}")
+    print(f"ledger entries:  {len(ledger):,} ({ledger.machine.nbytes + ledger.kind.nbytes + ledger.product.nbytes + ledger.cents.nbytes:,} bytes allocated)")
+    print(f"apply + record:  {args.events * args.batches / record_seconds:>14,.0f} events/sec")
+    print(f"settle (cents):  {len(ledger) / int_seconds:>14,.0f} entries/sec")
+    print(f"settle (floats): {len(ledger) / float_seconds:>14,.0f} entries/sec")
+    print(f"speedup:         {float_seconds / int_seconds:>14.1f}x")
+    print(f"float totals exact to the cent: {exact}/{len(PRODUCTS)} products "
+          f"(rounded drift {drift} cents)")
+    print(f"revenue:         ${int(settlement.revenue_cents.sum()) / 100:,.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: bytes per context object with shared flyweight states and __slots__.
+
+For each context class, builds N instances under ``tracemalloc`` and reports
+bytes per instance.  The "per-instance" rows rebuild the original layout (a
+plain ``__dict__`` object that allocates its own copy of every state) from the
+same state classes, so before and after are measured side by side.
+
+    python StateMachine-Expt/benchmarks/bench_memory.py [--count N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+import simple_traffic_light  # noqa: E402
+import state_pattern_example  # noqa: E402
+import traffic_light_state  # noqa: E402
+from event_sinks import NULL_SINK  # noqa: E402
+
+
+class PerInstanceVendingMachine:
+    """The original VendingMachine layout: own state objects, no __slots__."""
+
+    def __init__(self):
+        self.sink = NULL_SINK
+        self.idle_state = state_pattern_example.IdleState()
+        self.coin_inserted_state = state_pattern_example.CoinInsertedState()
+        self.product_selected_state = state_pattern_example.ProductSelectedState()
+        self.out_of_order_state = state_pattern_example.OutOfOrderState()
+        self._current_state = self.idle_state
+        self._balance = 0
+        self._selected_product = None
+        self._is_operational = True
+
+
+class PerInstanceTrafficLight:
+    """The original TrafficLight layout: own state objects, no __slots__."""
+
+    def __init__(self):
+        self._clock = time.time
+        self.sink = NULL_SINK
+        self.red_state = traffic_light_state.RedLightState()
+        self.yellow_state = traffic_light_state.YellowLightState()
+        self.green_state = traffic_light_state.GreenLightState()
+        self._current_state = self.red_state
+        self._timer_start = time.time()
+
+
+class PerInstanceSimpleTrafficLight:
+    """The original SimpleTrafficLight layout: own state objects, no __slots__."""
+
+    def __init__(self):
+        self.red_state = simple_traffic_light.RedLightState()
+        self.yellow_state = simple_traffic_light.YellowLightState()
+        self.green_state = simple_traffic_light.GreenLightState()
+        self._current_state = self.red_state
+
+
+def bytes_per_instance(factory, count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        instances = [None] * count
+        container = tracemalloc.get_traced_memory()[0] - baseline
+        for i in range(count):
+            instances[i] = factory()
+        used = tracemalloc.get_traced_memory()[0] - baseline - container
+    finally:
+        tracemalloc.stop()
+    del instances
+    return used / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rows = [
+        ("VendingMachine", PerInstanceVendingMachine,
+         lambda: state_pattern_example.VendingMachine(sink=NULL_SINK)),
+        ("TrafficLight", PerInstanceTrafficLight,
+         lambda: traffic_light_state.TrafficLight(sink=NULL_SINK)),
+        ("SimpleTrafficLight", PerInstanceSimpleTrafficLight,
+         simple_traffic_light.SimpleTrafficLight),
+    ]
+
+    print(f"instances: {args.count:,}\n")
+    print(f"{'class':<20} {'per-instance':>14} {'flyweight':>12} {'saving':>8}")
+    for name, before_factory, after_factory in rows:
+        before = bytes_per_instance(before_factory, args.count)
+        after = bytes_per_instance(after_factory, args.count)
+        print(f"{name:<20} {before:>12.0f} B {after:>10.0f} B {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
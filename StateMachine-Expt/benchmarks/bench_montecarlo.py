@@ -0,0 +1,60 @@
+"""
+Benchmark: Monte Carlo vending scenarios across worker counts.
+
+Runs the same seeded scenario set with 1, 2, 4, ... worker processes (up to
+``--max-workers``), reports scenarios/sec and speedup over one worker, and
+checks every run produced exactly the same aggregate.
+
+    python StateMachine-Expt/benchmarks/bench_montecarlo.py [--scenarios N] [--events N] [--max-workers N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+from vending_montecarlo import run_monte_carlo  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", type=int, default=20_000)
+    parser.add_argument("--events", type=int, default=100, help="events per scenario")
+    parser.add_argument("--shard-size", type=int, default=250)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    counts = []
+    workers = 1
+    while workers < args.max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(args.max_workers)
+
+    reference = None
+    single = None
+    print(f"{'workers':>7} {'scenarios/sec':>14} {'speedup':>8}")
+    for workers in counts:
+        start = time.perf_counter()
+        result = run_monte_carlo(args.scenarios, args.events, args.seed, workers, args.shard_size)
+        elapsed = time.perf_counter() - start
+        if reference is None:
+            reference, single = result, elapsed
+        assert result == reference, f"{workers} workers produced a different aggregate"
+        print(f"{workers:>7} {args.scenarios / elapsed:>14,.0f} {single / elapsed:>7.2f}x")
+
+    print(f"\nrevenue ${reference.total_revenue_cents() / 100:,.2f} over "
+          f"{reference.events:,} events; identical across worker counts")
+
+
+if __name__ == "__main__":
+    main()
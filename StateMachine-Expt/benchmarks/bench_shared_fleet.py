@@ -0,0 +1,98 @@
+"""
+Benchmark: SharedVendingFleet throughput against the single-process fleet.
+
+Applies the same seeded batches to a ``VendingFleet`` and to a
+``SharedVendingFleet`` with ``--workers`` processes and reports events/sec
+for both.  A small fleet is then replayed event by event through one
+``VendingMachine`` per machine id and compared with the shared fleet's
+snapshot (state, balance in cents, selected product).
+
+    python StateMachine-Expt/benchmarks/bench_shared_fleet.py [--machines N] [--events N] [--workers N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+from event_sinks import NULL_SINK  # noqa: E402
+from state_pattern_example import VendingMachine  # noqa: E402
+from vending_engine import EV_INSERT, EV_SELECT, PRODUCTS, STATE_NAMES, apply_to_machine  # noqa: E402
+from vending_fleet import NO_PRODUCT, VendingFleet, random_fleet_events  # noqa: E402
+from vending_shared_fleet import SharedVendingFleet  # noqa: E402
+
+
+def verify_against_machines(machines: int, events: int, workers: int, seed: int) -> None:
+    """Replay one stream sequentially through VendingMachine objects and compare"""
+    ids, codes, args = random_fleet_events(np.random.default_rng(seed), machines, events)
+    with SharedVendingFleet(machines, workers=workers) as fleet:
+        for lo in range(0, events, 10_000):
+            fleet.apply(ids[lo:lo + 10_000], codes[lo:lo + 10_000], args[lo:lo + 10_000])
+        snap = fleet.snapshot()
+
+    objects = [VendingMachine(sink=NULL_SINK) for _ in range(machines)]
+    for machine_id, event, arg in zip(ids.tolist(), codes.tolist(), args.tolist()):
+        if event == EV_INSERT:
+            arg = arg / 100
+        elif event == EV_SELECT:
+            arg = PRODUCTS[arg]
+        apply_to_machine(objects[machine_id], event, arg)
+
+    for i, machine in enumerate(objects):
+        product = machine.get_selected_product()
+        expected = (machine.get_current_state(), machine.get_balance_cents(),
+                    PRODUCTS.index(product) if product else NO_PRODUCT)
+        actual = (STATE_NAMES[snap["state"][i]], int(snap["balance"][i]), int(snap["selected"][i]))
+        assert expected == actual, f"machine {i}: shared fleet {actual} != VendingMachine {expected}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--machines", type=int, default=1_000_000)
+    parser.add_argument("--events", type=int, default=4_000_000)
+    parser.add_argument("--batch-size", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    batches = [random_fleet_events(rng, args.machines, args.batch_size)
+               for _ in range(max(1, args.events // args.batch_size))]
+    total = sum(len(batch[0]) for batch in batches)
+
+    single = VendingFleet(args.machines)
+    start = time.perf_counter()
+    for batch in batches:
+        single.apply(*batch)
+    single_seconds = time.perf_counter() - start
+
+    with SharedVendingFleet(args.machines, workers=args.workers) as fleet:
+        fleet.apply(*random_fleet_events(rng, args.machines, 1000))  # start the workers
+        fleet.state[:], fleet.balance[:], fleet.selected[:] = 0, 0, NO_PRODUCT
+        start = time.perf_counter()
+        for batch in batches:
+            fleet.apply(*batch)
+        shared_seconds = time.perf_counter() - start
+        snap = fleet.snapshot()
+
+    assert all(np.array_equal(snap[key], getattr(single, key)) for key in ("state", "balance", "selected"))
+    verify_against_machines(2_000, 200_000, args.workers, args.seed)
+
+    print(f"machines:          {args.machines:,}, events: {total:,}")
+    print(f"single process:    {total / single_seconds:>12,.0f} events/sec")
+    print(f"shared, {args.workers:>2} workers: {total / shared_seconds:>12,.0f} events/sec")
+    print("snapshot matches single-process fleet and sequential VendingMachine replay")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: cold start of the headless CLI subcommands.
+
+Runs each headless subcommand of ``cli.py`` (``--help``, ``sim``, ``bench
+--list``, ``replay``) in a fresh interpreter ``--runs`` times and compares the
+median wall time with a bare ``python -c pass``.  Fails if any command's
+overhead exceeds ``cli.STARTUP_BUDGET_MS``.  Each command also runs once under
+``-X importtime``, and the benchmark fails if it imported any of
+``cli.HEAVY_MODULES`` (tkinter, NumPy, asyncio).
+
+    python StateMachine-Expt/benchmarks/bench_startup.py [--runs 15]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+from cli import HEAVY_MODULES, STARTUP_BUDGET_MS  # noqa: E402
+from event_sinks import NULL_SINK  # noqa: E402
+from state_pattern_example import Product, VendingMachine  # noqa: E402
+from vending_engine import EV_INSERT, EV_SELECT  # noqa: E402
+from vending_journal import VendingJournal  # noqa: E402
+
+
+def write_journal(path: str) -> None:
+    machine = VendingMachine(sink=NULL_SINK)
+    with VendingJournal(path) as journal:
+        machine.insert_coin(2.00)
+        journal.record(machine, EV_INSERT, 2.00)
+        machine.select_product(Product.CHIPS)
+        journal.record(machine, EV_SELECT, Product.CHIPS)
+
+
+def median_ms(command: list, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def imported_modules(command: list) -> set:
+    """Top-level package names imported while running ``command``."""
+    result = subprocess.run([command[0], "-X", "importtime", *command[1:]], check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    names = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            names.add(line.rsplit("|", 1)[1].strip().split(".")[0])
+    return names
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args()
+
+    journal = os.path.join(tempfile.mkdtemp(), "machine.journal")
+    write_journal(journal)
+    cli = [sys.executable, str(_STATE_MACHINE_DIR)]
+    commands = {
+        "--help": [*cli, "--help"],
+        "sim vending": [*cli, "sim", "vending", "--events", "100", "--machines", "10"],
+        "sim traffic": [*cli, "sim", "traffic", "--cycles", "10"],
+        "bench --list": [*cli, "bench", "--list"],
+        "replay": [*cli, "replay", journal],
+    }
+
+    baseline = median_ms([sys.executable, "-c", "pass"], args.runs)
+    print(f"python -c pass: {baseline:>8.1f} ms (median of {args.runs})")
+    print(f"budget:         {STARTUP_BUDGET_MS:>8} ms over that\n")
+    print(f"{'command':<14} {'median ms':>10} {'overhead':>10}")
+    failures = []
+    for name, command in commands.items():
+        heavy = sorted(imported_modules(command) & set(HEAVY_MODULES))
+        if heavy:
+            failures.append(f"{name} imported {', '.join(heavy)}")
+        elapsed = median_ms(command, args.runs)
+        overhead = elapsed - baseline
+        print(f"{name:<14} {elapsed:>10.1f} {overhead:>10.1f}")
+        if overhead > STARTUP_BUDGET_MS:
+            failures.append(f"{name} took {overhead:.1f} ms over the interpreter, budget {STARTUP_BUDGET_MS} ms")
+
+    assert not failures, "; ".join(failures)
+    print("\nall headless commands within budget and free of " + ", ".join(HEAVY_MODULES))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: closed-form traffic light color queries.
+
+Checks ``color_at`` against a discrete-event simulation and ``colors_at``
+against ``color_at``, then reports scalar queries/sec and vectorized
+(light, time) pairs/sec.
+
+    python StateMachine-Expt/benchmarks/bench_timetable.py [--lights N] [--times N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+from traffic_light_sim import simulate_cycles  # noqa: E402
+from traffic_light_timetable import COLOR_NAMES, color_at, colors_at  # noqa: E402
+
+
+def check_against_simulation(rng: random.Random, cycles: int = 1000) -> None:
+    log = simulate_cycles(cycles).log
+    change_times = [0.0] + [when for when, _, _ in log]
+    change_colors = ["RED"] + [color for _, _, color in log]
+    for _ in range(10_000):
+        t = rng.uniform(0, change_times[-1])
+        expected = change_colors[bisect.bisect_right(change_times, t) - 1]
+        assert color_at(t) == expected, f"t={t}: {color_at(t)} != simulated {expected}"
+
+
+def check_vectorized(rng: random.Random) -> None:
+    times = np.array([rng.uniform(0, 1e6) for _ in range(1000)])
+    offsets = np.array([rng.uniform(0, 8) for _ in range(1000)])
+    codes = colors_at(times, offsets)
+    for t, offset, code in zip(times.tolist(), offsets.tolist(), codes.tolist()):
+        assert COLOR_NAMES[code] == color_at(t, offset)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lights", type=int, default=10_000)
+    parser.add_argument("--times", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    check_against_simulation(rng)
+    check_vectorized(rng)
+
+    queries = [rng.uniform(0, 1e7) for _ in range(1_000_000)]
+    start = time.perf_counter()
+    for t in queries:
+        color_at(t)
+    scalar_seconds = time.perf_counter() - start
+
+    np_rng = np.random.default_rng(args.seed)
+    offsets = np_rng.uniform(0, 8, size=args.lights)[:, None]
+    times = np.sort(np_rng.uniform(0, 1e7, size=args.times))[None, :]
+    chunk = max(1, 4_000_000 // args.times)  # rows per chunk, bounds temporary memory
+    start = time.perf_counter()
+    for row in range(0, args.lights, chunk):
+        colors_at(times, offsets[row:row + chunk])
+    vector_seconds = time.perf_counter() - start
+
+    pairs = args.lights * args.times
+    print(f"color_at:      {len(queries) / scalar_seconds:>16,.0f} queries/sec")
+    print(f"colors_at:     {pairs / vector_seconds:>16,.0f} pairs/sec ({pairs:,} pairs)")
+
+
+if __name__ == "__main__":
+    main()
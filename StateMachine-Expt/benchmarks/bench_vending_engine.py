@@ -0,0 +1,76 @@
+"""
+Benchmark: class-based VendingMachine vs compiled transition table.
+
+Runs the same seeded event stream through both implementations, checks that
+they end every event in the same state, and reports events/sec for each.
+
+    python StateMachine-Expt/benchmarks/bench_vending_engine.py [--events N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+from event_sinks import NULL_SINK  # noqa: E402
+from state_pattern_example import VendingMachine  # noqa: E402
+from vending_engine import CompiledVendingMachine, apply_to_machine, random_events  # noqa: E402
+
+
+def check_equivalence(events) -> None:
+    """Raise AssertionError if the two paths ever disagree."""
+    machine = VendingMachine(sink=NULL_SINK)
+    engine = CompiledVendingMachine()
+    for i, (event, arg) in enumerate(events):
+        apply_to_machine(machine, event, arg)
+        engine.fire(event, arg)
+        observed = (machine.get_current_state(), machine.get_balance(), machine.get_selected_product())
+        expected = (engine.get_current_state(), engine.get_balance(), engine.selected)
+        assert observed == expected, f"event {i}: class path {observed} != engine {expected}"
+
+
+def time_class_path(events) -> float:
+    machine = VendingMachine(sink=NULL_SINK)
+    start = time.perf_counter()
+    for event, arg in events:
+        apply_to_machine(machine, event, arg)
+    return time.perf_counter() - start
+
+
+def time_engine(events) -> float:
+    engine = CompiledVendingMachine()
+    fire = engine.fire
+    start = time.perf_counter()
+    for event, arg in events:
+        fire(event, arg)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    events = random_events(random.Random(args.seed), args.events)
+    check_equivalence(events)
+
+    class_seconds = time_class_path(events)
+    engine_seconds = time_engine(events)
+
+    print(f"events:        {len(events):,}")
+    print(f"class path:    {len(events) / class_seconds:>12,.0f} events/sec")
+    print(f"compiled:      {len(events) / engine_seconds:>12,.0f} events/sec")
+    print(f"speedup:       {class_seconds / engine_seconds:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: NumPy VendingFleet throughput and correctness.
+
+First replays a small seeded batch against one ``VendingMachine`` per fleet
+slot and checks every outcome, and checks that batches with an out-of-range
+machine id, event or product are rejected untouched.  Then times large
+batches on a large fleet.
+
+    python StateMachine-Expt/benchmarks/bench_vending_fleet.py [--machines N] [--events N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+from event_sinks import NULL_SINK  # noqa: E402
+from state_pattern_example import VendingMachine  # noqa: E402
+from vending_engine import EV_INSERT, EV_SELECT, N_EVENTS, STATE_NAMES, apply_to_machine  # noqa: E402
+from vending_fleet import PRODUCTS, VendingFleet, random_fleet_events  # noqa: E402
+
+
+def check_against_machines(seed: int, machines: int = 200, events: int = 20_000) -> None:
+    """Raise AssertionError if the fleet disagrees with VendingMachine objects."""
+    rng = np.random.default_rng(seed)
+    ids, evs, args = random_fleet_events(rng, machines, events)
+
+    fleet = VendingFleet(machines)
+    fleet.apply(ids, evs, args)
+
+    reference = [VendingMachine(sink=NULL_SINK) for _ in range(machines)]
+    for machine_id, event, arg in zip(ids.tolist(), evs.tolist(), args.tolist()):
+        if event == EV_INSERT:
+            value = arg / 100
+        elif event == EV_SELECT:
+            value = PRODUCTS[arg]
+        else:
+            value = None
+        apply_to_machine(reference[machine_id], event, value)
+
+    for machine_id, machine in enumerate(reference):
+        selected = machine.get_selected_product()
+        expected = (
+            machine.get_current_state(),
+            machine.get_balance_cents(),
+            PRODUCTS.index(selected) if selected else -1,
+        )
+        observed = (
+            STATE_NAMES[fleet.state[machine_id]],
+            int(fleet.balance[machine_id]),
+            int(fleet.selected[machine_id]),
+        )
+        assert observed == expected, f"machine {machine_id}: fleet {observed} != reference {expected}"
+
+
+def check_validation(machines: int = 10) -> None:
+    """Raise AssertionError if a bad batch is applied instead of raising ValueError."""
+    fleet = VendingFleet(machines)
+    bad_batches = {
+        "machine id": ([0, -1], [EV_INSERT, EV_INSERT], [100, 100]),
+        "unknown event": ([0, 1], [EV_INSERT, N_EVENTS], [100, 0]),
+        "product index -1": ([0, 0], [EV_INSERT, EV_SELECT], [100, -1]),
+        "product index 4": ([0, 0], [EV_INSERT, EV_SELECT], [100, len(PRODUCTS)]),
+    }
+    for expected, batch in bad_batches.items():
+        try:
+            fleet.apply(*batch)
+        except ValueError as exc:
+            assert expected in str(exc), f"{expected}: got {exc}"
+        else:
+            raise AssertionError(f"{expected}: batch was applied")
+        assert fleet.total_balance() == 0 and not fleet.state.any(), f"{expected}: fleet changed"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--machines", type=int, default=1_000_000)
+    parser.add_argument("--events", type=int, default=2_000_000)
+    parser.add_argument("--batches", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    check_against_machines(args.seed)
+    check_validation()
+
+    rng = np.random.default_rng(args.seed)
+    fleet = VendingFleet(args.machines)
+    batches = [random_fleet_events(rng, args.machines, args.events) for _ in range(args.batches)]
+
+    start = time.perf_counter()
+    for ids, evs, arg in batches:
+        fleet.apply(ids, evs, arg)
+    seconds = time.perf_counter() - start
+
+    total = args.events * args.batches
+    print(f"machines:      {args.machines:,}")
+    print(f"events:        {total:,}")
+    print(f"throughput:    {total / seconds:>14,.0f} events/sec")
+    print(f"states:        {fleet.state_counts()}")
+
+
+if __name__ == "__main__":
+    main()
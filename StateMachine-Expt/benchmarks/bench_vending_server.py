@@ -0,0 +1,200 @@
+"""
+Benchmark: VendingServer under many concurrent pipelined connections.
+
+First checks, in-process, that a journaled server answers interleaved
+journaled and error-only batches in request order, and disconnects a client
+whose line exceeds ``MAX_LINE_BYTES``, and that a journal written with a
+custom catalog replays onto the served state while damaged journals are
+rejected.  Then starts the server with a
+journal in a child process, and runs the load
+generator (``vending_server.run_load``) from this process with
+``--connections`` clients, each pipelining ``--pipeline`` requests at a time.
+It reports requests/sec and p50/p99/p99.9 latency.  Afterwards it reads
+every machine's status over the socket and checks it against a replay of
+the journal.
+
+Each side of a connection needs a file descriptor, so the server and the
+client run in separate processes, and both raise their open-file limit as far
+as the hard limit allows.
+
+    python StateMachine-Expt/benchmarks/bench_vending_server.py [--connections 10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+from product_catalog import CatalogItem, ProductCatalog  # noqa: E402
+from vending_engine import EV_INSERT, EV_SELECT, PRODUCTS, STATE_NAMES  # noqa: E402
+from vending_server import (  # noqa: E402
+    FLEET_RECORD,
+    MAX_LINE_BYTES,
+    VendingServer,
+    replay_journal,
+    run_load,
+)
+
+
+def raise_file_limit(wanted: int) -> int:
+    """Raise RLIMIT_NOFILE towards ``wanted``; returns the new soft limit."""
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return wanted
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+    if target > soft:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+        soft = target
+    return soft
+
+
+def serve(size: int, journal: str, connections: int, ports) -> None:
+    raise_file_limit(connections + 256)
+
+    async def main() -> None:
+        server = VendingServer(size, journal_path=journal)
+        ports.put(await server.start(backlog=min(connections, 65535)))
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+async def fetch_statuses(port: int, size: int) -> list:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"".join(b"%d status\n" % i for i in range(size)))
+    statuses = []
+    for _ in range(size):
+        _, state, balance, selected = (await reader.readline()).split()
+        statuses.append((int(state), int(balance), int(selected)))
+    writer.close()
+    return statuses
+
+
+async def check_server(rounds: int = 100) -> None:
+    """Raise AssertionError if replies come back out of order or a long line is kept."""
+    with tempfile.TemporaryDirectory() as tmp:
+        server = VendingServer(1, journal_path=str(Path(tmp) / "order.journal"))
+        # Slow the journal thread down so a later batch is ready before an
+        # earlier one's write has finished.
+        write = server._journal._write
+        server._journal._write = lambda data: (time.sleep(0.005), write(data))
+        port = await server.start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            for i in range(rounds):
+                # A journaled batch, then one with nothing to journal.
+                writer.write(b"0 insert 25\n")
+                await writer.drain()
+                await asyncio.sleep(0.001)  # let the server flush it
+                writer.write(b"0 bogus\n")
+                await writer.drain()
+                first, second = await reader.readline(), await reader.readline()
+                assert first.startswith(b"OK ") and second.startswith(b"ERR "), f"round {i}: {first!r} {second!r}"
+            writer.close()
+
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"0" * (MAX_LINE_BYTES + 1))
+            assert await asyncio.wait_for(reader.read(), 5) == b"", "long line did not close the connection"
+            writer.close()
+        finally:
+            await server.close()
+
+
+async def check_catalog_journal() -> None:
+    """Raise AssertionError if a custom-catalog journal replays wrongly or a bad one replays at all."""
+    catalog = ProductCatalog.from_products(PRODUCTS)
+    gum = catalog.add("GUM", CatalogItem("GUM", "Gum", 75), "B1")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "catalog.journal")
+        server = VendingServer(2, journal_path=path, catalog=catalog)
+        port = await server.start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        requests = [b"1 insert 100", b"1 select B1", b"0 insert 200", b"0 select %d" % catalog.index(gum)]
+        writer.write(b"".join(line + b"\n" for line in requests))
+        replies = [await reader.readline() for _ in requests]
+        writer.close()
+        await server.close()
+        assert all(reply.startswith(b"OK ") for reply in replies), replies
+        assert replies[1].split()[3] == b"%d" % catalog.index(gum), replies[1]
+
+        replayed = replay_journal(path, 2, catalog)
+        assert [machine.snapshot() for machine in server.machines] == [m.snapshot() for m in replayed]
+
+        with open(path, "rb") as file:
+            good = file.read()
+        damaged = {
+            "not a vending server journal": b"\x13\x37junk",
+            "unknown event": good + FLEET_RECORD.pack(0, 9, -1, 0),
+            "product index": good + FLEET_RECORD.pack(0, EV_SELECT, catalog.index_count(), 0),
+            "outside a fleet": good + FLEET_RECORD.pack(2, EV_INSERT, -1, 25),
+        }
+        for expected, data in damaged.items():
+            with open(path, "wb") as file:
+                file.write(data)
+            try:
+                replay_journal(path, 2, catalog)
+            except ValueError as exc:
+                assert expected in str(exc), f"{expected}: got {exc}"
+            else:
+                raise AssertionError(f"{expected}: replayed without an error")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=50, help="requests per connection")
+    parser.add_argument("--pipeline", type=int, default=8)
+    parser.add_argument("--machines", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    asyncio.run(check_server())
+    asyncio.run(check_catalog_journal())
+
+    limit = raise_file_limit(args.connections + 256)
+    if limit < args.connections + 64:
+        sys.exit(f"open-file limit {limit} is too low for {args.connections:,} connections")
+
+    journal = str(Path(tempfile.mkdtemp()) / "server.journal")
+    ports = multiprocessing.Queue()
+    child = multiprocessing.Process(target=serve, args=(args.machines, journal, args.connections, ports),
+                                    daemon=True)
+    child.start()
+    port = ports.get(timeout=30)
+    try:
+        stats = asyncio.run(run_load("127.0.0.1", port, args.connections, args.requests,
+                                     pipeline=args.pipeline, fleet_size=args.machines, seed=args.seed))
+        statuses = asyncio.run(fetch_statuses(port, args.machines))
+    finally:
+        child.terminate()
+        child.join()
+
+    replayed = replay_journal(journal, args.machines)
+    for machine_id, (machine, served) in enumerate(zip(replayed, statuses)):
+        state, balance, selected = machine.snapshot()
+        expected = (STATE_NAMES.index(state), balance, PRODUCTS.index(selected) if selected else -1)
+        assert served == expected, f"machine {machine_id}: server {served} != journal replay {expected}"
+
+    print(f"connections:   {args.connections:,} (pipeline depth {args.pipeline})")
+    print(f"requests:      {stats['requests']:,} in {stats['seconds']:.2f} s, {stats['errors']} errors")
+    print(f"throughput:    {stats['requests_per_sec']:>12,.0f} requests/sec")
+    print(f"latency p50:   {stats['p50'] * 1e3:>12.2f} ms")
+    print(f"latency p99:   {stats['p99'] * 1e3:>12.2f} ms")
+    print(f"latency p99.9: {stats['p999'] * 1e3:>12.2f} ms")
+    print("journal replay matches every machine's served state")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+Benchmark suite for the state machines and the graph canvas.
+
+Every workload is seeded, so two runs execute the same operations.  Each is
+timed in fixed-size batches; the suite reports throughput (ops/sec), p50/p99
+per-operation latency across batches, and peak traced memory from a separate
+``tracemalloc`` pass.  Results can be saved as JSON and compared against a
+saved baseline, exiting non-zero when any workload's throughput drops by
+more than ``--threshold``.
+
+    python StateMachine-Expt/benchmarks/suite.py --save results.json
+    python StateMachine-Expt/benchmarks/suite.py --baseline results.json --threshold 0.15
+
+The ``graph_redraw`` workload needs a display and is skipped without one
+(use ``xvfb-run`` on headless machines).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Ensure StateMachine-Expt is importable when running from repo root.
+_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
+if str(_STATE_MACHINE_DIR) not in sys.path:
+    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+
+from event_sinks import NULL_SINK  # noqa: E402
+from fsm_spec import VENDING_SPEC, graph_edges  # noqa: E402
+from simple_traffic_light import SimpleTrafficLight  # noqa: E402
+from state_pattern_example import VendingMachine  # noqa: E402
+from traffic_light_sim import VirtualClock  # noqa: E402
+from traffic_light_state import TrafficLight  # noqa: E402
+from vending_engine import CompiledVendingMachine, apply_to_machine, random_events  # noqa: E402
+
+# A workload's setup receives a seeded RNG and returns run(count), which
+# performs ``count`` operations.
+RunFn = Callable[[int], None]
+
+
+class WorkloadUnavailable(Exception):
+    """Raised by a setup function when its workload cannot run here."""
+
+
+@dataclass(frozen=True)
+class Workload:
+    name: str
+    description: str
+    setup: Callable[[random.Random, int], RunFn]
+
+
+def _cycled(items, count: int, position: List[int]):
+    """Return ``count`` items from ``items``, continuing where the last call stopped."""
+    start = position[0]
+    end = start + count
+    position[0] = end % len(items)
+    if end <= len(items):
+        return items[start:end]
+    return items[start:] + items[: end - len(items)]
+
+
+def setup_vending_events(rng: random.Random, total: int) -> RunFn:
+    machine = VendingMachine(sink=NULL_SINK)
+    events = random_events(rng, min(total, 200_000))
+    position = [0]
+
+    def run(count: int) -> None:
+        for event, arg in _cycled(events, count, position):
+            apply_to_machine(machine, event, arg)
+
+    return run
+
+
+def setup_vending_compiled(rng: random.Random, total: int) -> RunFn:
+    engine = CompiledVendingMachine()
+    events = random_events(rng, min(total, 200_000))
+    position = [0]
+
+    def run(count: int) -> None:
+        fire = engine.fire
+        for event, arg in _cycled(events, count, position):
+            fire(event, arg)
+
+    return run
+
+
+def setup_simple_next_light(rng: random.Random, total: int) -> RunFn:
+    light = SimpleTrafficLight()
+    for _ in range(rng.randrange(3)):
+        light.next_light()
+
+    def run(count: int) -> None:
+        next_light = light.next_light
+        for _ in range(count):
+            next_light()
+
+    return run
+
+
+def setup_traffic_check_timer(rng: random.Random, total: int) -> RunFn:
+    clock = VirtualClock()
+    light = TrafficLight(clock=clock, sink=NULL_SINK)
+    steps = [rng.choice((0.05, 0.1, 0.25)) for _ in range(1024)]
+    position = [0]
+
+    def run(count: int) -> None:
+        sleep = clock.sleep
+        check_timer = light.check_timer
+        for step in _cycled(steps, count, position):
+            sleep(step)
+            check_timer()
+
+    return run
+
+
+def setup_simple_get_status(rng: random.Random, total: int) -> RunFn:
+    light = SimpleTrafficLight()
+    for _ in range(rng.randrange(3)):
+        light.next_light()
+
+    def run(count: int) -> None:
+        get_status = light.get_status
+        for _ in range(count):
+            get_status()
+
+    return run
+
+
+def setup_vending_status(rng: random.Random, total: int) -> RunFn:
+    machine = VendingMachine(sink=NULL_SINK)
+    for event, arg in random_events(rng, 10):
+        apply_to_machine(machine, event, arg)
+
+    def run(count: int) -> None:
+        for _ in range(count):
+            machine.get_current_state()
+            machine.get_balance()
+            machine.get_selected_product()
+
+    return run
+
+
+def setup_vending_snapshot(rng: random.Random, total: int) -> RunFn:
+    machine = VendingMachine(sink=NULL_SINK)
+    for event, arg in random_events(rng, 10):
+        apply_to_machine(machine, event, arg)
+
+    def run(count: int) -> None:
+        snapshot = machine.snapshot
+        for _ in range(count):
+            snapshot()
+
+    return run
+
+
+def setup_graph_redraw(rng: random.Random, total: int) -> RunFn:
+    try:
+        import tkinter as tk
+
+        root = tk.Tk()
+    except Exception as exc:  # ImportError or TclError without a display
+        raise WorkloadUnavailable(str(exc)) from exc
+
+    from ui.tk_state_graph import GraphEdge, GraphNode, StateGraphCanvas
+
+    nodes = [GraphNode(state, state) for state in VENDING_SPEC["states"]]
+    edges = [GraphEdge(src, dst, label) for src, dst, label in graph_edges(VENDING_SPEC)]
+    canvas = StateGraphCanvas(root, width=620, height=300)
+    canvas.set_graph(nodes, edges)
+    keys = list(VENDING_SPEC["states"])
+    active = [rng.choice(keys) for _ in range(64)]
+    position = [0]
+
+    def run(count: int) -> None:
+        for key in _cycled(active, count, position):
+            canvas._active_key = key
+            canvas.redraw()
+        root.update_idletasks()
+
+    return run
+
+
+WORKLOADS = (
+    Workload("vending_events", "VendingMachine random event stream", setup_vending_events),
+    Workload("vending_compiled", "CompiledVendingMachine random event stream", setup_vending_compiled),
+    Workload("simple_next_light", "SimpleTrafficLight.next_light loop", setup_simple_next_light),
+    Workload("traffic_check_timer", "TrafficLight.check_timer on a virtual clock", setup_traffic_check_timer),
+    Workload("simple_get_status", "SimpleTrafficLight.get_status", setup_simple_get_status),
+    Workload("vending_status", "VendingMachine state/balance/selection getters", setup_vending_status),
+    Workload("vending_snapshot", "VendingMachine.snapshot", setup_vending_snapshot),
+    Workload("graph_redraw", "StateGraphCanvas.redraw of the vending graph", setup_graph_redraw),
+)
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def measure(workload: Workload, seed: int, batches: int, batch_size: int) -> Dict[str, float]:
+    """Time ``batches`` batches of ``batch_size`` ops, then trace peak memory."""
+    run = workload.setup(random.Random(seed), batches * batch_size)
+    run(batch_size)  # warm-up
+
+    per_op = []
+    total = 0.0
+    for _ in range(batches):
+        start = time.perf_counter()
+        run(batch_size)
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        per_op.append(elapsed / batch_size)
+    per_op.sort()
+
+    run = workload.setup(random.Random(seed), batches * batch_size)
+    tracemalloc.start()
+    try:
+        run(batch_size)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "ops_per_sec": batches * batch_size / total,
+        "p50_us": _percentile(per_op, 0.50) * 1e6,
+        "p99_us": _percentile(per_op, 0.99) * 1e6,
+        "peak_kib": peak / 1024,
+    }
+
+
+def run_suite(names: Optional[List[str]], seed: int, batches: int, batch_size: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for workload in WORKLOADS:
+        if names and workload.name not in names:
+            continue
+        try:
+            results[workload.name] = measure(workload, seed, batches, batch_size)
+        except WorkloadUnavailable as exc:
+            print(f"skipping {workload.name}: {exc}", file=sys.stderr)
+    return results
+
+
+def compare(current: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Return a message for every workload whose throughput regressed past ``threshold``."""
+    regressions = []
+    for name, result in current.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        change = result["ops_per_sec"] / before["ops_per_sec"] - 1
+        if change < -threshold:
+            regressions.append(
+                f"{name}: {result['ops_per_sec']:,.0f} ops/sec vs baseline "
+                f"{before['ops_per_sec']:,.0f} ({change:+.1%})"
+            )
+    return regressions
+
+
+def print_table(results: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Dict[str, float]]]) -> None:
+    print(f"{'workload':<22} {'ops/sec':>14} {'p50 us':>9} {'p99 us':>9} {'peak KiB':>10} {'vs base':>8}")
+    for name, r in results.items():
+        delta = ""
+        if baseline and name in baseline:
+            delta = f"{r['ops_per_sec'] / baseline[name]['ops_per_sec'] - 1:+.1%}"
+        print(f"{name:<22} {r['ops_per_sec']:>14,.0f} {r['p50_us']:>9.3f} {r['p99_us']:>9.3f} "
+              f"{r['peak_kib']:>10.1f} {delta:>8}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--only", nargs="*", help="workload names to run (default: all)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--batches", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--save", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="compare against this results JSON")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed throughput drop before failing (fraction, default 0.10)")
+    parser.add_argument("--list", action="store_true", help="list workloads and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for workload in WORKLOADS:
+            print(f"{workload.name:<22} {workload.description}")
+        return 0
+
+    results = run_suite(args.only, args.seed, args.batches, args.batch_size)
+    baseline = json.loads(args.baseline.read_text())["results"] if args.baseline else None
+    print_table(results, baseline)
+
+    if args.save:
+        args.save.write_text(json.dumps({
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "batches": args.batches,
+            "batch_size": args.batch_size,
+            "results": results,
+        }, indent=2))
+
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions above {args.threshold:.0%}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""
+State Machine Command Line
+==========================
+
+One entry point for the examples, replacing per-script invocation:
+
+    python StateMachine-Expt sim vending --events 100000 --machines 50
+    python StateMachine-Expt sim traffic --demo
+    python StateMachine-Expt bench --list
+    python StateMachine-Expt bench vending_engine --events 200000
+    python StateMachine-Expt replay machine.journal
+    python StateMachine-Expt replay server.journal --fleet 10000
+    python StateMachine-Expt visualize vending
+    python StateMachine-Expt render vending --out vending.png --active Idle
+    python StateMachine-Expt render vending --trace 100000 --animate --out trace.svg
+
+(``__main__.py`` makes the folder runnable; ``python cli.py ...`` from inside
+it works too.)
+
+Only ``argparse`` is imported up front.  Each subcommand imports what it
+needs when it runs, so the headless commands never load ``tkinter``, NumPy or
+``asyncio`` unless the chosen command uses them, and ``visualize`` is the only
+command that needs Tcl/Tk; ``render`` draws the same diagrams headlessly.
+``benchmarks/bench_startup.py`` measures the cold start of the headless
+commands against ``STARTUP_BUDGET_MS``.
+"""
+
+import argparse
+import os
+import sys
+
+
+# Cold start of a headless subcommand over a bare ``python -c pass``.
+STARTUP_BUDGET_MS = 50
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+
+# Modules the headless subcommands must not import.
+HEAVY_MODULES = ("tkinter", "numpy", "asyncio")
+
+
+def benchmark_names():
+    """Names accepted by ``bench``: ``bench_<name>.py`` files plus ``suite``"""
+    names = [name[len("bench_"):-len(".py")] for name in os.listdir(BENCHMARK_DIR)
+             if name.startswith("bench_") and name.endswith(".py")]
+    return sorted(names) + ["suite"]
+
+
+def run_sim(args):
+    if args.model == "vending":
+        return _sim_vending(args)
+    return _sim_traffic(args)
+
+
+def _sim_vending(args):
+    if args.demo:
+        from state_pattern_example import demonstrate_vending_machine
+
+        demonstrate_vending_machine()
+        return 0
+
+    import random
+    import time
+    from collections import Counter
+
+    from event_sinks import NULL_SINK
+    from state_pattern_example import VendingMachine
+    from vending_engine import apply_to_machine, random_events
+
+    rng = random.Random(args.seed)
+    machines = [VendingMachine(sink=NULL_SINK) for _ in range(args.machines)]
+    events = random_events(rng, args.events)
+    targets = [rng.randrange(args.machines) for _ in range(args.events)]
+
+    start = time.perf_counter()
+    for machine_id, (event, arg) in zip(targets, events):
+        apply_to_machine(machines[machine_id], event, arg)
+    elapsed = time.perf_counter() - start
+
+    states = Counter(machine.get_current_state() for machine in machines)
+    held = sum(machine.get_balance_cents() for machine in machines)
+    print(f"{args.events:,} events on {args.machines:,} machines in {elapsed * 1000:.0f} ms")
+    for state, count in sorted(states.items()):
+        print(f"  {state:<17} {count:>8,}")
+    print(f"Balance held: ${held / 100:,.2f}")
+    return 0
+
+
+def _sim_traffic(args):
+    if args.demo:
+        from traffic_light_sim import demonstrate_discrete_event_simulation
+
+        demonstrate_discrete_event_simulation()
+        return 0
+
+    import time
+
+    from traffic_light_sim import simulate_cycles
+
+    start = time.perf_counter()
+    simulator = simulate_cycles(args.cycles, record=False)
+    elapsed = time.perf_counter() - start
+    print(f"{args.cycles:,} cycles: {simulator.transition_count:,} transitions, "
+          f"{simulator.clock():,.1f}s of virtual time in {elapsed * 1000:.0f} ms")
+    return 0
+
+
+def run_bench(args):
+    if args.list or not args.name:
+        for name in benchmark_names():
+            print(name)
+        return 0
+    if args.name not in benchmark_names():
+        print(f"unknown benchmark {args.name!r}; try 'bench --list'", file=sys.stderr)
+        return 2
+
+    import runpy
+
+    filename = "suite.py" if args.name == "suite" else f"bench_{args.name}.py"
+    path = os.path.join(BENCHMARK_DIR, filename)
+    sys.argv = [path, *args.args]
+    try:
+        runpy.run_path(path, run_name="__main__")
+    except SystemExit as exc:
+        return exc.code or 0
+    return 0
+
+
+def run_replay(args):
+    if args.fleet:
+        from collections import Counter
+
+        from vending_server import replay_journal
+
+        try:
+            machines = replay_journal(args.path, args.fleet)
+        except (OSError, ValueError) as exc:
+            print(exc, file=sys.stderr)
+            return 1
+        states = Counter(machine.get_current_state() for machine in machines)
+        held = sum(machine.get_balance_cents() for machine in machines)
+        print(f"Replayed {args.path} onto {args.fleet:,} machines")
+        for state, count in sorted(states.items()):
+            print(f"  {state:<17} {count:>8,}")
+        print(f"Balance held: ${held / 100:,.2f}")
+        return 0
+
+    from event_sinks import NULL_SINK
+    from vending_journal import recover
+
+    try:
+        machine = recover(args.path, sink=NULL_SINK)
+    except (OSError, ValueError) as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    state, balance, selected = machine.snapshot()
+    print(f"Recovered {args.path}")
+    print(f"  state:    {state}")
+    print(f"  balance:  ${balance / 100:.2f}")
+    print(f"  selected: {selected.product_name if selected else '-'}")
+    return 0
+
+
+def run_visualize(args):
+    try:
+        import tkinter
+    except ImportError as exc:
+        print(f"visualize needs tkinter, which this Python lacks ({exc})", file=sys.stderr)
+        return 1
+
+    if args.model == "vending":
+        from ui.vending_machine_visualizer import VendingMachineVisualizer as Visualizer
+    else:
+        from ui.traffic_light_visualizer import TrafficLightVisualizer as Visualizer
+
+    try:
+        app = Visualizer()
+    except tkinter.TclError as exc:  # usually no display
+        print(f"cannot open a window: {exc}", file=sys.stderr)
+        return 1
+    app.mainloop()
+    return 0
+
+
+# Diagram size per model, as in the Tk visualizers.
+_GRAPH_SIZES = {"vending": (620, 300), "traffic": (520, 260)}
+
+
+def _state_graph(model):
+    from fsm_spec import SIMPLE_TRAFFIC_LIGHT_SPEC, VENDING_SPEC, graph_edges
+    from ui.graph_layout import GraphEdge, GraphNode, layout_graph
+
+    spec = VENDING_SPEC if model == "vending" else SIMPLE_TRAFFIC_LIGHT_SPEC
+    nodes = [GraphNode(state, state) for state in spec["states"]]
+    edges = [GraphEdge(src, dst, label) for src, dst, label in graph_edges(spec)]
+    return layout_graph(nodes, edges, *_GRAPH_SIZES[model])
+
+
+def _state_trace(model, events, seed):
+    """Active state after each of ``events`` random events (or light steps)"""
+    if model == "traffic":
+        from simple_traffic_light import SimpleTrafficLight
+
+        light = SimpleTrafficLight()
+        for _ in range(events):
+            light.next_light()
+            yield light.snapshot().color
+        return
+
+    import random
+
+    from event_sinks import NULL_SINK
+    from state_pattern_example import VendingMachine
+    from vending_engine import apply_to_machine, random_events
+
+    machine = VendingMachine(sink=NULL_SINK)
+    for event, arg in random_events(random.Random(seed), events):
+        apply_to_machine(machine, event, arg)
+        yield machine.get_current_state()
+
+
+def run_render(args):
+    import time
+
+    from ui.graph_render import PngGraphRenderer, SvgGraphRenderer, write_frames
+
+    layout = _state_graph(args.model)
+    renderers = {"svg": SvgGraphRenderer, "png": PngGraphRenderer}
+
+    if args.trace is None:
+        fmt = os.path.splitext(args.out)[1].lstrip(".").lower()
+        if fmt not in renderers:
+            print(f"cannot tell the format of {args.out}; use a .svg or .png name", file=sys.stderr)
+            return 2
+        if args.active is not None and args.active not in layout.positions:
+            print(f"unknown state {args.active!r}; states are {', '.join(layout.positions)}", file=sys.stderr)
+            return 2
+        with open(args.out, "wb") as file:
+            file.write(renderers[fmt](layout).frame(args.active))
+        print(f"Wrote {args.out}")
+        return 0
+
+    if args.animate:
+        if os.path.isdir(args.out):
+            print(f"--animate writes one SVG file, but {args.out} is a directory", file=sys.stderr)
+            return 2
+        if not args.out.lower().endswith(".svg"):
+            print(f"--animate writes one SVG file; use a .svg name instead of {args.out}", file=sys.stderr)
+            return 2
+
+    trace = list(_state_trace(args.model, args.trace, args.seed))
+    start = time.perf_counter()
+    if args.animate:
+        document = SvgGraphRenderer(layout).animate(trace, args.frame_seconds)
+        with open(args.out, "w", encoding="utf-8") as file:
+            file.write(document)
+        written = f"{args.out} ({len(document) / 1024:,.0f} KiB)"
+    else:
+        count = write_frames(renderers[args.format](layout), trace, args.out)
+        written = f"{count:,} {args.format.upper()} frames to {args.out}"
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {written} for {len(trace):,} events in {elapsed:.2f} s")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="statemachine", description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sim = commands.add_parser("sim", help="run a headless simulation")
+    sim.add_argument("model", choices=("vending", "traffic"))
+    sim.add_argument("--demo", action="store_true", help="run the narrated demo instead")
+    sim.add_argument("--events", type=int, default=100_000, help="vending: random events to apply")
+    sim.add_argument("--machines", type=int, default=100, help="vending: machines to spread them over")
+    sim.add_argument("--cycles", type=int, default=10_000, help="traffic: light cycles to simulate")
+    sim.add_argument("--seed", type=int, default=0)
+    sim.set_defaults(run=run_sim)
+
+    bench = commands.add_parser("bench", help="run a benchmark from benchmarks/")
+    bench.add_argument("name", nargs="?", help="benchmark name, e.g. vending_engine or suite")
+    bench.add_argument("args", nargs=argparse.REMAINDER, help="arguments passed to the benchmark")
+    bench.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    bench.set_defaults(run=run_bench)
+
+    replay = commands.add_parser(
+        "replay", help="rebuild machines from a journal",
+        description="Rebuild machines from a journal.  Only journals written with the default "
+                    "product catalog are supported; for a custom catalog, call "
+                    "vending_journal.recover or vending_server.replay_journal with catalog=.",
+    )
+    replay.add_argument("path")
+    replay.add_argument("--fleet", type=int, metavar="SIZE",
+                        help="read a vending_server fleet journal for SIZE machines")
+    replay.set_defaults(run=run_replay)
+
+    visualize = commands.add_parser("visualize", help="open a Tkinter visualizer")
+    visualize.add_argument("model", choices=("vending", "traffic"))
+    visualize.set_defaults(run=run_visualize)
+
+    render = commands.add_parser("render", help="write a state diagram as SVG or PNG, or animate a trace")
+    render.add_argument("model", choices=("vending", "traffic"))
+    render.add_argument("--out", required=True,
+                        help="image file (.svg/.png), frames directory with --trace, or .svg with --animate")
+    render.add_argument("--active", help="state to highlight in a single image")
+    render.add_argument("--trace", type=int, metavar="EVENTS", help="render the states of a random trace")
+    render.add_argument("--format", choices=("svg", "png"), default="svg", help="frame format with --trace")
+    render.add_argument("--animate", action="store_true", help="write the trace as one animated SVG")
+    render.add_argument("--frame-seconds", type=float, default=0.1)
+    render.add_argument("--seed", type=int, default=0)
+    render.set_defaults(run=run_render)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Structured Event Sinks
+======================
+
+State handlers and context classes report what happened as compact tuples
+``(kind, *args)`` instead of printing formatted strings.  Where those tuples
+go is decided by the sink attached to the context:
+
+- ``NullSink``         - drops everything; handlers check ``sink.enabled``
+                         first, so with no listener nothing is formatted,
+                         allocated or called
+- ``RingBufferSink``   - keeps the last N tuples in memory for queries
+- ``BatchedFileSink``  - writes tab-separated lines to a file in chunks
+- ``ConsoleSink``      - the original human-readable output
+
+``kind`` is a short string naming the event and ``args`` are plain values
+(numbers, names), so records stay cheap to store and easy to filter.
+"""
+
+import sys
+from collections import deque
+
+
+# Human-readable rendering for every event kind, used by ConsoleSink.
+# Vending amounts arrive as integer cents.
+MESSAGE_FORMATS = {
+    # VendingMachine
+    "state_changed": "State changed to: {0}".format,
+    "invalid_amount": "Please insert a valid amount.".format,
+    "inserted": lambda amount, total: f"Inserted ${amount / 100:.2f}. Total: ${total / 100:.2f}",
+    "insert_coins_first": "Please insert coins first.".format,
+    "insert_and_select_first": "Please insert coins and select a product first.".format,
+    "no_money_to_return": "No money to return.".format,
+    "selected": lambda name, price: f"Selected {name} (${price / 100:.2f})",
+    "selection_changed": lambda name, price: f"Changed selection to {name} (${price / 100:.2f})",
+    "sold_out": "{0} is sold out.".format,
+    "unknown_product": "No product in slot {0}.".format,
+    "insufficient_funds": lambda needed, name: f"Insufficient funds. Need ${needed / 100:.2f} more for {name}",
+    "select_product_first": "Please select a product first.".format,
+    "returning": lambda change: f"Returning ${change / 100:.2f}",
+    "dispensing": "Dispensing {0}...".format,
+    "returning_change": lambda change: f"Returning change: ${change / 100:.2f}",
+    "enjoy": "Enjoy your {0}!".format,
+    "cannot_dispense": "Cannot dispense product. Insufficient funds or no product selected.".format,
+    "exact_change_only": lambda change: f"Exact change only. Cannot return ${change / 100:.2f}",
+    "transaction_cancelled": lambda change: f"Transaction cancelled. Returning ${change / 100:.2f}",
+    "out_of_order_insert": "Machine is out of order. Cannot accept coins.".format,
+    "out_of_order_select": "Machine is out of order. Cannot select products.".format,
+    "out_of_order_dispense": "Machine is out of order. Cannot dispense products.".format,
+    "out_of_order_returning": lambda change: f"Machine out of order. Returning ${change / 100:.2f}",
+    # TrafficLight
+    "timer_expired": "{0} light timer expired. Switching to {1}.".format,
+    "light_changed": lambda color, can_cross: (
+        f"🚦 Traffic Light: {color} - {'SAFE TO CROSS' if can_cross else 'DO NOT CROSS'}"
+    ),
+}
+
+
+def format_event(kind, *args):
+    """Render one event the way the original print statements did"""
+    return MESSAGE_FORMATS[kind](*args)
+
+
+class NullSink:
+    """Sink for when nobody is listening"""
+
+    enabled = False
+
+    def emit(self, kind, *args):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class RingBufferSink:
+    """Bounded in-memory buffer of the most recent event tuples"""
+
+    enabled = True
+
+    def __init__(self, capacity=10_000):
+        self._events = deque(maxlen=capacity)
+
+    def emit(self, kind, *args):
+        self._events.append((kind, *args))
+
+    def __len__(self):
+        return len(self._events)
+
+    def __iter__(self):
+        return iter(self._events)
+
+    def events(self, kind=None):
+        """Return buffered tuples, optionally only those of one kind"""
+        if kind is None:
+            return list(self._events)
+        return [event for event in self._events if event[0] == kind]
+
+    def clear(self):
+        self._events.clear()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class BatchedFileSink:
+    """Append events to a file as tab-separated lines, one write per batch"""
+
+    enabled = True
+
+    def __init__(self, path, batch_size=4096):
+        self._file = open(path, "a", encoding="utf-8")
+        self._batch_size = batch_size
+        self._pending = []
+
+    def emit(self, kind, *args):
+        pending = self._pending
+        pending.append((kind, *args))
+        if len(pending) >= self._batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._file.write("".join(
+                "\t".join(map(str, event)) + "\n" for event in self._pending
+            ))
+            self._pending.clear()
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConsoleSink:
+    """The original human-readable output, one line per event"""
+
+    enabled = True
+
+    def __init__(self, stream=None):
+        # None means "whatever sys.stdout is at emit time"
+        self._stream = stream
+
+    def emit(self, kind, *args):
+        print(MESSAGE_FORMATS[kind](*args), file=self._stream or sys.stdout)
+
+    def flush(self):
+        (self._stream or sys.stdout).flush()
+
+    def close(self):
+        pass
+
+
+NULL_SINK = NullSink()
+CONSOLE_SINK = ConsoleSink()
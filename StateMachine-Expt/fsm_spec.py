@@ -0,0 +1,257 @@
+"""
+Declarative State Machine Specs
+===============================
+
+One declarative description per state machine, shared by everything that
+needs the transition structure:
+
+- ``vending_engine`` compiles ``VENDING_SPEC`` into its dense table
+- ``load_engine(spec)`` generates a specialized Python class with one method
+  per event and straight-line ``if state == ...`` dispatch, cached on disk
+  under ``.fsm_cache/`` by spec hash so it is generated only once
+- ``graph_edges(spec)`` gives the visualizers their nodes and edges
+
+A spec is a plain JSON-compatible dict:
+
+- ``states``      - state names; the index is the state code
+- ``initial``     - starting state
+- ``fields``      - extra per-instance data and its initial value expression
+- ``events``      - event name, generated method name and optional argument
+- ``prelude``     - statements run at the start of every event
+- ``guards``      - name -> boolean expression
+- ``actions``     - name -> list of statements
+- ``transitions`` - ``from`` (a state or "*" for every state not listed
+                    explicitly for that event), ``event``, optional ``guard``
+                    and ``action``, and ``to``
+
+Events with no transition for the current state are rejected and leave the
+machine unchanged.  Generated event methods return 0 when the event was
+accepted and 1 when it was rejected, like ``CompiledVendingMachine.fire``.
+"""
+
+import os
+
+from state_pattern_example import Product
+
+
+VENDING_SPEC = {
+    "name": "vending_machine",
+    "states": ["Idle", "Coin Inserted", "Product Selected", "Out of Order"],
+    "initial": "Idle",
+    "fields": {"balance": "0", "selected": "None", "last_change": "0"},
+    "events": [
+        {"name": "insert", "method": "insert_coin", "arg": "amount"},
+        {"name": "select", "method": "select_product", "arg": "product"},
+        {"name": "dispense", "method": "dispense_product"},
+        {"name": "return", "method": "return_change"},
+        {"name": "fault", "method": "set_out_of_order"},
+        {"name": "repair", "method": "set_operational"},
+    ],
+    "prelude": ["self.last_change = 0"],
+    "guards": {
+        "positive": "round(amount * 100) > 0",
+        "can_afford": "self.balance >= product.price_cents",
+        "can_dispense": "self.selected and self.balance >= self.selected.price_cents",
+        "has_balance": "self.balance > 0",
+    },
+    "actions": {
+        "credit": ["self.balance += round(amount * 100)"],
+        "select": ["self.selected = product"],
+        "dispense": [
+            "self.last_change = self.balance - self.selected.price_cents",
+            "self.balance = 0",
+            "self.selected = None",
+        ],
+        "refund": ["self.last_change = self.balance", "self.balance = 0"],
+        "refund_clear": [
+            "self.last_change = self.balance",
+            "self.balance = 0",
+            "self.selected = None",
+        ],
+    },
+    "transitions": [
+        {"from": "Idle", "event": "insert", "guard": "positive", "action": "credit", "to": "Coin Inserted"},
+        {"from": "Coin Inserted", "event": "insert", "guard": "positive", "action": "credit", "to": "Coin Inserted"},
+        {"from": "Coin Inserted", "event": "select", "guard": "can_afford", "action": "select", "to": "Product Selected"},
+        {"from": "Coin Inserted", "event": "return", "action": "refund", "to": "Idle"},
+        {"from": "Product Selected", "event": "insert", "guard": "positive", "action": "credit", "to": "Product Selected"},
+        {"from": "Product Selected", "event": "select", "guard": "can_afford", "action": "select", "to": "Product Selected"},
+        {"from": "Product Selected", "event": "dispense", "guard": "can_dispense", "action": "dispense", "to": "Idle"},
+        {"from": "Product Selected", "event": "return", "action": "refund_clear", "to": "Idle"},
+        {"from": "Out of Order", "event": "return", "guard": "has_balance", "action": "refund", "to": "Out of Order"},
+        {"from": "*", "event": "fault", "to": "Out of Order"},
+        {"from": "*", "event": "repair", "to": "Idle"},
+    ],
+}
+
+SIMPLE_TRAFFIC_LIGHT_SPEC = {
+    "name": "simple_traffic_light",
+    "states": ["RED", "GREEN", "YELLOW"],
+    "initial": "RED",
+    "fields": {},
+    "events": [{"name": "next", "method": "next_light"}],
+    "prelude": [],
+    "guards": {},
+    "actions": {},
+    "transitions": [
+        {"from": "RED", "event": "next", "to": "GREEN"},
+        {"from": "GREEN", "event": "next", "to": "YELLOW"},
+        {"from": "YELLOW", "event": "next", "to": "RED"},
+    ],
+}
+
+# Bump when the generated code changes shape so cached modules are rebuilt.
+GENERATOR_VERSION = 1
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".fsm_cache")
+
+_loaded = {}
+
+
+def expand_transitions(spec):
+    """Resolve wildcards; returns {(state, event): transition} in spec order"""
+    cells = {}
+    for transition in spec["transitions"]:
+        if transition["from"] != "*":
+            cells[(transition["from"], transition["event"])] = transition
+    for transition in spec["transitions"]:
+        if transition["from"] == "*":
+            for state in spec["states"]:
+                cells.setdefault((state, transition["event"]), transition)
+    return cells
+
+
+def spec_hash(spec):
+    """Stable hash of a spec and the generator version"""
+    # Imported here: only code generation needs them, and they would
+    # otherwise add to the start-up time of everything importing the specs.
+    import hashlib
+    import json
+
+    payload = json.dumps([GENERATOR_VERSION, spec], sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def graph_edges(spec):
+    """State-changing transitions as (src, dst, label) triples.
+
+    Parallel transitions between the same two states share one edge with a
+    combined label such as "return/repair".
+    """
+    labels = {}
+    for (state, event), transition in expand_transitions(spec).items():
+        if transition["to"] != state:
+            labels.setdefault((state, transition["to"]), []).append(event)
+    return [(src, dst, "/".join(events)) for (src, dst), events in labels.items()]
+
+
+def generate_source(spec):
+    """Python source for a class specialized to ``spec``"""
+    states = spec["states"]
+    code = {name: i for i, name in enumerate(states)}
+    cells = expand_transitions(spec)
+    fields = spec["fields"]
+    class_name = "".join(part.title() for part in spec["name"].split("_")) + "Engine"
+
+    lines = [
+        f'"""Generated from spec {spec["name"]!r} ({spec_hash(spec)[:16]}); do not edit."""',
+        "",
+        "",
+        f"class {class_name}:",
+        f"    STATE_NAMES = {tuple(states)!r}",
+        f"    __slots__ = {('state',) + tuple(fields)!r}",
+        "",
+        "    def __init__(self):",
+        f"        self.state = {code[spec['initial']]}",
+    ]
+    lines += [f"        self.{name} = {value}" for name, value in fields.items()]
+
+    for event in spec["events"]:
+        arg = event.get("arg")
+        lines += ["", f"    def {event['method']}(self{', ' + arg if arg else ''}):"]
+        lines += [f"        {statement}" for statement in spec.get("prelude", [])]
+
+        rows = [(code[state], cells.get((state, event["name"]))) for state in states]
+        if all(row == rows[0][1] for _, row in rows) and rows[0][1] is not None:
+            # Same transition from every state: no dispatch needed.
+            lines += _transition_body(spec, rows[0][1], None, code, "        ")
+            continue
+
+        lines.append("        state = self.state")
+        keyword = "if"
+        for state_code, transition in rows:
+            if transition is None:
+                continue
+            lines.append(f"        {keyword} state == {state_code}:")
+            lines += _transition_body(spec, transition, state_code, code, "            ")
+            keyword = "elif"
+        lines.append("        return 1")
+
+    lines += [
+        "",
+        "    def get_current_state(self):",
+        "        return self.STATE_NAMES[self.state]",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def _transition_body(spec, transition, state_code, code, indent):
+    body = []
+    guard = transition.get("guard")
+    if guard:
+        body += [f"{indent}if not ({spec['guards'][guard]}):", f"{indent}    return 1"]
+    action = transition.get("action")
+    if action:
+        body += [f"{indent}{statement}" for statement in spec["actions"][action]]
+    target = code[transition["to"]]
+    if target != state_code:
+        body.append(f"{indent}self.state = {target}")
+    body.append(f"{indent}return 0")
+    return body
+
+
+def load_engine(spec, cache_dir=CACHE_DIR):
+    """Return the generated engine class for ``spec``, generating it only if
+    no module for this spec hash is cached on disk"""
+    import importlib.util
+    from pathlib import Path
+
+    digest = spec_hash(spec)
+    if digest in _loaded:
+        return _loaded[digest]
+
+    path = Path(cache_dir) / f"{spec['name']}_{digest[:16]}.py"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(generate_source(spec), encoding="utf-8")
+        os.replace(tmp, path)
+
+    module_spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(module_spec)
+    module_spec.loader.exec_module(module)
+    engine_class = next(
+        value for name, value in vars(module).items()
+        if name.endswith("Engine") and isinstance(value, type)
+    )
+    _loaded[digest] = engine_class
+    return engine_class
+
+
+def demonstrate_generated_engine():
+    """Generate the vending engine and run a purchase through it"""
+    print("=== Generated Vending Engine ===\n")
+    print(generate_source(VENDING_SPEC).split("\n\n\n")[1][:600] + "...\n")
+
+    machine = load_engine(VENDING_SPEC)()
+    machine.insert_coin(1.00)
+    machine.insert_coin(0.50)
+    machine.select_product(Product.SODA)
+    machine.dispense_product()
+    print(f"State: {machine.get_current_state()}, change: ${machine.last_change / 100:.2f}")
+    print(f"Graph edges: {graph_edges(VENDING_SPEC)}")
+
+
+if __name__ == "__main__":
+    demonstrate_generated_engine()
@@ -0,0 +1,287 @@
+"""
+Prometheus Metrics Endpoint
+===========================
+
+An opt-in HTTP endpoint that serves state machine metrics in the Prometheus
+text exposition format.  Nothing is collected or served unless a
+``FleetMetrics`` observer is attached and a server is started.
+
+``FleetMetrics`` is a transition observer (see ``state_observers``) for any
+number of ``VendingMachine``, ``TrafficLight`` and ``SimpleTrafficLight``
+contexts.  It exposes:
+
+- ``fsm_transitions_total``            - counter per context class and (from, to)
+- ``fsm_transitions_per_second``       - rate since the previous scrape
+- ``fsm_machines``                     - watched contexts per class and state
+- ``vending_balance_dollars``          - money held by the watched vending machines
+- ``fsm_transition_latency_seconds``   - histogram of event handling time,
+                                         recorded by ``timed(fn)`` wrappers
+
+The hot path takes no locks: every thread writes to its own shard (a few
+plain dicts and lists, created on the thread's first update) and a scrape
+sums the shards.  Only scrapes, which are rare, take a lock.
+
+Two ways to serve ``/metrics``:
+
+- ``start_http_server(metrics, port)``     - a daemon thread
+- ``await serve_metrics(metrics, port)``   - on the running asyncio loop
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.request import urlopen
+
+from event_sinks import NULL_SINK
+from state_observers import bucket_upper_bound, dwell_bucket
+from state_pattern_example import VendingMachine
+from vending_engine import apply_to_machine, random_events
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency histogram buckets: 1 us, 2 us, 4 us, ... about 4 s, then +Inf
+LATENCY_BUCKETS = 23
+
+
+class _Shard:
+    """One thread's private counters"""
+
+    __slots__ = ("transitions", "states", "latency", "latency_sum")
+
+    def __init__(self):
+        self.transitions = Counter()  # (class, from, to) -> count
+        self.states = Counter()       # (class, state) -> net contexts entered
+        self.latency = [0] * (LATENCY_BUCKETS + 1)
+        self.latency_sum = 0.0
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class FleetMetrics:
+    """Sharded transition, state, balance and latency metrics"""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self._local = threading.local()
+        self._shards = []
+        self._vending = []
+        self._gauges = []
+        self._scrape_lock = threading.Lock()
+        self._last_scrape = (clock(), 0)
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard()
+            self._shards.append(shard)  # list.append is atomic
+            return shard
+
+    def watch(self, context):
+        """Start observing ``context`` and count it in its current state"""
+        shard = self._shard()
+        shard.states[(type(context).__name__, context._current_state.name)] += 1
+        if hasattr(context, "get_balance_cents"):
+            self._vending.append(context)
+        context.add_observer(self)
+
+    def on_transition(self, context, old_state, new_state):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        kind = type(context).__name__
+        old = old_state.name
+        new = new_state.name
+        shard.transitions[(kind, old, new)] += 1
+        states = shard.states
+        states[(kind, old)] -= 1
+        states[(kind, new)] += 1
+
+    def record_latency(self, seconds):
+        """Add one event handling time to the latency histogram"""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        shard.latency[min(dwell_bucket(seconds), LATENCY_BUCKETS)] += 1
+        shard.latency_sum += seconds
+
+    def timed(self, fn):
+        """Wrap ``fn`` so every call is recorded in the latency histogram"""
+        clock = self.clock
+        record = self.record_latency
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(clock() - start)
+
+        return wrapper
+
+    def add_gauge(self, name, help_text, fn):
+        """Expose ``fn()`` as an extra gauge on every scrape"""
+        self._gauges.append((name, help_text, fn))
+
+    def _totals(self):
+        transitions = Counter()
+        states = Counter()
+        latency = [0] * (LATENCY_BUCKETS + 1)
+        latency_sum = 0.0
+        for shard in list(self._shards):
+            transitions.update(shard.transitions.copy())
+            states.update(shard.states.copy())
+            for i, n in enumerate(shard.latency):
+                latency[i] += n
+            latency_sum += shard.latency_sum
+        return transitions, states, latency, latency_sum
+
+    def render(self):
+        """The current metrics in Prometheus text format"""
+        with self._scrape_lock:
+            transitions, states, latency, latency_sum = self._totals()
+            now = self.clock()
+            total = sum(transitions.values())
+            then, previous = self._last_scrape
+            rate = (total - previous) / (now - then) if now > then else 0.0
+            self._last_scrape = (now, total)
+
+        lines = [
+            "# HELP fsm_transitions_total State transitions observed.",
+            "# TYPE fsm_transitions_total counter",
+        ]
+        for (kind, old, new), n in sorted(transitions.items()):
+            lines.append(f"fsm_transitions_total{_labels(machine=kind, **{'from': old, 'to': new})} {n}")
+
+        lines += [
+            "# HELP fsm_transitions_per_second Transitions per second since the previous scrape.",
+            "# TYPE fsm_transitions_per_second gauge",
+            f"fsm_transitions_per_second {rate:.6g}",
+            "# HELP fsm_machines Watched machines in each state.",
+            "# TYPE fsm_machines gauge",
+        ]
+        for (kind, state), n in sorted(states.items()):
+            lines.append(f"fsm_machines{_labels(machine=kind, state=state)} {n}")
+
+        if self._vending:
+            balance = sum(machine.get_balance_cents() for machine in list(self._vending)) / 100
+            lines += [
+                "# HELP vending_balance_dollars Money held by the watched vending machines.",
+                "# TYPE vending_balance_dollars gauge",
+                f"vending_balance_dollars {balance:.2f}",
+            ]
+
+        lines += [
+            "# HELP fsm_transition_latency_seconds Event handling time.",
+            "# TYPE fsm_transition_latency_seconds histogram",
+        ]
+        cumulative = 0
+        for i in range(LATENCY_BUCKETS):
+            cumulative += latency[i]
+            lines.append(f'fsm_transition_latency_seconds_bucket{{le="{bucket_upper_bound(i):.9g}"}} {cumulative}')
+        cumulative += latency[LATENCY_BUCKETS]
+        lines += [
+            f'fsm_transition_latency_seconds_bucket{{le="+Inf"}} {cumulative}',
+            f"fsm_transition_latency_seconds_sum {latency_sum:.9g}",
+            f"fsm_transition_latency_seconds_count {cumulative}",
+        ]
+
+        for name, help_text, fn in self._gauges:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {fn():.6g}"]
+
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    metrics = None  # set on the per-server subclass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(metrics, port=9100, host="127.0.0.1"):
+    """Serve ``/metrics`` from a daemon thread; returns the server (``shutdown()`` to stop)"""
+    handler = type("MetricsHandler", (_MetricsHandler,), {"metrics": metrics})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+async def serve_metrics(metrics, port=9100, host="127.0.0.1"):
+    """Serve ``/metrics`` on the running asyncio loop; returns the asyncio Server"""
+
+    async def handle(reader, writer):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request.split()
+            if len(parts) >= 2 and parts[0] == b"GET" and parts[1].split(b"?")[0] == b"/metrics":
+                body = metrics.render().encode("utf-8")
+                head = f"HTTP/1.1 200 OK\r\nContent-Type: {CONTENT_TYPE}\r\n"
+            else:
+                body = b"not found\n"
+                head = "HTTP/1.1 404 Not Found\r\nContent-Type: text/plain\r\n"
+            writer.write(f"{head}Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("ascii") + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+def demonstrate_metrics_server():
+    """Drive a small fleet on worker threads and scrape the endpoint once"""
+    print("=== Prometheus Metrics Endpoint ===\n")
+    metrics = FleetMetrics()
+    machines = [VendingMachine(sink=NULL_SINK) for _ in range(100)]
+    for machine in machines:
+        metrics.watch(machine)
+    apply = metrics.timed(apply_to_machine)
+
+    def drive(seed, group):
+        rng = random.Random(seed)
+        for event, arg in random_events(rng, 20_000):
+            apply(rng.choice(group), event, arg)
+
+    threads = [threading.Thread(target=drive, args=(i, machines[i::4])) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    server = start_http_server(metrics, port=0)
+    port = server.server_address[1]
+    with urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+        text = response.read().decode("utf-8")
+    server.shutdown()
+    print("\n".join(line for line in text.splitlines()
+                    if line.startswith(("fsm_machines", "vending_balance", "fsm_transition_latency_seconds_count"))))
+
+
+if __name__ == "__main__":
+    demonstrate_metrics_server()
@@ -0,0 +1,178 @@
+"""
+Product Catalog
+===============
+
+A runtime-editable catalog of products for ``VendingMachine``.  A product
+is any object with ``product_name`` and ``price_cents`` (the ``Product``
+enum members or ``CatalogItem``).  ``ProductCatalog`` keeps:
+
+- a dict from SKU to product and one from slot code (``"A1"``) to SKU, so
+  lookups by either are O(1)
+- a price index: a sorted list of ``(price_cents, sku)`` pairs, so "what can
+  this balance afford" is a ``bisect`` and returns a slice
+  (``affordable(balance_cents)``)
+- a stable small-integer index per SKU (``index(product)``,
+  ``product_at(index)``), for the stock columns, journal records and ledger
+  entries that store products as numbers.  Indices follow insertion order
+  and are never reused, so a removed product still decodes; the default
+  catalog's indices are the ``PRODUCTS`` order.
+
+Adding, removing or repricing one product touches one dict entry and one
+position in the price index; nothing is rebuilt.
+"""
+
+from bisect import bisect_right, insort
+
+
+class CatalogItem:
+    """A product defined at runtime"""
+
+    __slots__ = ("sku", "product_name", "price_cents")
+
+    def __init__(self, sku, product_name, price_cents):
+        self.sku = sku
+        self.product_name = product_name
+        self.price_cents = price_cents
+
+    @property
+    def price(self):
+        """Price in dollars, for display"""
+        return self.price_cents / 100
+
+    def __repr__(self):
+        return f"CatalogItem({self.sku!r}, {self.product_name!r}, {self.price_cents})"
+
+
+def _slot_order(item):
+    """Sort key of a ``(slot, sku)`` pair: row letters, then the slot number"""
+    slot = item[0]
+    row = slot.rstrip("0123456789")
+    number = slot[len(row):]
+    return row, int(number) if number else -1, slot
+
+
+class ProductCatalog:
+    """Products by SKU and slot code, with a sorted price index"""
+
+    def __init__(self):
+        self._by_sku = {}
+        self._slot_sku = {}   # slot code -> sku
+        self._sku_slot = {}   # sku -> slot code
+        self._prices = []     # sorted (price_cents, sku)
+        self._sku_index = {}  # sku -> index, kept after removal
+        self._index = {}      # product -> index
+        self._products = []   # index -> product
+
+    @classmethod
+    def from_products(cls, products, row="A"):
+        """Catalog of existing products (e.g. the ``Product`` enum) in slots A1, A2, ..."""
+        catalog = cls()
+        for i, product in enumerate(products, 1):
+            catalog.add(product.name, product, f"{row}{i}")
+        return catalog
+
+    def add(self, sku, product, slot=None):
+        """Add ``product`` under ``sku`` and optionally a slot code"""
+        if sku in self._by_sku:
+            raise ValueError(f"SKU {sku!r} is already in the catalog")
+        if slot is not None and slot in self._slot_sku:
+            raise ValueError(f"slot {slot!r} already holds {self._slot_sku[slot]!r}")
+        self._by_sku[sku] = product
+        insort(self._prices, (product.price_cents, sku))
+        index = self._sku_index.setdefault(sku, len(self._products))
+        if index == len(self._products):
+            self._products.append(product)
+        else:
+            self._products[index] = product
+        self._index[product] = index
+        if slot is not None:
+            self._slot_sku[slot] = sku
+            self._sku_slot[sku] = slot
+        return product
+
+    def remove(self, sku):
+        """Remove a product; returns it"""
+        product = self._by_sku.pop(sku)
+        self._drop_price(product.price_cents, sku)
+        slot = self._sku_slot.pop(sku, None)
+        if slot is not None:
+            del self._slot_sku[slot]
+        return product
+
+    def _drop_price(self, price_cents, sku):
+        prices = self._prices
+        i = bisect_right(prices, (price_cents, sku)) - 1
+        if i < 0 or prices[i] != (price_cents, sku):
+            raise KeyError(sku)
+        del prices[i]
+
+    def set_price(self, sku, price_cents):
+        """Reprice one product, moving only its price index entry"""
+        product = self._by_sku[sku]
+        if not isinstance(product, CatalogItem):
+            raise TypeError(f"{sku!r} has a fixed price; add it as a CatalogItem to reprice it")
+        self._drop_price(product.price_cents, sku)
+        product.price_cents = price_cents
+        insort(self._prices, (price_cents, sku))
+
+    def assign_slot(self, sku, slot):
+        """Move ``sku`` to ``slot`` (freeing its old slot)"""
+        if sku not in self._by_sku:
+            raise KeyError(sku)
+        holder = self._slot_sku.get(slot)
+        if holder is not None and holder != sku:
+            raise ValueError(f"slot {slot!r} already holds {holder!r}")
+        old = self._sku_slot.pop(sku, None)
+        if old is not None:
+            del self._slot_sku[old]
+        self._slot_sku[slot] = sku
+        self._sku_slot[sku] = slot
+
+    def get(self, code):
+        """Product for a slot code or SKU, or None"""
+        sku = self._slot_sku.get(code, code)
+        return self._by_sku.get(sku)
+
+    def slot_of(self, sku):
+        return self._sku_slot.get(sku)
+
+    def index(self, product):
+        """Stable index of a product added to this catalog"""
+        try:
+            return self._index[product]
+        except KeyError:
+            raise ValueError(f"{product!r} was never added to this catalog") from None
+
+    def product_at(self, index):
+        """Product most recently added under the SKU with ``index``"""
+        return self._products[index]
+
+    def index_count(self):
+        """Number of indices assigned so far (one past the highest)"""
+        return len(self._products)
+
+    def affordable(self, balance_cents):
+        """``(price_cents, sku)`` pairs a balance can pay for, cheapest first"""
+        return self._prices[:bisect_right(self._prices, (balance_cents, "\U0010ffff"))]
+
+    def count_affordable(self, balance_cents):
+        return bisect_right(self._prices, (balance_cents, "\U0010ffff"))
+
+    def cheapest(self):
+        """Lowest ``(price_cents, sku)``, or None for an empty catalog"""
+        return self._prices[0] if self._prices else None
+
+    def slots(self):
+        """``(slot, product)`` pairs by row, then slot number (A2 before A10)"""
+        by_sku = self._by_sku
+        return [(slot, by_sku[sku]) for slot, sku in sorted(self._slot_sku.items(), key=_slot_order)]
+
+    def __len__(self):
+        return len(self._by_sku)
+
+    def __contains__(self, code):
+        return self.get(code) is not None
+
+    def __iter__(self):
+        """``(sku, product)`` pairs in insertion order"""
+        return iter(self._by_sku.items())
@@ -7,11 +7,23 @@ without complex timing logic.
 """
 
 from abc import ABC, abstractmethod
+from collections import namedtuple
+from types import MappingProxyType
+
+
+# Everything a light reports depends only on its state
+LightStatus = namedtuple("LightStatus", "color action pedestrians_can_cross")
 
 
 class TrafficLightState(ABC):
     """Abstract base class for traffic light states"""
     
+    def __init__(self):
+        # Built once per (flyweight) state so status queries never allocate
+        self.name = self.get_color()
+        self.status = LightStatus(self.name, self.get_action(), self.can_cross())
+        self.status_dict = MappingProxyType(self.status._asdict())
+    
     @abstractmethod
     def next_state(self, traffic_light):
         """Transition to the next state"""
@@ -75,39 +87,60 @@ class GreenLightState(TrafficLightState):
         return "GO"
 
 
+# States hold no per-light data, so every light shares one flyweight of each
+RED_STATE = RedLightState()
+YELLOW_STATE = YellowLightState()
+GREEN_STATE = GreenLightState()
+
+
 class SimpleTrafficLight:
     """Simplified traffic light context class"""
     
+    __slots__ = ("_current_state", "_observers")
+    
+    # All states (shared flyweights)
+    red_state = RED_STATE
+    yellow_state = YELLOW_STATE
+    green_state = GREEN_STATE
+    
     def __init__(self):
-        # Initialize all states
-        self.red_state = RedLightState()
-        self.yellow_state = YellowLightState()
-        self.green_state = GreenLightState()
-        
         # Start with red light
         self._current_state = self.red_state
+        self._observers = ()
+    
+    def add_observer(self, observer):
+        """Call ``observer.on_transition(self, old_state, new_state)`` on every state change"""
+        self._observers += (observer,)
+    
+    def remove_observer(self, observer):
+        self._observers = tuple(o for o in self._observers if o is not observer)
     
     def set_state(self, state):
         """Change the current state"""
-        self._current_state = state
+        if self._observers:
+            previous, self._current_state = self._current_state, state
+            for observer in self._observers:
+                observer.on_transition(self, previous, state)
+        else:
+            self._current_state = state
     
     def next_light(self):
         """Advance to the next light in sequence"""
         self._current_state.next_state(self)
     
     def get_status(self):
-        """Get current status information"""
-        return {
-            'color': self._current_state.get_color(),
-            'action': self._current_state.get_action(),
-            'pedestrians_can_cross': self._current_state.can_cross()
-        }
+        """Get current status information (a shared, read-only mapping)"""
+        return self._current_state.status_dict
+    
+    def snapshot(self):
+        """Get the current status as an immutable LightStatus record"""
+        return self._current_state.status
     
     def display_status(self):
         """Display current status"""
-        status = self.get_status()
-        crossing = "YES" if status['pedestrians_can_cross'] else "NO"
-        print(f"🚦 {status['color']} - {status['action']} | Pedestrians cross: {crossing}")
+        status = self._current_state.status
+        crossing = "YES" if status.pedestrians_can_cross else "NO"
+        print(f"🚦 {status.color} - {status.action} | Pedestrians cross: {crossing}")
 
 
 def demonstrate_simple_traffic_light():
@@ -0,0 +1,163 @@
+"""
+State Transition Observers
+==========================
+
+``VendingMachine``, ``TrafficLight`` and ``SimpleTrafficLight`` accept
+observers through ``add_observer``/``remove_observer``.  On every
+``set_state`` each observer's ``on_transition(context, old_state, new_state)``
+is called with the (flyweight) state objects, which all carry a ``name``
+(the vending state name or the light color).  A context with no observers
+pays a single falsy-tuple check per transition.
+
+``MetricsObserver`` is the built-in observer.  It counts transitions per
+``(from, to)`` pair of state names and records how long each context stayed
+in a state in a fixed histogram of log-scale buckets.  The buckets never
+depend on the data, so observers from different contexts, threads or
+processes merge by plain addition (``merge``), and ``to_dict``/``from_dict``
+move them across process boundaries as JSON-compatible data.
+
+Bucket ``i`` holds dwell times below ``DWELL_BASE * 2**i`` seconds (1 us,
+2 us, 4 us, ...); the last bucket also takes everything longer.
+"""
+
+import math
+import time
+from collections import Counter
+
+from event_sinks import NULL_SINK
+from state_pattern_example import Product, VendingMachine
+from traffic_light_sim import VirtualClock
+from traffic_light_state import TrafficLight
+
+
+DWELL_BASE = 1e-6
+DWELL_BUCKETS = 42  # up to 2**41 us, about 25 days
+
+
+def dwell_bucket(seconds):
+    """Index of the histogram bucket for a dwell time"""
+    if seconds < DWELL_BASE:
+        return 0
+    return min(math.frexp(seconds / DWELL_BASE)[1], DWELL_BUCKETS - 1)
+
+
+def bucket_upper_bound(index):
+    """Upper bound in seconds of bucket ``index``"""
+    return DWELL_BASE * 2 ** index
+
+
+class MetricsObserver:
+    """Per-transition counters and per-state dwell-time histograms"""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.transitions = Counter()  # (from name, to name) -> count
+        self.dwell = {}               # state name -> [count per bucket]
+        self._entered = {}            # context -> clock time it entered its state
+
+    def watch(self, context):
+        """Attach to ``context`` and start timing its current state"""
+        self._entered[context] = self.clock()
+        context.add_observer(self)
+
+    def unwatch(self, context):
+        context.remove_observer(self)
+        self._entered.pop(context, None)
+
+    def on_transition(self, context, old_state, new_state):
+        now = self.clock()
+        old = old_state.name
+        self.transitions[(old, new_state.name)] += 1
+
+        entered = self._entered.get(context)
+        if entered is not None:
+            histogram = self.dwell.get(old)
+            if histogram is None:
+                histogram = self.dwell[old] = [0] * DWELL_BUCKETS
+            histogram[dwell_bucket(now - entered)] += 1
+        self._entered[context] = now
+
+    def merge(self, other):
+        """Add another observer's counts into this one and return self"""
+        self.transitions.update(other.transitions)
+        for state, counts in other.dwell.items():
+            histogram = self.dwell.setdefault(state, [0] * DWELL_BUCKETS)
+            for i, n in enumerate(counts):
+                histogram[i] += n
+        return self
+
+    def dwell_percentile(self, state, fraction):
+        """Upper bound (seconds) of the bucket holding the given dwell percentile"""
+        histogram = self.dwell.get(state)
+        if not histogram:
+            return 0.0
+        target = fraction * sum(histogram)
+        seen = 0
+        for i, n in enumerate(histogram):
+            seen += n
+            if n and seen >= target:
+                return bucket_upper_bound(i)
+        return bucket_upper_bound(DWELL_BUCKETS - 1)
+
+    def to_dict(self):
+        """JSON-compatible counts (the per-context timers are not included)"""
+        return {
+            "transitions": [[old, new, n] for (old, new), n in sorted(self.transitions.items())],
+            "dwell": {state: list(counts) for state, counts in sorted(self.dwell.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data, clock=time.perf_counter):
+        observer = cls(clock)
+        for old, new, n in data["transitions"]:
+            observer.transitions[(old, new)] = n
+        observer.dwell = {state: list(counts) for state, counts in data["dwell"].items()}
+        return observer
+
+    def __getstate__(self):
+        # Contexts being timed stay with the process that watches them.
+        state = dict(self.__dict__)
+        state["_entered"] = {}
+        return state
+
+    def summary(self):
+        """Lines describing the transition counts and dwell percentiles"""
+        lines = [f"{old} -> {new}: {n}" for (old, new), n in sorted(self.transitions.items())]
+        for state in sorted(self.dwell):
+            lines.append(
+                f"dwell {state}: n={sum(self.dwell[state])} "
+                f"p50<={self.dwell_percentile(state, 0.5):g}s p99<={self.dwell_percentile(state, 0.99):g}s"
+            )
+        return lines
+
+
+def demonstrate_metrics_observer():
+    """Watch a simulated traffic light and a few vending machines"""
+    print("=== State Transition Metrics ===\n")
+
+    clock = VirtualClock()
+    light = TrafficLight(clock=clock, sink=NULL_SINK)
+    light_metrics = MetricsObserver(clock)
+    light_metrics.watch(light)
+    for _ in range(300):
+        clock.advance_to(light.get_deadline())
+        light.check_timer()
+    print("\n".join(light_metrics.summary()))
+
+    # One observer per machine, merged afterwards (as per-process results would be)
+    merged = MetricsObserver()
+    for _ in range(3):
+        machine = VendingMachine(sink=NULL_SINK)
+        metrics = MetricsObserver()
+        metrics.watch(machine)
+        machine.insert_coin(1.00)
+        machine.insert_coin(0.50)
+        machine.select_product(Product.SODA)
+        machine.dispense_product()
+        merged.merge(MetricsObserver.from_dict(metrics.to_dict()))
+    print()
+    print("\n".join(line for line in merged.summary() if "->" in line))
+
+
+if __name__ == "__main__":
+    demonstrate_metrics_observer()
@@ -12,22 +12,39 @@ It appears as if the object changed its class.
 from abc import ABC, abstractmethod
 from enum import Enum
 
+from event_sinks import CONSOLE_SINK
+from product_catalog import ProductCatalog
+
+
+def to_cents(amount):
+    """Convert a dollar amount to integer cents"""
+    return int(round(amount * 100))
+
 
 class Product(Enum):
-    """Available products in the vending machine"""
-    SODA = ("Soda", 1.50)
-    CHIPS = ("Chips", 1.25)
-    CANDY = ("Candy", 1.00)
-    WATER = ("Water", 1.00)
+    """Available products in the vending machine (prices in cents)"""
+    SODA = ("Soda", 150)
+    CHIPS = ("Chips", 125)
+    CANDY = ("Candy", 100)
+    WATER = ("Water", 100)
     
-    def __init__(self, name, price):
+    def __init__(self, name, price_cents):
         self.product_name = name
-        self.price = price
+        self.price_cents = price_cents
+        self.price = price_cents / 100  # dollars, for display
+
+
+# Default catalog: the Product members in slots A1..A4, keyed by member name
+DEFAULT_CATALOG = ProductCatalog.from_products(Product)
 
 
 class VendingMachineState(ABC):
     """Abstract base class for all vending machine states"""
     
+    def __init__(self):
+        # Cached so snapshots do not call get_state_name()
+        self.name = self.get_state_name()
+    
     @abstractmethod
     def insert_coin(self, machine, amount):
         pass
@@ -47,28 +64,45 @@ class VendingMachineState(ABC):
     @abstractmethod
     def get_state_name(self):
         pass
+    
+    @staticmethod
+    def lookup_product(machine, product):
+        """Resolve a slot code or SKU through the machine's catalog (None if unknown)"""
+        if not isinstance(product, str):
+            return product
+        found = machine.catalog.get(product)
+        if found is None and machine.sink.enabled:
+            machine.sink.emit("unknown_product", product)
+        return found
 
 
 class IdleState(VendingMachineState):
     """State when the machine is waiting for coins"""
     
     def insert_coin(self, machine, amount):
-        if amount <= 0:
-            print("Please insert a valid amount.")
+        sink = machine.sink
+        cents = to_cents(amount)
+        if cents <= 0:
+            if sink.enabled:
+                sink.emit("invalid_amount")
             return
         
-        machine.add_money(amount)
-        print(f"Inserted ${amount:.2f}. Total: ${machine.get_balance():.2f}")
+        machine.add_cents(cents)
+        if sink.enabled:
+            sink.emit("inserted", cents, machine.get_balance_cents())
         machine.set_state(machine.coin_inserted_state)
     
     def select_product(self, machine, product):
-        print("Please insert coins first.")
+        if machine.sink.enabled:
+            machine.sink.emit("insert_coins_first")
     
     def dispense_product(self, machine):
-        print("Please insert coins and select a product first.")
+        if machine.sink.enabled:
+            machine.sink.emit("insert_and_select_first")
     
     def return_change(self, machine):
-        print("No money to return.")
+        if machine.sink.enabled:
+            machine.sink.emit("no_money_to_return")
     
     def get_state_name(self):
         return "Idle"
@@ -78,29 +112,45 @@ class CoinInsertedState(VendingMachineState):
     """State when coins have been inserted but no product selected"""
     
     def insert_coin(self, machine, amount):
-        if amount <= 0:
-            print("Please insert a valid amount.")
+        sink = machine.sink
+        cents = to_cents(amount)
+        if cents <= 0:
+            if sink.enabled:
+                sink.emit("invalid_amount")
             return
         
-        machine.add_money(amount)
-        print(f"Inserted ${amount:.2f}. Total: ${machine.get_balance():.2f}")
+        machine.add_cents(cents)
+        if sink.enabled:
+            sink.emit("inserted", cents, machine.get_balance_cents())
     
     def select_product(self, machine, product):
-        if machine.get_balance() >= product.price:
+        product = self.lookup_product(machine, product)
+        if product is None:
+            return
+        sink = machine.sink
+        stock = machine.stock
+        if stock is not None and not stock.remaining(product):
+            if sink.enabled:
+                sink.emit("sold_out", product.product_name)
+            return
+        if machine.get_balance_cents() >= product.price_cents:
             machine.set_selected_product(product)
-            print(f"Selected {product.product_name} (${product.price:.2f})")
+            if sink.enabled:
+                sink.emit("selected", product.product_name, product.price_cents)
             machine.set_state(machine.product_selected_state)
-        else:
-            needed = product.price - machine.get_balance()
-            print(f"Insufficient funds. Need ${needed:.2f} more for {product.product_name}")
+        elif sink.enabled:
+            needed = product.price_cents - machine.get_balance_cents()
+            sink.emit("insufficient_funds", needed, product.product_name)
     
     def dispense_product(self, machine):
-        print("Please select a product first.")
+        if machine.sink.enabled:
+            machine.sink.emit("select_product_first")
     
     def return_change(self, machine):
-        change = machine.get_balance()
+        change = machine.get_balance_cents()
         machine.reset_balance()
-        print(f"Returning ${change:.2f}")
+        if machine.sink.enabled:
+            machine.sink.emit("returning", change)
         machine.set_state(machine.idle_state)
     
     def get_state_name(self):
@@ -111,44 +161,68 @@ class ProductSelectedState(VendingMachineState):
     """State when a product has been selected and payment is sufficient"""
     
     def insert_coin(self, machine, amount):
-        if amount <= 0:
-            print("Please insert a valid amount.")
+        sink = machine.sink
+        cents = to_cents(amount)
+        if cents <= 0:
+            if sink.enabled:
+                sink.emit("invalid_amount")
             return
         
-        machine.add_money(amount)
-        print(f"Inserted ${amount:.2f}. Total: ${machine.get_balance():.2f}")
+        machine.add_cents(cents)
+        if sink.enabled:
+            sink.emit("inserted", cents, machine.get_balance_cents())
     
     def select_product(self, machine, product):
-        if machine.get_balance() >= product.price:
+        product = self.lookup_product(machine, product)
+        if product is None:
+            return
+        sink = machine.sink
+        stock = machine.stock
+        if stock is not None and not stock.remaining(product):
+            if sink.enabled:
+                sink.emit("sold_out", product.product_name)
+            return
+        if machine.get_balance_cents() >= product.price_cents:
             machine.set_selected_product(product)
-            print(f"Changed selection to {product.product_name} (${product.price:.2f})")
-        else:
-            needed = product.price - machine.get_balance()
-            print(f"Insufficient funds. Need ${needed:.2f} more for {product.product_name}")
+            if sink.enabled:
+                sink.emit("selection_changed", product.product_name, product.price_cents)
+        elif sink.enabled:
+            needed = product.price_cents - machine.get_balance_cents()
+            sink.emit("insufficient_funds", needed, product.product_name)
     
     def dispense_product(self, machine):
+        sink = machine.sink
         product = machine.get_selected_product()
-        if product and machine.get_balance() >= product.price:
-            print(f"Dispensing {product.product_name}...")
-            
+        if product and machine.get_balance_cents() >= product.price_cents:
             # Calculate change
-            change = machine.get_balance() - product.price
+            change = machine.get_balance_cents() - product.price_cents
+            coins = machine.coins
+            if coins is not None and coins.complete_sale(change) is None:
+                if sink.enabled:
+                    sink.emit("exact_change_only", change)
+                return
+            
+            if machine.stock is not None:
+                machine.stock.take(product)
+            if sink.enabled:
+                sink.emit("dispensing", product.product_name)
             machine.reset_balance()
             machine.set_selected_product(None)
             
-            if change > 0:
-                print(f"Returning change: ${change:.2f}")
-            
-            print(f"Enjoy your {product.product_name}!")
+            if sink.enabled:
+                if change > 0:
+                    sink.emit("returning_change", change)
+                sink.emit("enjoy", product.product_name)
             machine.set_state(machine.idle_state)
-        else:
-            print("Cannot dispense product. Insufficient funds or no product selected.")
+        elif sink.enabled:
+            sink.emit("cannot_dispense")
     
     def return_change(self, machine):
-        change = machine.get_balance()
+        change = machine.get_balance_cents()
         machine.reset_balance()
         machine.set_selected_product(None)
-        print(f"Transaction cancelled. Returning ${change:.2f}")
+        if machine.sink.enabled:
+            machine.sink.emit("transaction_cancelled", change)
         machine.set_state(machine.idle_state)
     
     def get_state_name(self):
@@ -159,65 +233,118 @@ class OutOfOrderState(VendingMachineState):
     """State when the machine is out of order"""
     
     def insert_coin(self, machine, amount):
-        print("Machine is out of order. Cannot accept coins.")
+        if machine.sink.enabled:
+            machine.sink.emit("out_of_order_insert")
     
     def select_product(self, machine, product):
-        print("Machine is out of order. Cannot select products.")
+        if machine.sink.enabled:
+            machine.sink.emit("out_of_order_select")
     
     def dispense_product(self, machine):
-        print("Machine is out of order. Cannot dispense products.")
+        if machine.sink.enabled:
+            machine.sink.emit("out_of_order_dispense")
     
     def return_change(self, machine):
-        if machine.get_balance() > 0:
-            change = machine.get_balance()
+        sink = machine.sink
+        if machine.get_balance_cents() > 0:
+            change = machine.get_balance_cents()
             machine.reset_balance()
-            print(f"Machine out of order. Returning ${change:.2f}")
-        else:
-            print("No money to return.")
+            if sink.enabled:
+                sink.emit("out_of_order_returning", change)
+        elif sink.enabled:
+            sink.emit("no_money_to_return")
     
     def get_state_name(self):
         return "Out of Order"
 
 
+# States hold no per-machine data, so every machine shares one flyweight of each
+IDLE_STATE = IdleState()
+COIN_INSERTED_STATE = CoinInsertedState()
+PRODUCT_SELECTED_STATE = ProductSelectedState()
+OUT_OF_ORDER_STATE = OutOfOrderState()
+
+
 class VendingMachine:
     """
     The Context class that maintains a reference to a State object
     and delegates state-specific behavior to it.
     """
     
-    def __init__(self):
-        # Initialize all possible states
-        self.idle_state = IdleState()
-        self.coin_inserted_state = CoinInsertedState()
-        self.product_selected_state = ProductSelectedState()
-        self.out_of_order_state = OutOfOrderState()
+    __slots__ = ("sink", "coins", "stock", "catalog", "_current_state", "_balance", "_selected_product", "_is_operational", "_observers")
+    
+    # All possible states (shared flyweights)
+    idle_state = IDLE_STATE
+    coin_inserted_state = COIN_INSERTED_STATE
+    product_selected_state = PRODUCT_SELECTED_STATE
+    out_of_order_state = OUT_OF_ORDER_STATE
+    
+    def __init__(self, sink=CONSOLE_SINK, coins=None, stock=None, catalog=DEFAULT_CATALOG):
+        # Where transition and handler events are reported
+        self.sink = sink
+        # Coin tubes (vending_change.CoinInventory); None means unlimited change
+        self.coins = coins
+        # Product stock (vending_inventory.MachineStock); None means never sold out
+        self.stock = stock
+        # Products selectable by slot code or SKU (product_catalog.ProductCatalog)
+        self.catalog = catalog
         
         # Start in idle state
         self._current_state = self.idle_state
-        self._balance = 0.0
+        self._balance = 0  # cents
         self._selected_product = None
         self._is_operational = True
+        self._observers = ()
+    
+    def add_observer(self, observer):
+        """Call ``observer.on_transition(self, old_state, new_state)`` on every state change"""
+        self._observers += (observer,)
+    
+    def remove_observer(self, observer):
+        self._observers = tuple(o for o in self._observers if o is not observer)
     
     def set_state(self, state):
         """Change the current state"""
-        self._current_state = state
-        print(f"State changed to: {state.get_state_name()}")
+        if self._observers:
+            previous, self._current_state = self._current_state, state
+            for observer in self._observers:
+                observer.on_transition(self, previous, state)
+        else:
+            self._current_state = state
+        if self.sink.enabled:
+            self.sink.emit("state_changed", state.get_state_name())
     
     def get_current_state(self):
         """Get the current state name"""
         return self._current_state.get_state_name()
     
     def add_money(self, amount):
-        """Add money to the machine's balance"""
-        self._balance += amount
+        """Add a dollar amount to the machine's balance"""
+        self.add_cents(to_cents(amount))
+    
+    def add_cents(self, cents):
+        """Add money to the machine's balance, in cents"""
+        self._balance += cents
+        if self.coins is not None:
+            self.coins.deposit(cents)
     
     def get_balance(self):
-        """Get current balance"""
+        """Get current balance in dollars"""
+        return self._balance / 100
+    
+    def get_balance_cents(self):
+        """Get current balance in cents"""
         return self._balance
     
     def reset_balance(self):
-        """Reset balance to zero"""
-        self._balance = 0.0
+        """Reset balance to zero, handing back anything still in coin escrow"""
+        self._balance = 0
+        if self.coins is not None:
+            self.coins.release_escrow()
+    
+    def needs_exact_change(self):
+        """True if the coin tubes cannot pay every change amount up to their limit"""
+        return self.coins is not None and self.coins.exact_change_only()
     
     def set_selected_product(self, product):
         """Set the selected product"""
@@ -227,6 +354,18 @@ class VendingMachine:
         """Get the selected product"""
         return self._selected_product
     
+    def snapshot(self):
+        """Get ``(state name, balance in cents, selected product)`` in one call"""
+        return (self._current_state.name, self._balance, self._selected_product)
+    
+    def restore(self, state, balance_cents, selected_product):
+        """Restore state, balance and selection (e.g. after a crash) without
+        reporting a transition"""
+        self._current_state = state
+        self._balance = balance_cents
+        self._selected_product = selected_product
+        self._is_operational = state is not self.out_of_order_state
+    
     def set_out_of_order(self):
         """Set machine to out of order state"""
         self._is_operational = False
@@ -243,7 +382,7 @@ class VendingMachine:
         self._current_state.insert_coin(self, amount)
     
     def select_product(self, product):
-        """Select a product"""
+        """Select a product (a product object, or a slot code/SKU in the catalog)"""
         self._current_state.select_product(self, product)
     
     def dispense_product(self):
@@ -257,10 +396,14 @@ class VendingMachine:
     def display_products(self):
         """Display available products"""
         print("\n=== Available Products ===")
-        for product in Product:
-            print(f"{product.name}: {product.product_name} - ${product.price:.2f}")
+        for sku, product in self.catalog:
+            print(f"{sku}: {product.product_name} - ${product.price_cents / 100:.2f}")
         print()
     
+    def affordable_products(self):
+        """``(price_cents, sku)`` of every catalog product the balance covers"""
+        return self.catalog.affordable(self._balance)
+    
     def display_status(self):
         """Display current machine status"""
         print(f"\n=== Vending Machine Status ===")
@@ -0,0 +1,124 @@
+"""
+Discrete-Event Traffic Light Simulation
+=======================================
+
+Runs ``TrafficLight`` objects on a virtual clock instead of sleeping and
+polling ``time.time()``.
+
+Each light's next timer expiry (``get_deadline()``, i.e. timer start plus
+``get_duration()``) sits in an event heap.  The simulator pops the earliest
+deadline, moves the virtual clock straight to it and lets the light's state
+handle the timer, so simulated days of light cycles finish in milliseconds.
+The color sequence is the one the real-time ``run_cycle`` loop produces; the
+polling loop only notices each expiry up to one poll interval late, and since
+the timer restarts when the change is noticed, that lag accumulates there.
+"""
+
+import heapq
+import time
+
+from event_sinks import NULL_SINK
+from traffic_light_state import TrafficLight
+
+
+class VirtualClock:
+    """A manually advanced clock usable wherever ``time.time`` is expected"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        """Advance the clock instead of blocking"""
+        self.now += seconds
+
+    def advance_to(self, when):
+        """Jump the clock forward to an absolute time"""
+        if when > self.now:
+            self.now = when
+
+
+class TrafficLightSimulator:
+    """Event-heap driver for any number of traffic lights on one virtual clock"""
+
+    def __init__(self, clock=None, record=False):
+        self.clock = clock if clock is not None else VirtualClock()
+        self.lights = []
+        self.transition_count = 0
+        # (time, light index, new color) tuples when record=True
+        self.log = [] if record else None
+        self._heap = []
+
+    def add_light(self, light=None):
+        """Register a light (a silent one on this clock by default); returns its index"""
+        if light is None:
+            light = TrafficLight(clock=self.clock, sink=NULL_SINK)
+        index = len(self.lights)
+        self.lights.append(light)
+        heapq.heappush(self._heap, (light.get_deadline(), index))
+        return index
+
+    def step(self):
+        """Fire the earliest pending timer; returns its time, or None if idle"""
+        if not self._heap:
+            return None
+        deadline, index = heapq.heappop(self._heap)
+        light = self.lights[index]
+        self.clock.advance_to(deadline)
+        light.expire_timer()
+        self.transition_count += 1
+        if self.log is not None:
+            self.log.append((deadline, index, light.get_current_color()))
+        heapq.heappush(self._heap, (light.get_deadline(), index))
+        return deadline
+
+    def run_until(self, end_time):
+        """Fire every timer due at or before ``end_time``, then park the clock there"""
+        heap = self._heap
+        while heap and heap[0][0] <= end_time:
+            self.step()
+        self.clock.advance_to(end_time)
+
+    def run_cycles(self, num_cycles, index=0):
+        """Run until light ``index`` completes ``num_cycles`` Red -> Green -> Yellow -> Red cycles"""
+        light = self.lights[index]
+        changes = 0
+        while changes < 3 * num_cycles:
+            next_index = self._heap[0][1]
+            self.step()
+            if next_index == index:
+                changes += 1
+        return light
+
+
+def simulate_cycles(num_cycles, record=True):
+    """Discrete-event equivalent of ``TrafficLight().run_cycle(num_cycles)``"""
+    simulator = TrafficLightSimulator(record=record)
+    simulator.add_light()
+    simulator.run_cycles(num_cycles)
+    return simulator
+
+
+def demonstrate_discrete_event_simulation():
+    """Run the two-cycle demo and a multi-day run on the virtual clock"""
+    print("=== Discrete-Event Traffic Light Simulation ===\n")
+
+    simulator = simulate_cycles(2)
+    for when, _, color in simulator.log:
+        print(f"t={when:5.1f}s  -> {color}")
+    print(f"Two cycles simulated, ending at t={simulator.clock():.1f}s\n")
+
+    days = 3
+    simulator = TrafficLightSimulator()
+    simulator.add_light()
+    start = time.perf_counter()
+    simulator.run_until(days * 24 * 3600)
+    elapsed = time.perf_counter() - start
+    print(f"{days} days of cycles: {simulator.transition_count:,} transitions "
+          f"in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    demonstrate_discrete_event_simulation()
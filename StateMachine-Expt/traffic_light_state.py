@@ -8,12 +8,23 @@ This demonstrates a basic finite state machine with automatic transitions.
 
 from abc import ABC, abstractmethod
 import time
+from collections import namedtuple
 from enum import Enum
 
+from event_sinks import CONSOLE_SINK
+
+
+# Per-state facts, built once per flyweight state
+LightStatus = namedtuple("LightStatus", "color can_cross duration")
+
 
 class TrafficLightState(ABC):
     """Abstract base class for traffic light states"""
     
+    def __init__(self):
+        self.name = self.get_color()
+        self.status = LightStatus(self.name, self.can_cross(), self.get_duration())
+    
     @abstractmethod
     def handle_timer(self, traffic_light):
         """Handle timer expiration"""
@@ -39,7 +50,8 @@ class RedLightState(TrafficLightState):
     """Red light state - stop"""
     
     def handle_timer(self, traffic_light):
-        print("Red light timer expired. Switching to Green.")
+        if traffic_light.sink.enabled:
+            traffic_light.sink.emit("timer_expired", "Red", "Green")
         traffic_light.set_state(traffic_light.green_state)
     
     def get_color(self):
@@ -56,7 +68,8 @@ class YellowLightState(TrafficLightState):
     """Yellow light state - caution"""
     
     def handle_timer(self, traffic_light):
-        print("Yellow light timer expired. Switching to Red.")
+        if traffic_light.sink.enabled:
+            traffic_light.sink.emit("timer_expired", "Yellow", "Red")
         traffic_light.set_state(traffic_light.red_state)
     
     def get_color(self):
@@ -73,7 +86,8 @@ class GreenLightState(TrafficLightState):
     """Green light state - go"""
     
     def handle_timer(self, traffic_light):
-        print("Green light timer expired. Switching to Yellow.")
+        if traffic_light.sink.enabled:
+            traffic_light.sink.emit("timer_expired", "Green", "Yellow")
         traffic_light.set_state(traffic_light.yellow_state)
     
     def get_color(self):
@@ -86,27 +100,54 @@ class GreenLightState(TrafficLightState):
         return True
 
 
+# States hold no per-light data, so every light shares one flyweight of each
+RED_STATE = RedLightState()
+YELLOW_STATE = YellowLightState()
+GREEN_STATE = GreenLightState()
+
+
 class TrafficLight:
     """
     Context class representing a traffic light system.
     Uses the State pattern to manage different light states.
     """
     
-    def __init__(self):
-        # Initialize all possible states
-        self.red_state = RedLightState()
-        self.yellow_state = YellowLightState()
-        self.green_state = GreenLightState()
+    __slots__ = ("_clock", "sink", "_current_state", "_timer_start", "_observers")
+    
+    # All possible states (shared flyweights)
+    red_state = RED_STATE
+    yellow_state = YELLOW_STATE
+    green_state = GREEN_STATE
+    
+    def __init__(self, clock=time.time, sink=CONSOLE_SINK):
+        # Injectable time source (e.g. a VirtualClock for simulation)
+        self._clock = clock
+        # Where timer and transition events are reported
+        self.sink = sink
         
         # Start with red light
         self._current_state = self.red_state
-        self._timer_start = time.time()
+        self._timer_start = clock()
+        self._observers = ()
+    
+    def add_observer(self, observer):
+        """Call ``observer.on_transition(self, old_state, new_state)`` on every state change"""
+        self._observers += (observer,)
+    
+    def remove_observer(self, observer):
+        self._observers = tuple(o for o in self._observers if o is not observer)
     
     def set_state(self, state):
         """Change the current state"""
-        self._current_state = state
-        self._timer_start = time.time()  # Reset timer
-        self.display_status()
+        self._timer_start = self._clock()  # Reset timer
+        if self._observers:
+            previous, self._current_state = self._current_state, state
+            for observer in self._observers:
+                observer.on_transition(self, previous, state)
+        else:
+            self._current_state = state
+        if self.sink.enabled:
+            self.sink.emit("light_changed", state.get_color(), state.can_cross())
     
     def get_current_color(self):
         """Get the current light color"""
@@ -116,20 +157,45 @@ class TrafficLight:
         """Check if it's safe to cross"""
         return self._current_state.can_cross()
     
+    def get_duration(self):
+        """Get how long the current state lasts (in seconds)"""
+        return self._current_state.get_duration()
+    
+    def get_deadline(self):
+        """Get the clock time at which the current state's timer expires"""
+        return self._timer_start + self._current_state.get_duration()
+    
+    def get_status(self):
+        """Get the current state's LightStatus (shared, no allocation)"""
+        return self._current_state.status
+    
+    def snapshot(self):
+        """Get ``(color, can_cross, duration, deadline)`` in one call"""
+        color, can_cross, duration = self._current_state.status
+        return (color, can_cross, duration, self._timer_start + duration)
+    
     def check_timer(self):
         """Check if the timer has expired and handle state transition"""
-        elapsed = time.time() - self._timer_start
+        elapsed = self._clock() - self._timer_start
         if elapsed >= self._current_state.get_duration():
             self._current_state.handle_timer(self)
     
+    def expire_timer(self):
+        """Handle timer expiration now, regardless of elapsed time"""
+        self._current_state.handle_timer(self)
+    
     def display_status(self):
         """Display current traffic light status"""
         color = self.get_current_color()
         crossing = "SAFE TO CROSS" if self.can_cross() else "DO NOT CROSS"
         print(f"🚦 Traffic Light: {color} - {crossing}")
     
-    def run_cycle(self, num_cycles=3):
-        """Run the traffic light for a specified number of complete cycles"""
+    def run_cycle(self, num_cycles=3, sleep=time.sleep, poll_interval=0.1):
+        """Run the traffic light for a specified number of complete cycles
+        
+        ``sleep`` must advance the same clock the light was built with; pass
+        ``VirtualClock.sleep`` to poll a virtual clock without real waiting.
+        """
         print(f"Starting traffic light simulation for {num_cycles} cycles...\n")
         
         cycle_count = 0
@@ -138,22 +204,20 @@ class TrafficLight:
         self.display_status()
         
         while cycle_count < num_cycles:
+            previous_state = self._current_state
             self.check_timer()
             
             # Count state changes to determine cycles
             # One cycle = Red -> Green -> Yellow -> Red
-            if self.get_current_color() == "RED" and state_changes > 0 and state_changes % 3 == 0:
-                cycle_count += 1
-                print(f"\n--- Completed cycle {cycle_count} ---\n")
-                if cycle_count >= num_cycles:
-                    break
-            
-            # Track state changes
-            current_time = time.time()
-            if current_time - self._timer_start >= self._current_state.get_duration():
+            if self._current_state is not previous_state:
                 state_changes += 1
+                if state_changes % 3 == 0:
+                    cycle_count += 1
+                    print(f"\n--- Completed cycle {cycle_count} ---\n")
+                    if cycle_count >= num_cycles:
+                        break
             
-            time.sleep(0.1)  # Small delay for simulation
+            sleep(poll_interval)  # Small delay for simulation
         
         print("Traffic light simulation completed.")
 
@@ -171,14 +235,14 @@ def demonstrate_traffic_light():
     
     # Simulate some time passing
     print("\nSimulating timer expiration...")
-    traffic_light._current_state.handle_timer(traffic_light)
+    traffic_light.expire_timer()
     
     print(f"New state: {traffic_light.get_current_color()}")
     print(f"Can cross: {traffic_light.can_cross()}")
     
     # Another transition
     print("\nAnother timer expiration...")
-    traffic_light._current_state.handle_timer(traffic_light)
+    traffic_light.expire_timer()
     
     print(f"New state: {traffic_light.get_current_color()}")
     print(f"Can cross: {traffic_light.can_cross()}")
@@ -0,0 +1,94 @@
+"""
+Closed-Form Traffic Light Timetable
+===================================
+
+The ``TrafficLight`` cycle is fixed (red 3s, green 4s, yellow 1s), so the
+color at any time follows from the phase within the cycle; there is no need
+to step ``check_timer`` forward.
+
+The cycle table is read off the state classes once at import: starting from
+red, follow ``handle_timer`` around the loop and record each state's color
+and ``get_duration()``.  A query then reduces the time modulo the period and
+bisects the cumulative start times.
+
+- ``color_at(t, offset)``        - one query, O(log k) for k states
+- ``colors_at(times, offsets)``  - NumPy-vectorized, broadcasting times
+                                   against per-intersection phase offsets
+
+Times are seconds since the light was switched on; ``offset`` is how many
+seconds into its cycle the light was at that moment (the same meaning as
+``TrafficLightScheduler.add_light(phase=...)``).  At an exact boundary the
+new color is reported, as the light switches at its deadline.
+
+``colors_at`` requires NumPy.
+"""
+
+from bisect import bisect_right
+
+import numpy as np
+
+from event_sinks import NULL_SINK
+from traffic_light_sim import VirtualClock
+from traffic_light_state import TrafficLight
+
+
+def build_cycle_table():
+    """Walk one full cycle of TrafficLight states; returns ((color, duration), ...)"""
+    light = TrafficLight(clock=VirtualClock(), sink=NULL_SINK)
+    first = light.get_current_color()
+    table = []
+    while True:
+        table.append((light.get_current_color(), light.get_duration()))
+        light.expire_timer()
+        if light.get_current_color() == first:
+            return tuple(table)
+
+
+CYCLE = build_cycle_table()
+COLOR_NAMES = tuple(color for color, _ in CYCLE)
+PERIOD = sum(duration for _, duration in CYCLE)
+
+# Cumulative start time of each state within the cycle, e.g. (0, 3, 7)
+STARTS = tuple(sum(duration for _, duration in CYCLE[:i]) for i in range(len(CYCLE)))
+
+
+def color_at(t, offset=0.0):
+    """Color shown at time ``t`` by a light that started ``offset`` seconds into its cycle"""
+    return COLOR_NAMES[bisect_right(STARTS, (t + offset) % PERIOD) - 1]
+
+
+def colors_at(times, offsets=0.0):
+    """Vectorized color lookup; returns an int8 array of COLOR_NAMES indices.
+
+    ``times`` and ``offsets`` broadcast against each other, so
+    ``colors_at(times[None, :], offsets[:, None])`` answers every
+    (light, time) pair as a lights x times matrix.
+    """
+    phase = np.add(times, offsets, dtype=np.float64)
+    np.mod(phase, PERIOD, out=phase)
+    # With only a handful of states, counting the boundaries at or below the
+    # phase gives the bisect result and is cheaper than searchsorted.
+    codes = np.zeros(phase.shape, dtype=np.int8)
+    for start in STARTS[1:]:
+        codes += phase >= start
+    return codes
+
+
+def demonstrate_timetable():
+    """Query colors without simulating"""
+    print("=== Closed-Form Traffic Light Timetable ===\n")
+    print(f"Cycle: {' -> '.join(f'{c} {d}s' for c, d in CYCLE)} (period {PERIOD}s)\n")
+
+    for t in (0, 2.9, 3, 6.5, 7, 8, 86_400 * 365 + 0.5):
+        print(f"color_at({t}) = {color_at(t)}")
+
+    offsets = np.array([0.0, 2.5, 5.0])
+    times = np.arange(0, 10, 2.0)
+    matrix = colors_at(times[None, :], offsets[:, None])
+    print("\nLights x times:")
+    for offset, row in zip(offsets, matrix):
+        print(f"  offset {offset:3.1f}s: {[COLOR_NAMES[i] for i in row]}")
+
+
+if __name__ == "__main__":
+    demonstrate_timetable()
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+# Shared by StateGraphCanvas and the headless renderers in ui.graph_render, so
+# a diagram looks the same on screen, in SVG and in PNG.  Nothing here
+# imports tkinter.
+
+OUTLINE_WIDTH = 2
+ACTIVE_OUTLINE_WIDTH = 3
+EDGE_WIDTH = 2
+LABEL_OFFSET = 10  # edge labels sit this far above the edge midpoint
+ARROW_LENGTH = 10  # tip to base, close to Tk's default arrowshape
+ARROW_HALF_WIDTH = 4
+
+Point = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class GraphNode:
+    key: str
+    label: str
+
+
+@dataclass(frozen=True)
+class GraphEdge:
+    src: str
+    dst: str
+    label: str = ""
+
+
+@dataclass(frozen=True)
+class NodeShape:
+    key: str
+    label: str
+    center: Point
+
+
+@dataclass(frozen=True)
+class EdgeShape:
+    start: Point
+    end: Point
+    label: str
+    label_at: Point
+
+    def arrow_head(self) -> Tuple[Tuple[float, float], Tuple[float, float], Tuple[float, float]]:
+        """Tip and the two base corners of the arrowhead at ``end``."""
+        (sx, sy), (ex, ey) = self.start, self.end
+        length = math.hypot(ex - sx, ey - sy) or 1.0
+        ux, uy = (ex - sx) / length, (ey - sy) / length
+        bx, by = ex - ux * ARROW_LENGTH, ey - uy * ARROW_LENGTH
+        return (
+            (ex, ey),
+            (bx - uy * ARROW_HALF_WIDTH, by + ux * ARROW_HALF_WIDTH),
+            (bx + uy * ARROW_HALF_WIDTH, by - ux * ARROW_HALF_WIDTH),
+        )
+
+    def shaft_end(self) -> Tuple[float, float]:
+        """Where the line meets the base of the arrowhead."""
+        (sx, sy), (ex, ey) = self.start, self.end
+        length = math.hypot(ex - sx, ey - sy) or 1.0
+        return ex - (ex - sx) / length * ARROW_LENGTH, ey - (ey - sy) / length * ARROW_LENGTH
+
+
+@dataclass(frozen=True)
+class GraphLayout:
+    width: int
+    height: int
+    node_radius: int
+    nodes: Tuple[NodeShape, ...]
+    edges: Tuple[EdgeShape, ...]
+    positions: Dict[str, Point]
+
+
+def circular_positions(nodes: Iterable[GraphNode], width: int, height: int) -> Dict[str, Point]:
+    """Place nodes evenly on a circle centred in a ``width`` x ``height`` area."""
+    nodes = list(nodes)
+    if not nodes:
+        return {}
+
+    cx, cy = width // 2, height // 2
+    radius = max(60, min(width, height) // 2 - 50)
+
+    n = len(nodes)
+    positions = {}
+    for i, node in enumerate(nodes):
+        angle = (2 * math.pi * i) / n
+        positions[node.key] = (int(cx + radius * math.cos(angle)), int(cy + radius * math.sin(angle)))
+    return positions
+
+
+def trim_edge(src: Point, dst: Point, node_radius: int) -> Optional[Tuple[Point, Point]]:
+    """Endpoints of a straight edge trimmed so it doesn't overlap node circles."""
+    sx, sy = src
+    dx, dy = dst
+    vx, vy = dx - sx, dy - sy
+    dist = math.hypot(vx, vy)
+    if dist == 0:
+        return None
+
+    ux, uy = vx / dist, vy / dist
+    start = (sx + int(ux * node_radius), sy + int(uy * node_radius))
+    end = (dx - int(ux * node_radius), dy - int(uy * node_radius))
+    return start, end
+
+
+def layout_graph(
+    nodes: Iterable[GraphNode],
+    edges: Iterable[GraphEdge],
+    width: int,
+    height: int,
+    node_radius: int = 28,
+) -> GraphLayout:
+    """Compute every shape of the graph; edges with a missing endpoint are dropped."""
+    nodes = list(nodes)
+    positions = circular_positions(nodes, width, height)
+
+    edge_shapes = []
+    for edge in edges:
+        src = positions.get(edge.src)
+        dst = positions.get(edge.dst)
+        if not src or not dst:
+            continue
+        trimmed = trim_edge(src, dst, node_radius)
+        if trimmed is None:
+            continue
+        label_at = ((src[0] + dst[0]) // 2, (src[1] + dst[1]) // 2 - LABEL_OFFSET)
+        edge_shapes.append(EdgeShape(trimmed[0], trimmed[1], edge.label, label_at))
+
+    node_shapes = tuple(NodeShape(node.key, node.label, positions[node.key]) for node in nodes)
+    return GraphLayout(width, height, node_radius, node_shapes, tuple(edge_shapes), positions)
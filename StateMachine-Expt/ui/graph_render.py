@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import os
+import struct
+import zlib
+from html import escape
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ui.graph_layout import (
+    ACTIVE_OUTLINE_WIDTH,
+    EDGE_WIDTH,
+    OUTLINE_WIDTH,
+    GraphLayout,
+)
+
+# Headless renderers for the layouts StateGraphCanvas draws, for CI boxes
+# and animations of long traces.  Neither needs tkinter or a display, and
+# PNG output is encoded here with zlib rather than through an imaging library.
+#
+# Every frame of a trace differs only in which node is highlighted, so both
+# renderers build the static layer (edges, labels, node shapes) once, add just
+# the active node's highlight per frame, and keep each distinct frame, so
+# writing thousands of frames is mostly file I/O.
+
+FONT_FAMILY = "sans-serif"
+FONT_SIZE = 12
+
+# 5x7 bitmap font for printable ASCII (0x20-0x7E), five column bytes per glyph,
+# least significant bit at the top.
+_FONT_5X7 = bytes.fromhex(
+    "0000000000" "00005f0000" "0007000700" "147f147f14" "242a7f2a12" "2313086462" "3649552250" "0005030000"
+    "001c224100" "0041221c00" "082a1c2a08" "08083e0808" "0050300000" "0808080808" "0060600000" "2010080402"
+    "3e5149453e" "00427f4000" "4261514946" "2141454b31" "1814127f10" "2745454539" "3c4a494930" "0171090503"
+    "3649494936" "064949291e" "0036360000" "0056360000" "0008142241" "1414141414" "4122140800" "0201510906"
+    "324979413e" "7e1111117e" "7f49494936" "3e41414122" "7f4141221c" "7f49494941" "7f09090101" "3e41415132"
+    "7f0808087f" "00417f4100" "2040413f01" "7f08142241" "7f40404040" "7f0204027f" "7f0408107f" "3e4141413e"
+    "7f09090906" "3e4151215e" "7f09192946" "4649494931" "01017f0101" "3f4040403f" "1f2040201f" "7f2018207f"
+    "6314081463" "0304780403" "6151494543" "00007f4141" "0204081020" "41417f0000" "0402010204" "4040404040"
+    "0001020400" "2054545478" "7f48444438" "3844444420" "384444487f" "3854545418" "087e090102" "081454543c"
+    "7f08040478" "00447d4000" "2040443d00" "007f102844" "00417f4000" "7c0418047c" "7c08040478" "3844444438"
+    "7c14141408" "081414187c" "7c08040408" "4854545420" "043f444020" "3c4040207c" "1c2040201c" "3c4030403c"
+    "4428102844" "0c5050503c" "4464544c44" "0008364100" "00007f0000" "0041360800" "08082a1c08"
+)
+_GLYPH_WIDTH = 5
+_GLYPH_HEIGHT = 7
+_GLYPH_ADVANCE = 6
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+BLACK = 0
+WHITE = 255
+
+
+class SvgGraphRenderer:
+    """Renders a GraphLayout as SVG text, one frame per active node."""
+
+    suffix = ".svg"
+
+    def __init__(self, layout: GraphLayout):
+        self.layout = layout
+        self._static = _svg_static_layer(layout)
+        self._highlights: Dict[Optional[str], str] = {
+            node.key: _svg_circle(node.center, layout.node_radius, "none", ACTIVE_OUTLINE_WIDTH)
+            for node in layout.nodes
+        }
+        self._frames: Dict[Optional[str], bytes] = {}
+
+    def render(self, active: Optional[str] = None) -> str:
+        """The whole document with ``active`` highlighted (None for no highlight)."""
+        return self._static + self._highlights.get(active, "") + "</svg>\n"
+
+    def frame(self, active: Optional[str] = None) -> bytes:
+        """``render(active)`` encoded for writing; each distinct frame is built once."""
+        frame = self._frames.get(active)
+        if frame is None:
+            frame = self._frames[active] = self.render(active).encode("utf-8")
+        return frame
+
+    def animate(self, trace: Iterable[Optional[str]], frame_seconds: float = 0.1) -> str:
+        """One SVG that plays ``trace`` (active node per frame) with SMIL ``<set>``s.
+
+        Consecutive frames with the same active node become a single ``<set>``,
+        so the document grows with the number of state changes, not frames.
+        """
+        runs: Dict[str, List[Tuple[str, str]]] = {node.key: [] for node in self.layout.nodes}
+        frame = 0
+        last = None
+        for key, run in groupby(trace):
+            count = sum(1 for _ in run)
+            if key in runs:
+                runs[key].append((f"{frame * frame_seconds:.3f}s", f"{count * frame_seconds:.3f}s"))
+                last = runs[key]
+            frame += count
+        if last:
+            # Keep the final state highlighted once the animation ends.
+            last[-1] = (last[-1][0], "indefinite")
+
+        parts = [self._static]
+        for node in self.layout.nodes:
+            if not runs[node.key]:
+                continue
+            x, y = node.center
+            parts.append(
+                f'<circle cx="{x}" cy="{y}" r="{self.layout.node_radius}" fill="none" stroke="black" '
+                f'stroke-width="{ACTIVE_OUTLINE_WIDTH}" visibility="hidden">'
+            )
+            for begin, duration in runs[node.key]:
+                parts.append(f'<set attributeName="visibility" to="visible" begin="{begin}" dur="{duration}"/>')
+            parts.append("</circle>\n")
+        parts.append("</svg>\n")
+        return "".join(parts)
+
+
+class PngGraphRenderer:
+    """Renders a GraphLayout as 8-bit grayscale PNG, one frame per active node."""
+
+    suffix = ".png"
+
+    def __init__(self, layout: GraphLayout, compress_level: int = 6):
+        self.layout = layout
+        self.compress_level = compress_level
+        self._static = _raster_static_layer(layout)
+        self._highlights: Dict[Optional[str], List[int]] = {
+            node.key: _ring_pixels(layout.width, layout.height, node.center, layout.node_radius, ACTIVE_OUTLINE_WIDTH)
+            for node in layout.nodes
+        }
+        self._frames: Dict[Optional[str], bytes] = {}
+
+    def pixels(self, active: Optional[str] = None) -> bytearray:
+        """Row-major grayscale pixels with ``active`` highlighted."""
+        pixels = bytearray(self._static)
+        for index in self._highlights.get(active, ()):
+            pixels[index] = BLACK
+        return pixels
+
+    def render(self, active: Optional[str] = None) -> bytes:
+        """PNG file contents with ``active`` highlighted; each distinct frame is encoded once."""
+        frame = self._frames.get(active)
+        if frame is None:
+            frame = encode_png(self.pixels(active), self.layout.width, self.layout.height, self.compress_level)
+            self._frames[active] = frame
+        return frame
+
+    frame = render
+
+
+def write_frames(renderer, trace: Iterable[Optional[str]], directory: str, prefix: str = "frame") -> int:
+    """Write one file per trace entry (``<prefix>_000000.svg`` ...); returns the count."""
+    os.makedirs(directory, exist_ok=True)
+    frame = renderer.frame
+    count = 0
+    for count, key in enumerate(trace, 1):
+        with open(os.path.join(directory, f"{prefix}_{count - 1:06d}{renderer.suffix}"), "wb") as file:
+            file.write(frame(key))
+    return count
+
+
+def encode_png(pixels: Sequence[int], width: int, height: int, level: int = 6) -> bytes:
+    """PNG file contents for row-major 8-bit grayscale ``pixels``."""
+    raw = b"".join(b"\x00" + bytes(pixels[row:row + width]) for row in range(0, width * height, width))
+    return b"".join((
+        _PNG_SIGNATURE,
+        _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)),
+        _png_chunk(b"IDAT", zlib.compress(raw, level)),
+        _png_chunk(b"IEND", b""),
+    ))
+
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+
+# --- SVG ---------------------------------------------------------------------
+
+
+def _svg_circle(center: Tuple[int, int], radius: int, fill: str, width: int) -> str:
+    x, y = center
+    return f'<circle cx="{x}" cy="{y}" r="{radius}" fill="{fill}" stroke="black" stroke-width="{width}"/>\n'
+
+
+def _svg_text(at: Tuple[int, int], text: str) -> str:
+    return f'<text x="{at[0]}" y="{at[1]}">{escape(text)}</text>\n'
+
+
+def _svg_static_layer(layout: GraphLayout) -> str:
+    """Everything but the closing tag and the highlight, in Tk drawing order."""
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{layout.width}" height="{layout.height}" '
+        f'viewBox="0 0 {layout.width} {layout.height}" font-family="{FONT_FAMILY}" font-size="{FONT_SIZE}" '
+        f'text-anchor="middle" dominant-baseline="central">\n',
+        '<rect width="100%" height="100%" fill="white"/>\n',
+    ]
+    for edge in layout.edges:
+        shaft_x, shaft_y = edge.shaft_end()
+        head = " ".join(f"{x:.1f},{y:.1f}" for x, y in edge.arrow_head())
+        parts.append(
+            f'<line x1="{edge.start[0]}" y1="{edge.start[1]}" x2="{shaft_x:.1f}" y2="{shaft_y:.1f}" '
+            f'stroke="black" stroke-width="{EDGE_WIDTH}"/>\n'
+        )
+        parts.append(f'<polygon points="{head}"/>\n')
+        if edge.label:
+            parts.append(_svg_text(edge.label_at, edge.label))
+    for node in layout.nodes:
+        parts.append(_svg_circle(node.center, layout.node_radius, "white", OUTLINE_WIDTH))
+        parts.append(_svg_text(node.center, node.label))
+    return "".join(parts)
+
+
+# --- Raster ------------------------------------------------------------------
+
+
+def _raster_static_layer(layout: GraphLayout) -> bytearray:
+    width, height = layout.width, layout.height
+    pixels = bytearray([WHITE]) * (width * height)
+    for edge in layout.edges:
+        _stroke_segment(pixels, width, height, edge.start, edge.shaft_end(), EDGE_WIDTH)
+        _fill_polygon(pixels, width, height, edge.arrow_head())
+        if edge.label:
+            _draw_text(pixels, width, height, edge.label_at, edge.label)
+    r = layout.node_radius
+    for node in layout.nodes:
+        x, y = node.center
+        inner = (r - OUTLINE_WIDTH / 2) ** 2
+        for py in range(max(0, y - r), min(height, y + r + 1)):
+            for px in range(max(0, x - r), min(width, x + r + 1)):
+                if (px - x) ** 2 + (py - y) ** 2 <= inner:
+                    pixels[py * width + px] = WHITE
+        for index in _ring_pixels(width, height, node.center, r, OUTLINE_WIDTH):
+            pixels[index] = BLACK
+        _draw_text(pixels, width, height, node.center, node.label)
+    return pixels
+
+
+def _ring_pixels(width: int, height: int, center: Tuple[int, int], radius: int, stroke: int) -> List[int]:
+    """Indices of the pixels of a circle outline ``stroke`` pixels wide."""
+    x, y = center
+    outer = radius + stroke / 2
+    low, high = (radius - stroke / 2) ** 2, outer ** 2
+    reach = int(outer) + 1
+    indices = []
+    for py in range(max(0, y - reach), min(height, y + reach + 1)):
+        for px in range(max(0, x - reach), min(width, x + reach + 1)):
+            if low <= (px - x) ** 2 + (py - y) ** 2 <= high:
+                indices.append(py * width + px)
+    return indices
+
+
+def _stroke_segment(pixels, width, height, start, end, stroke) -> None:
+    (x0, y0), (x1, y1) = start, end
+    steps = int(max(abs(x1 - x0), abs(y1 - y0))) + 1
+    offsets = range(-(stroke // 2), stroke - stroke // 2)
+    for step in range(steps + 1):
+        t = step / steps
+        cx = int(round(x0 + (x1 - x0) * t))
+        cy = int(round(y0 + (y1 - y0) * t))
+        for oy in offsets:
+            py = cy + oy
+            if 0 <= py < height:
+                for ox in offsets:
+                    px = cx + ox
+                    if 0 <= px < width:
+                        pixels[py * width + px] = BLACK
+
+
+def _fill_polygon(pixels, width, height, points) -> None:
+    """Scanline fill of a convex polygon, sampling at pixel centres."""
+    ys = [y for _, y in points]
+    for py in range(max(0, int(min(ys))), min(height, int(max(ys)) + 1)):
+        sample = py + 0.5
+        crossings = []
+        for (ax, ay), (bx, by) in zip(points, points[1:] + points[:1]):
+            if (ay <= sample < by) or (by <= sample < ay):
+                crossings.append(ax + (sample - ay) * (bx - ax) / (by - ay))
+        if len(crossings) < 2:
+            continue
+        left, right = min(crossings), max(crossings)
+        for px in range(max(0, int(left + 0.5)), min(width, int(right + 0.5))):
+            pixels[py * width + px] = BLACK
+
+
+def _draw_text(pixels, width, height, center, text) -> None:
+    """Draw ``text`` in the 5x7 font, centred on ``center``."""
+    left = center[0] - (len(text) * _GLYPH_ADVANCE - 1) // 2
+    top = center[1] - _GLYPH_HEIGHT // 2
+    for i, char in enumerate(text):
+        code = ord(char)
+        offset = (code - 0x20 if 0x20 <= code <= 0x7E else ord("?") - 0x20) * _GLYPH_WIDTH
+        for column, bits in enumerate(_FONT_5X7[offset:offset + _GLYPH_WIDTH]):
+            px = left + i * _GLYPH_ADVANCE + column
+            if not 0 <= px < width:
+                continue
+            for row in range(_GLYPH_HEIGHT):
+                py = top + row
+                if bits >> row & 1 and 0 <= py < height:
+                    pixels[py * width + px] = BLACK
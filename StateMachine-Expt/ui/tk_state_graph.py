@@ -1,21 +1,18 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
 from tkinter import Canvas
 from typing import Dict, Iterable, List, Optional, Tuple
 
-
-@dataclass(frozen=True)
-class GraphNode:
-    key: str
-    label: str
-
-
-@dataclass(frozen=True)
-class GraphEdge:
-    src: str
-    dst: str
-    label: str = ""
+from ui.graph_layout import (
+    ACTIVE_OUTLINE_WIDTH,
+    EDGE_WIDTH,
+    OUTLINE_WIDTH,
+    GraphEdge,
+    GraphLayout,
+    GraphNode,
+    NodeShape,
+    layout_graph,
+)
 
 
 class StateGraphCanvas(Canvas):
@@ -24,9 +21,19 @@ class StateGraphCanvas(Canvas):
     - Draws nodes (circles) and directed edges.
     - Highlights the active node.
 
+    Canvas item IDs are kept per node and edge, so changing the active node
+    only reconfigures two outlines; everything is rebuilt only when the graph
+    or the canvas size changes.
+
+    Layout and geometry come from ``ui.graph_layout``, which the headless
+    SVG/PNG renderers in ``ui.graph_render`` share.
+
     Colors are kept to basic Tk defaults to avoid introducing new theme tokens.
     """
 
+    _OUTLINE_WIDTH = OUTLINE_WIDTH
+    _ACTIVE_OUTLINE_WIDTH = ACTIVE_OUTLINE_WIDTH
+
     def __init__(
         self,
         master,
@@ -41,9 +48,14 @@ class StateGraphCanvas(Canvas):
 
         self._nodes: List[GraphNode] = []
         self._edges: List[GraphEdge] = []
+        self._layout: Optional[GraphLayout] = None
         self._positions: Dict[str, Tuple[int, int]] = {}
         self._active_key: Optional[str] = None
 
+        # Canvas item IDs: node key -> (oval, label); per edge (line, label or None).
+        self._node_items: Dict[str, Tuple[int, int]] = {}
+        self._edge_items: List[Tuple[int, Optional[int]]] = []
+
     def set_graph(self, nodes: Iterable[GraphNode], edges: Iterable[GraphEdge]) -> None:
         self._nodes = list(nodes)
         self._edges = list(edges)
@@ -51,81 +63,66 @@ class StateGraphCanvas(Canvas):
         self.redraw()
 
     def set_active(self, key: Optional[str]) -> None:
+        if key == self._active_key:
+            return
+        previous = self._node_items.get(self._active_key)
+        current = self._node_items.get(key)
         self._active_key = key
-        self.redraw()
+        if previous is not None:
+            self.itemconfigure(previous[0], width=self._OUTLINE_WIDTH)
+        if current is not None:
+            self.itemconfigure(current[0], width=self._ACTIVE_OUTLINE_WIDTH)
+
+    def configure(self, cnf=None, **kw):
+        result = super().configure(cnf, **kw)
+        options = {**(cnf or {}), **kw} if isinstance(cnf, dict) or cnf is None else {}
+        if "width" in options or "height" in options:
+            self._layout_nodes()
+            self.redraw()
+        return result
+
+    config = configure
+
+    def layout(self) -> GraphLayout:
+        """The current layout, as shared with ``ui.graph_render``."""
+        if self._layout is None:
+            self._layout_nodes()
+        return self._layout
 
     def _layout_nodes(self) -> None:
         # Simple circular layout.
-        width = int(self["width"])
-        height = int(self["height"])
-
-        if not self._nodes:
-            self._positions = {}
-            return
-
-        cx, cy = width // 2, height // 2
-        radius = max(60, min(width, height) // 2 - 50)
-
-        import math
-
-        n = len(self._nodes)
-        self._positions = {}
-        for i, node in enumerate(self._nodes):
-            angle = (2 * math.pi * i) / n
-            x = int(cx + radius * math.cos(angle))
-            y = int(cy + radius * math.sin(angle))
-            self._positions[node.key] = (x, y)
+        self._layout = layout_graph(
+            self._nodes, self._edges, int(self["width"]), int(self["height"]), self._node_radius
+        )
+        self._positions = self._layout.positions
 
     def redraw(self) -> None:
+        """Rebuild every canvas item from the current graph and layout."""
         self.delete("all")
+        self._node_items = {}
+        self._edge_items = []
+        layout = self.layout()
 
         # Draw edges first.
-        for edge in self._edges:
-            src = self._positions.get(edge.src)
-            dst = self._positions.get(edge.dst)
-            if not src or not dst:
-                continue
-            self._draw_arrow(src, dst)
+        for edge in layout.edges:
+            line = self.create_line(*edge.start, *edge.end, arrow="last", width=EDGE_WIDTH)
+            label = None
             if edge.label:
-                mx = (src[0] + dst[0]) // 2
-                my = (src[1] + dst[1]) // 2
-                self.create_text(mx, my - 10, text=edge.label, anchor="center")
+                label = self.create_text(*edge.label_at, text=edge.label, anchor="center")
+            self._edge_items.append((line, label))
 
         # Draw nodes.
-        for node in self._nodes:
-            pos = self._positions.get(node.key)
-            if not pos:
-                continue
-            self._draw_node(node, pos, active=(node.key == self._active_key))
-
-    def _draw_node(self, node: GraphNode, pos: Tuple[int, int], *, active: bool) -> None:
-        x, y = pos
+        for node in layout.nodes:
+            self._draw_node(node, active=(node.key == self._active_key))
+
+    def _draw_node(self, node: NodeShape, *, active: bool) -> None:
+        x, y = node.center
         r = self._node_radius
 
         fill = "white"
         outline = "black"
-        width = 3 if active else 2
-
-        self.create_oval(x - r, y - r, x + r, y + r, fill=fill, outline=outline, width=width)
-        self.create_text(x, y, text=node.label, anchor="center")
-
-    def _draw_arrow(self, src: Tuple[int, int], dst: Tuple[int, int]) -> None:
-        # Draw a straight arrow; trim so it doesn't overlap node circles.
-        import math
-
-        sx, sy = src
-        dx, dy = dst
-        vx, vy = dx - sx, dy - sy
-        dist = math.hypot(vx, vy)
-        if dist == 0:
-            return
-
-        r = self._node_radius
-        ux, uy = vx / dist, vy / dist
-
-        start_x = sx + int(ux * r)
-        start_y = sy + int(uy * r)
-        end_x = dx - int(ux * r)
-        end_y = dy - int(uy * r)
+        width = self._ACTIVE_OUTLINE_WIDTH if active else self._OUTLINE_WIDTH
 
-        self.create_line(start_x, start_y, end_x, end_y, arrow="last", width=2)
+        oval = self.create_oval(x - r, y - r, x + r, y + r, fill=fill, outline=outline, width=width)
+        label = self.create_text(x, y, text=node.label, anchor="center")
+        self._node_items[node.key] = (oval, label)
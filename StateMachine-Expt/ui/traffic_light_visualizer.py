@@ -1,31 +1,31 @@
 from __future__ import annotations
 
-import sys
-from pathlib import Path
-import tkinter as tk
-from tkinter import ttk
+# Run from inside StateMachine-Expt with
+# ``python -m ui.traffic_light_visualizer`` or ``python . visualize traffic``.
+# tkinter is only imported when the window is built.
 
-# Ensure StateMachine-Expt is importable when running from repo root.
-_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
-if str(_STATE_MACHINE_DIR) not in sys.path:
-    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+from fsm_spec import SIMPLE_TRAFFIC_LIGHT_SPEC, graph_edges
+from simple_traffic_light import SimpleTrafficLight
+from ui.graph_layout import GraphEdge, GraphNode
 
-from simple_traffic_light import SimpleTrafficLight  # noqa: E402
-from ui.tk_state_graph import GraphEdge, GraphNode, StateGraphCanvas  # noqa: E402
 
-
-class TrafficLightVisualizer(tk.Tk):
+class TrafficLightVisualizer:
     def __init__(self):
-        super().__init__()
-        self.title("Traffic Light State Visualizer")
+        import tkinter as tk
+        from tkinter import ttk
+
+        from ui.tk_state_graph import StateGraphCanvas
+
+        self.root = root = tk.Tk()
+        root.title("Traffic Light State Visualizer")
 
         self._light = SimpleTrafficLight()
 
-        main = ttk.Frame(self, padding=10)
+        main = ttk.Frame(root, padding=10)
         main.grid(row=0, column=0, sticky="nsew")
 
-        self.columnconfigure(0, weight=1)
-        self.rowconfigure(0, weight=1)
+        root.columnconfigure(0, weight=1)
+        root.rowconfigure(0, weight=1)
         main.columnconfigure(0, weight=1)
         main.rowconfigure(1, weight=1)
 
@@ -50,28 +50,19 @@ class TrafficLightVisualizer(tk.Tk):
         self._init_graph()
         self._refresh()
 
+    def mainloop(self) -> None:
+        self.root.mainloop()
+
     def _init_graph(self) -> None:
-        nodes = [
-            GraphNode("RED", "RED"),
-            GraphNode("GREEN", "GREEN"),
-            GraphNode("YELLOW", "YELLOW"),
-        ]
-        edges = [
-            GraphEdge("RED", "GREEN", "next"),
-            GraphEdge("GREEN", "YELLOW", "next"),
-            GraphEdge("YELLOW", "RED", "next"),
-        ]
+        nodes = [GraphNode(state, state) for state in SIMPLE_TRAFFIC_LIGHT_SPEC["states"]]
+        edges = [GraphEdge(src, dst, label) for src, dst, label in graph_edges(SIMPLE_TRAFFIC_LIGHT_SPEC)]
         self._graph.set_graph(nodes, edges)
 
-    def _current_key(self) -> str:
-        status = self._light.get_status()
-        return status.get("color", "")
-
     def _refresh(self) -> None:
-        status = self._light.get_status()
-        crossing = "YES" if status.get("pedestrians_can_cross") else "NO"
-        self._status_var.set(f"Color: {status.get('color')} | Action: {status.get('action')} | Pedestrians cross: {crossing}")
-        self._graph.set_active(self._current_key())
+        status = self._light.snapshot()
+        crossing = "YES" if status.pedestrians_can_cross else "NO"
+        self._status_var.set(f"Color: {status.color} | Action: {status.action} | Pedestrians cross: {crossing}")
+        self._graph.set_active(status.color)
 
     def _step(self) -> None:
         self._light.next_light()
@@ -1,31 +1,31 @@
 from __future__ import annotations
 
-import sys
-from pathlib import Path
-import tkinter as tk
-from tkinter import ttk
+# Run from inside StateMachine-Expt with
+# ``python -m ui.vending_machine_visualizer`` or ``python . visualize vending``.
+# tkinter is only imported when the window is built.
 
-# Ensure StateMachine-Expt is importable when running from repo root.
-_STATE_MACHINE_DIR = Path(__file__).resolve().parents[1]
-if str(_STATE_MACHINE_DIR) not in sys.path:
-    sys.path.insert(0, str(_STATE_MACHINE_DIR))
+from fsm_spec import VENDING_SPEC, graph_edges
+from state_pattern_example import VendingMachine
+from ui.graph_layout import GraphEdge, GraphNode
 
-from state_pattern_example import Product, VendingMachine  # noqa: E402
-from ui.tk_state_graph import GraphEdge, GraphNode, StateGraphCanvas  # noqa: E402
 
-
-class VendingMachineVisualizer(tk.Tk):
+class VendingMachineVisualizer:
     def __init__(self):
-        super().__init__()
-        self.title("Vending Machine State Visualizer")
+        import tkinter as tk
+        from tkinter import ttk
+
+        from ui.tk_state_graph import StateGraphCanvas
+
+        self.root = root = tk.Tk()
+        root.title("Vending Machine State Visualizer")
 
         self._machine = VendingMachine()
 
-        main = ttk.Frame(self, padding=10)
+        main = ttk.Frame(root, padding=10)
         main.grid(row=0, column=0, sticky="nsew")
 
-        self.columnconfigure(0, weight=1)
-        self.rowconfigure(0, weight=1)
+        root.columnconfigure(0, weight=1)
+        root.rowconfigure(0, weight=1)
         main.columnconfigure(0, weight=1)
         main.rowconfigure(1, weight=1)
 
@@ -48,11 +48,14 @@ class VendingMachineVisualizer(tk.Tk):
         ttk.Button(controls, text="Insert Coin", command=self._insert_coin).grid(row=0, column=2, sticky="w")
 
         ttk.Label(controls, text="Product:").grid(row=1, column=0, sticky="w", pady=(8, 0))
-        self._product_var = tk.StringVar(value=Product.SODA.name)
-        product_names = [p.name for p in Product]
-        ttk.Combobox(controls, textvariable=self._product_var, values=product_names, state="readonly", width=12).grid(
-            row=1, column=1, sticky="w", padx=(6, 12), pady=(8, 0)
+        self._product_var = tk.StringVar()
+        self._product_box = ttk.Combobox(
+            controls, textvariable=self._product_var, state="readonly", width=24, postcommand=self._load_products
         )
+        self._product_box.grid(row=1, column=1, sticky="w", padx=(6, 12), pady=(8, 0))
+        self._load_products()
+        if self._product_box["values"]:
+            self._product_box.current(0)
         ttk.Button(controls, text="Select", command=self._select_product).grid(row=1, column=2, sticky="w", pady=(8, 0))
 
         ttk.Button(controls, text="Dispense", command=self._dispense).grid(row=0, column=3, sticky="w", padx=(14, 0))
@@ -66,32 +69,18 @@ class VendingMachineVisualizer(tk.Tk):
         self._init_graph()
         self._refresh()
 
+    def mainloop(self) -> None:
+        self.root.mainloop()
+
     def _init_graph(self) -> None:
-        nodes = [
-            GraphNode("Idle", "Idle"),
-            GraphNode("Coin Inserted", "Coin Inserted"),
-            GraphNode("Product Selected", "Product Selected"),
-            GraphNode("Out of Order", "Out of Order"),
-        ]
-        edges = [
-            GraphEdge("Idle", "Coin Inserted", "insert"),
-            GraphEdge("Coin Inserted", "Product Selected", "select"),
-            GraphEdge("Coin Inserted", "Idle", "return"),
-            GraphEdge("Product Selected", "Idle", "dispense"),
-            GraphEdge("Product Selected", "Idle", "return"),
-            GraphEdge("Idle", "Out of Order", "fault"),
-            GraphEdge("Coin Inserted", "Out of Order", "fault"),
-            GraphEdge("Product Selected", "Out of Order", "fault"),
-            GraphEdge("Out of Order", "Idle", "repair"),
-        ]
+        nodes = [GraphNode(state, state) for state in VENDING_SPEC["states"]]
+        edges = [GraphEdge(src, dst, label) for src, dst, label in graph_edges(VENDING_SPEC)]
         self._graph.set_graph(nodes, edges)
 
     def _refresh(self) -> None:
-        state = self._machine.get_current_state()
-        balance = self._machine.get_balance()
-        selected = self._machine.get_selected_product()
+        state, balance, selected = self._machine.snapshot()
         selected_text = selected.product_name if selected else "(none)"
-        self._status_var.set(f"State: {state} | Balance: ${balance:.2f} | Selected: {selected_text}")
+        self._status_var.set(f"State: {state} | Balance: ${balance / 100:.2f} | Selected: {selected_text}")
         self._graph.set_active(state)
 
     def _parse_amount(self) -> float:
@@ -101,12 +90,17 @@ class VendingMachineVisualizer(tk.Tk):
             return 0.0
         return amount
 
-    def _selected_product(self) -> Product:
-        name = self._product_var.get().strip()
-        try:
-            return Product[name]
-        except KeyError:
-            return Product.SODA
+    def _load_products(self) -> None:
+        # Re-read on every drop-down so catalog edits show up without a rebuild
+        self._product_box["values"] = [
+            f"{slot}  {product.product_name} (${product.price_cents / 100:.2f})"
+            for slot, product in self._machine.catalog.slots()
+        ]
+
+    def _selected_product(self) -> str:
+        # Entries start with the slot code, which the machine resolves through its catalog
+        text = self._product_var.get()
+        return text.split(maxsplit=1)[0] if text else ""
 
     def _insert_coin(self) -> None:
         self._machine.insert_coin(self._parse_amount())
@@ -0,0 +1,254 @@
+"""
+Coin Inventory and Change-Making
+================================
+
+``CoinInventory`` models a machine's coin tubes: a count per denomination
+(in cents) plus an escrow of the money inserted for the current
+transaction.  Pass one as ``VendingMachine(coins=...)``; without it the
+machine assumes unlimited coins, as before.
+
+- Inserted money waits in escrow.  A refund hands back exactly those pieces,
+  so it can always be paid.
+- On a sale, escrowed coins drop into the tubes and the change is paid from
+  the tubes with the fewest coins the stock allows.  If no combination
+  works, the sale is refused with an ``exact_change_only`` event and the
+  customer can still cancel.
+
+``make_change(amount, denominations, stock)`` first reads the unlimited-coin
+optimum from a DP table cached per denomination set (``change_table``).  If
+the stock covers it, that is also the bounded optimum, which is the usual
+case and takes a few microseconds.  Otherwise the inventory builds a bounded
+DP table for its current stock and reuses it until the stock changes.
+
+All amounts are integer cents; tables are indexed in units of the
+denominations' greatest common divisor.
+"""
+
+import math
+from collections import Counter, deque
+from functools import lru_cache
+
+
+US_DENOMINATIONS = (5, 10, 25, 100)
+TABLE_SIZE = 64      # smallest table built, in gcd units
+UNREACHABLE = 1 << 30
+
+
+@lru_cache(maxsize=64)
+def change_table(denominations, size):
+    """Unlimited-coin DP table for ``denominations`` (a sorted tuple of cents).
+
+    Returns ``(unit, coins, last)`` where entry ``a`` covers ``a * unit``
+    cents: ``coins[a]`` is the minimal coin count (UNREACHABLE if none) and
+    ``last[a]`` the index of one coin in an optimal solution.
+    """
+    unit = math.gcd(*denominations)
+    steps = [d // unit for d in denominations]
+    coins = [UNREACHABLE] * size
+    last = [-1] * size
+    coins[0] = 0
+    for a in range(1, size):
+        best, pick = UNREACHABLE, -1
+        for i, step in enumerate(steps):
+            if step <= a and coins[a - step] + 1 < best:
+                best, pick = coins[a - step] + 1, i
+        coins[a] = best
+        last[a] = pick
+    return unit, coins, last
+
+
+def _table_size(units):
+    """Smallest power-of-two table (at least TABLE_SIZE) holding ``units``"""
+    size = TABLE_SIZE
+    while size <= units:
+        size *= 2
+    return size
+
+
+def _unbounded_change(amount, denominations):
+    """Per-denomination counts of the unlimited-coin optimum, or None"""
+    unit = math.gcd(*denominations)
+    if amount % unit:
+        return None
+    a = amount // unit
+    unit, coins, last = change_table(denominations, _table_size(a))
+    if coins[a] == UNREACHABLE:
+        return None
+    counts = [0] * len(denominations)
+    while a:
+        i = last[a]
+        counts[i] += 1
+        a -= denominations[i] // unit
+    return counts
+
+
+def bounded_change_table(denominations, stock, size):
+    """Minimal-coin DP table under per-denomination ``stock`` limits.
+
+    Returns ``(unit, coins, take)``: ``coins[a]`` is the minimal coin count
+    for ``a * unit`` cents (UNREACHABLE if none) and ``take[i][a]`` how many
+    of denomination ``i`` the optimum for ``a`` uses given denominations
+    ``0..i``.  Each denomination layer is a sliding-window minimum per
+    residue, so building costs O(len(denominations) * size).
+    """
+    unit = math.gcd(*denominations)
+    coins = [0] + [UNREACHABLE] * (size - 1)
+    take = []
+    for denomination, limit in zip(denominations, stock):
+        step = denomination // unit
+        layer = [0] * size
+        updated = list(coins)
+        for residue in range(min(step, size)):
+            window = deque()  # (j, coins[residue + j*step] - j), increasing values
+            for j, a in enumerate(range(residue, size, step)):
+                value = coins[a] - j
+                while window and window[-1][1] >= value:
+                    window.pop()
+                window.append((j, value))
+                if window[0][0] < j - limit:
+                    window.popleft()
+                start, best = window[0]
+                if best + j < updated[a]:
+                    updated[a] = best + j
+                    layer[a] = j - start
+        coins = updated
+        take.append(layer)
+    return unit, coins, take
+
+
+def _bounded_change(amount, denominations, bounded):
+    """Per-denomination counts read back from a ``bounded_change_table``, or None"""
+    unit, coins, take = bounded
+    a = amount // unit
+    if coins[a] == UNREACHABLE:
+        return None
+    counts = [0] * len(denominations)
+    for i in range(len(denominations) - 1, -1, -1):
+        counts[i] = take[i][a]
+        a -= counts[i] * (denominations[i] // unit)
+    return counts
+
+
+def make_change(amount, denominations, stock):
+    """Fewest coins summing to ``amount`` cents within ``stock``.
+
+    ``denominations`` is a sorted tuple of cents and ``stock`` the matching
+    coin counts.  Returns a list of counts per denomination, or None when
+    the stock cannot make the amount.
+    """
+    if amount == 0:
+        return [0] * len(denominations)
+    counts = _unbounded_change(amount, denominations)
+    if counts is None or all(n <= s for n, s in zip(counts, stock)):
+        return counts
+    units = amount // math.gcd(*denominations)
+    return _bounded_change(amount, denominations,
+                           bounded_change_table(denominations, stock, _table_size(units)))
+
+
+class CoinInventory:
+    """Coin tubes and escrow for one machine"""
+
+    def __init__(self, stock=None, denominations=US_DENOMINATIONS, max_change=100):
+        self.denominations = tuple(sorted(denominations))
+        stock = stock or {}
+        self.stock = [stock.get(d, 0) for d in self.denominations]
+        self.escrow = Counter()   # cents of each inserted piece -> count
+        self.cashbox = 0          # inserted money that is not a tube coin, in cents
+        self.max_change = max_change
+        self._index = {d: i for i, d in enumerate(self.denominations)}
+        self._bounded = None      # bounded DP table for the current stock
+
+    def _stock_changed(self):
+        self._bounded = None
+
+    def load(self, denomination, count):
+        """Add ``count`` coins of ``denomination`` cents to the tubes"""
+        self.stock[self._index[denomination]] += count
+        self._stock_changed()
+
+    def deposit(self, cents):
+        """Hold one inserted piece of money in escrow"""
+        self.escrow[cents] += 1
+
+    def release_escrow(self):
+        """Hand back everything in escrow; returns ``{cents: count}``"""
+        returned, self.escrow = dict(self.escrow), Counter()
+        return returned
+
+    def _bounded_table(self, units):
+        if self._bounded is None or len(self._bounded[1]) <= units:
+            self._bounded = bounded_change_table(self.denominations, self.stock, _table_size(units))
+        return self._bounded
+
+    def change_for(self, amount):
+        """Counts per denomination the tubes would pay for ``amount``, or None"""
+        if amount == 0:
+            return [0] * len(self.denominations)
+        counts = _unbounded_change(amount, self.denominations)
+        if counts is None or all(n <= s for n, s in zip(counts, self.stock)):
+            return counts
+        bounded = self._bounded_table(amount // math.gcd(*self.denominations))
+        return _bounded_change(amount, self.denominations, bounded)
+
+    def complete_sale(self, change):
+        """Move escrow into the tubes and pay ``change`` cents.
+
+        Returns the coins paid as ``{cents: count}``, or None (leaving
+        everything untouched) if the change cannot be made.
+        """
+        index = self._index
+        coins_in = {cents: n for cents, n in self.escrow.items() if cents in index}
+        for cents, n in coins_in.items():
+            self.stock[index[cents]] += n
+        if coins_in:
+            self._stock_changed()
+        counts = self.change_for(change)
+        if counts is None:
+            for cents, n in coins_in.items():
+                self.stock[index[cents]] -= n
+            if coins_in:
+                self._stock_changed()
+            return None
+
+        for i, n in enumerate(counts):
+            self.stock[i] -= n
+        self.cashbox += sum(cents * n for cents, n in self.escrow.items() if cents not in index)
+        self.escrow = Counter()
+        if any(counts):
+            self._stock_changed()
+        return {d: n for d, n in zip(self.denominations, counts) if n}
+
+    def exact_change_only(self, max_change=None):
+        """True if some change amount up to ``max_change`` cannot be paid"""
+        limit = self.max_change if max_change is None else max_change
+        unit = math.gcd(*self.denominations)
+        units = limit // unit
+        coins = self._bounded_table(units)[1]
+        return any(coins[a] == UNREACHABLE for a in range(units + 1))
+
+    def total(self):
+        """Cents held in the tubes"""
+        return sum(d * n for d, n in zip(self.denominations, self.stock))
+
+
+def demonstrate_change_making():
+    """Sell until the tubes run low and the machine needs exact change"""
+    from state_pattern_example import Product, VendingMachine
+
+    print("=== Change-Making with Limited Coins ===\n")
+    coins = CoinInventory({5: 2, 10: 3, 25: 4, 100: 1})
+    machine = VendingMachine(coins=coins)
+
+    for paid in (2.00, 2.00, 2.00):
+        machine.insert_coin(paid)
+        machine.select_product(Product.CHIPS)
+        machine.dispense_product()
+        print(f"Tubes: {dict(zip(coins.denominations, coins.stock))}, "
+              f"exact change only: {machine.needs_exact_change()}\n")
+    if machine.get_current_state() == "Product Selected":
+        machine.return_change()
+
+
+if __name__ == "__main__":
+    demonstrate_change_making()
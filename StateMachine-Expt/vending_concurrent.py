@@ -0,0 +1,140 @@
+"""
+Concurrent Vending Fleet
+========================
+
+``VendingMachine`` updates its balance, selection and state in separate
+steps, so two threads driving the same machine can interleave and, for
+example, both dispense against one payment.  ``ConcurrentVendingFleet`` is a
+registry of machines that makes every event atomic per machine.
+
+Machine ``i`` is guarded by lock ``i % stripes``.  Events for machines on
+different stripes run in parallel, and no thread ever holds more than one
+lock, so there is nothing to deadlock on.  On free-threaded Python builds
+(no GIL) this lets events on different machines run on separate cores.
+
+- ``apply(machine_id, event, arg)`` runs one event under the machine's lock
+  and returns ``(before, after)`` snapshots, so the caller can see what
+  the event did.
+- ``compare_and_transition(machine_id, expected_state, event, arg)`` runs
+  the event only if the machine is still in ``expected_state``.  It is the
+  building block for check-then-act sequences such as "dispense only if
+  still Product Selected".
+
+A machine's own coin inventory is covered by its lock.  A ``FleetInventory``
+shared by machines on different stripes is not, so keep one inventory per
+stripe or guard it separately.
+"""
+
+import random
+import threading
+
+from event_sinks import NULL_SINK
+from state_pattern_example import VendingMachine
+from vending_engine import EV_DISPENSE, apply_to_machine, random_events
+
+
+DEFAULT_STRIPES = 64
+
+
+class ConcurrentVendingFleet:
+    """Registry of VendingMachines with per-machine atomic events (striped locks)"""
+
+    def __init__(self, size=0, stripes=DEFAULT_STRIPES, sink=NULL_SINK):
+        self._locks = tuple(threading.Lock() for _ in range(stripes))
+        self._stripes = stripes
+        self._machines = [VendingMachine(sink=sink) for _ in range(size)]
+        self._registry_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._machines)
+
+    def register(self, machine):
+        """Add a machine and return its id"""
+        with self._registry_lock:
+            self._machines.append(machine)
+            return len(self._machines) - 1
+
+    def lock_for(self, machine_id):
+        """The lock guarding ``machine_id`` (for multi-step critical sections)"""
+        return self._locks[machine_id % self._stripes]
+
+    def apply(self, machine_id, event, arg=None):
+        """Run one event atomically; returns ``(before, after)`` snapshots"""
+        machine = self._machines[machine_id]
+        with self._locks[machine_id % self._stripes]:
+            before = machine.snapshot()
+            apply_to_machine(machine, event, arg)
+            return before, machine.snapshot()
+
+    def compare_and_transition(self, machine_id, expected_state, event, arg=None):
+        """Run ``event`` only if the machine is in ``expected_state`` (a state name).
+
+        Returns ``(applied, before, after)``; when the state did not match,
+        ``before`` and ``after`` are both the current snapshot.
+        """
+        machine = self._machines[machine_id]
+        with self._locks[machine_id % self._stripes]:
+            before = machine.snapshot()
+            if before[0] != expected_state:
+                return False, before, before
+            apply_to_machine(machine, event, arg)
+            return True, before, machine.snapshot()
+
+    def snapshot(self, machine_id):
+        """Consistent ``(state, balance cents, selected product)`` of one machine"""
+        machine = self._machines[machine_id]
+        with self._locks[machine_id % self._stripes]:
+            return machine.snapshot()
+
+    def snapshots(self):
+        """Snapshot of every machine, one stripe at a time"""
+        n = len(self._machines)  # machines registered meanwhile are left out
+        result = [None] * n
+        for stripe, lock in enumerate(self._locks):
+            with lock:
+                for machine_id in range(stripe, n, self._stripes):
+                    result[machine_id] = self._machines[machine_id].snapshot()
+        return result
+
+    def total_balance(self):
+        """Money held across the fleet, in cents"""
+        return sum(balance for _, balance, _ in self.snapshots())
+
+
+def demonstrate_concurrent_fleet():
+    """Drive a small fleet from several threads and check the books balance"""
+    print("=== Concurrent Vending Fleet ===\n")
+
+    fleet = ConcurrentVendingFleet(size=100, stripes=16)
+    threads = 4
+    totals = [[0, 0] for _ in range(threads)]  # [credited, paid out] cents per thread
+
+    def drive(index):
+        rng = random.Random(index)
+        tally = totals[index]
+        for event, arg in random_events(rng, 50_000):
+            before, after = fleet.apply(rng.randrange(len(fleet)), event, arg)
+            moved = after[1] - before[1]
+            if moved > 0:
+                tally[0] += moved
+            else:
+                tally[1] -= moved
+
+    workers = [threading.Thread(target=drive, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    credited = sum(t[0] for t in totals)
+    paid = sum(t[1] for t in totals)
+    print(f"Credited ${credited / 100:,.2f}, paid out ${paid / 100:,.2f}, "
+          f"held ${fleet.total_balance() / 100:,.2f}")
+    print(f"Books balance: {credited - paid == fleet.total_balance()}")
+
+    applied, _, after = fleet.compare_and_transition(0, "Product Selected", EV_DISPENSE)
+    print(f"compare_and_transition on machine 0: applied={applied}, now {after[0]}")
+
+
+if __name__ == "__main__":
+    demonstrate_concurrent_fleet()
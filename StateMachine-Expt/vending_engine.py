@@ -0,0 +1,273 @@
+"""
+Table-Driven Vending Machine Engine
+===================================
+
+A compiled alternative to the class-based ``VendingMachine`` in
+``state_pattern_example.py``.
+
+The behaviour of ``IdleState``, ``CoinInsertedState``, ``ProductSelectedState``
+and ``OutOfOrderState`` is flattened into a dense (state x event) table.  Each
+cell is a small tuple of integers ``(guard, action, next_state)`` so handling
+an event is a single indexed lookup followed by a couple of integer compares,
+instead of a method lookup on a state object plus event reporting and
+``set_state``.
+
+The table is compiled from ``fsm_spec.VENDING_SPEC``.  The engine is silent:
+it keeps the same state, balance and selection as the class-based path but
+does not emit the human-readable messages.  Like ``VendingMachine`` it takes
+insert amounts in dollars and keeps money as integer cents.
+"""
+
+from fsm_spec import VENDING_SPEC, expand_transitions
+from state_pattern_example import Product, to_cents
+
+
+# Product codes are indices into PRODUCTS
+PRODUCTS = tuple(Product)
+
+# State codes (order matches STATE_NAMES)
+S_IDLE = 0
+S_COIN_INSERTED = 1
+S_PRODUCT_SELECTED = 2
+S_OUT_OF_ORDER = 3
+
+STATE_NAMES = tuple(VENDING_SPEC["states"])
+N_STATES = len(STATE_NAMES)
+
+# Event codes
+EV_INSERT = 0
+EV_SELECT = 1
+EV_DISPENSE = 2
+EV_RETURN = 3
+EV_FAULT = 4
+EV_REPAIR = 5
+
+EVENT_NAMES = tuple(event["name"] for event in VENDING_SPEC["events"])
+N_EVENTS = len(EVENT_NAMES)
+
+# Guard IDs
+G_ALWAYS = 0        # no guard
+G_NEVER = 1         # event is not accepted in this state
+G_POSITIVE = 2      # inserted amount must be > 0
+G_CAN_AFFORD = 3    # balance covers the product passed as argument
+G_CAN_DISPENSE = 4  # a product is selected and the balance covers it
+G_HAS_BALANCE = 5   # there is money to return
+
+# Action IDs
+A_NONE = 0
+A_CREDIT = 1         # balance += amount (in cents)
+A_SELECT = 2         # selected = product
+A_DISPENSE = 3       # change = balance - price, clear balance and selection
+A_REFUND = 4         # change = balance, clear balance
+A_REFUND_CLEAR = 5   # change = balance, clear balance and selection
+
+# Spec guard/action names -> IDs understood by CompiledVendingMachine.fire
+GUARD_IDS = {
+    None: G_ALWAYS,
+    "positive": G_POSITIVE,
+    "can_afford": G_CAN_AFFORD,
+    "can_dispense": G_CAN_DISPENSE,
+    "has_balance": G_HAS_BALANCE,
+}
+ACTION_IDS = {
+    None: A_NONE,
+    "credit": A_CREDIT,
+    "select": A_SELECT,
+    "dispense": A_DISPENSE,
+    "refund": A_REFUND,
+    "refund_clear": A_REFUND_CLEAR,
+}
+
+# Outcomes returned by CompiledVendingMachine.fire
+R_OK = 0
+R_REJECTED = 1
+
+
+def compile_transition_table(spec=VENDING_SPEC):
+    """Build the dense (state x event) table as a flat tuple.
+
+    The cell for ``(state, event)`` lives at ``state * N_EVENTS + event``.
+    Pairs the spec does not list are rejected and keep the current state.
+    """
+    states = {name: i for i, name in enumerate(spec["states"])}
+    events = {event["name"]: i for i, event in enumerate(spec["events"])}
+
+    table = []
+    for state in range(len(states)):
+        for event in range(len(events)):
+            table.append((G_NEVER, A_NONE, state))
+
+    for (state, event), transition in expand_transitions(spec).items():
+        table[states[state] * len(events) + events[event]] = (
+            GUARD_IDS[transition.get("guard")],
+            ACTION_IDS[transition.get("action")],
+            states[transition["to"]],
+        )
+
+    return tuple(table)
+
+
+TRANSITION_TABLE = compile_transition_table()
+
+
+class CompiledVendingMachine:
+    """Vending machine driven by the compiled transition table"""
+
+    __slots__ = ("state", "balance", "selected", "last_change", "_table")
+
+    def __init__(self, table=TRANSITION_TABLE):
+        self._table = table
+        self.state = S_IDLE
+        self.balance = 0      # cents
+        self.selected = None
+        self.last_change = 0  # cents
+
+    def fire(self, event, arg=None):
+        """Apply one event and return R_OK or R_REJECTED.
+
+        ``arg`` is the amount in dollars for EV_INSERT and the Product for
+        EV_SELECT.  Any money handed back by the event is stored in
+        ``last_change`` (cents).
+        """
+        guard, action, target = self._table[self.state * N_EVENTS + event]
+        self.last_change = 0
+
+        if guard:
+            if guard == G_NEVER:
+                return R_REJECTED
+            if guard == G_POSITIVE:
+                # Only inserts carry this guard; convert once, credit below.
+                arg = to_cents(arg)
+                if arg <= 0:
+                    return R_REJECTED
+            elif guard == G_CAN_AFFORD:
+                if self.balance < arg.price_cents:
+                    return R_REJECTED
+            elif guard == G_CAN_DISPENSE:
+                product = self.selected
+                if not product or self.balance < product.price_cents:
+                    return R_REJECTED
+            elif self.balance <= 0:  # G_HAS_BALANCE
+                return R_REJECTED
+
+        if action:
+            if action == A_CREDIT:
+                self.balance += arg
+            elif action == A_SELECT:
+                self.selected = arg
+            elif action == A_DISPENSE:
+                self.last_change = self.balance - self.selected.price_cents
+                self.balance = 0
+                self.selected = None
+            else:
+                self.last_change = self.balance
+                self.balance = 0
+                if action == A_REFUND_CLEAR:
+                    self.selected = None
+
+        self.state = target
+        return R_OK
+
+    # Convenience wrappers matching the VendingMachine interface
+    def insert_coin(self, amount):
+        return self.fire(EV_INSERT, amount)
+
+    def select_product(self, product):
+        return self.fire(EV_SELECT, product)
+
+    def dispense_product(self):
+        return self.fire(EV_DISPENSE)
+
+    def return_change(self):
+        return self.fire(EV_RETURN)
+
+    def set_out_of_order(self):
+        return self.fire(EV_FAULT)
+
+    def set_operational(self):
+        return self.fire(EV_REPAIR)
+
+    def get_current_state(self):
+        return STATE_NAMES[self.state]
+
+    def get_balance(self):
+        return self.balance / 100
+
+    def get_balance_cents(self):
+        return self.balance
+
+    def get_selected_product(self):
+        return self.selected
+
+
+def apply_to_machine(machine, event, arg=None):
+    """Apply an (event, arg) pair to a class-based VendingMachine"""
+    if event == EV_INSERT:
+        machine.insert_coin(arg)
+    elif event == EV_SELECT:
+        machine.select_product(arg)
+    elif event == EV_DISPENSE:
+        machine.dispense_product()
+    elif event == EV_RETURN:
+        machine.return_change()
+    elif event == EV_FAULT:
+        machine.set_out_of_order()
+    else:
+        machine.set_operational()
+
+
+def random_events(rng, count, fault_rate=0.01):
+    """Generate a reproducible stream of (event, arg) pairs.
+
+    ``rng`` is a ``random.Random``; the mix favours the normal purchase flow
+    with occasional invalid amounts, faults and repairs.
+    """
+    products = PRODUCTS
+    coins = (0.25, 0.50, 1.00, 2.00, 0.0)
+    events = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < fault_rate:
+            events.append((EV_FAULT, None))
+        elif roll < 2 * fault_rate:
+            events.append((EV_REPAIR, None))
+        elif roll < 0.45:
+            events.append((EV_INSERT, rng.choice(coins)))
+        elif roll < 0.70:
+            events.append((EV_SELECT, rng.choice(products)))
+        elif roll < 0.90:
+            events.append((EV_DISPENSE, None))
+        else:
+            events.append((EV_RETURN, None))
+    return events
+
+
+def demonstrate_compiled_engine():
+    """Run the same scenario as demonstrate_vending_machine on the engine"""
+    print("=== Compiled Transition Table: Vending Machine ===\n")
+
+    machine = CompiledVendingMachine()
+    script = [
+        (EV_SELECT, Product.SODA),
+        (EV_INSERT, 1.00),
+        (EV_INSERT, 0.50),
+        (EV_SELECT, Product.SODA),
+        (EV_DISPENSE, None),
+        (EV_INSERT, 2.00),
+        (EV_SELECT, Product.CANDY),
+        (EV_RETURN, None),
+        (EV_INSERT, 1.50),
+        (EV_FAULT, None),
+        (EV_INSERT, 0.50),
+        (EV_RETURN, None),
+        (EV_REPAIR, None),
+    ]
+    for event, arg in script:
+        outcome = machine.fire(event, arg)
+        result = "ok" if outcome == R_OK else "rejected"
+        print(f"{EVENT_NAMES[event]:<9} -> {machine.get_current_state():<17} "
+              f"balance ${machine.balance / 100:.2f} change ${machine.last_change / 100:.2f} ({result})")
+
+
+if __name__ == "__main__":
+    demonstrate_compiled_engine()
@@ -0,0 +1,255 @@
+"""
+NumPy Vending Fleet Simulator
+=============================
+
+Models a whole fleet of vending machines as parallel NumPy arrays instead of
+one ``VendingMachine`` object per unit:
+
+- ``state``    - state code per machine (see ``vending_engine.S_*``)
+- ``balance``  - inserted money in integer cents
+- ``selected`` - index into ``PRODUCTS`` of the selected product, -1 for none
+
+A batch of ``(machine_id, event, arg)`` triples is applied in one vectorized
+pass using the same transition table as ``vending_engine``, so the rules are
+exactly those of ``IdleState``, ``CoinInsertedState``, ``ProductSelectedState``
+and ``OutOfOrderState``.  ``arg`` is the amount in cents for EV_INSERT and the
+product index for EV_SELECT; it is ignored for other events.  A batch with a
+machine id, event code or product index out of range is rejected with
+ValueError before any of it is applied.
+
+Requires NumPy.
+"""
+
+import numpy as np
+
+from vending_engine import (
+    A_CREDIT,
+    A_DISPENSE,
+    A_REFUND,
+    A_REFUND_CLEAR,
+    A_SELECT,
+    EV_DISPENSE,
+    EV_FAULT,
+    EV_INSERT,
+    EV_REPAIR,
+    EV_RETURN,
+    EV_SELECT,
+    G_CAN_AFFORD,
+    G_CAN_DISPENSE,
+    G_HAS_BALANCE,
+    G_NEVER,
+    G_POSITIVE,
+    N_EVENTS,
+    N_STATES,
+    PRODUCTS,
+    R_OK,
+    R_REJECTED,
+    STATE_NAMES,
+    S_IDLE,
+    TRANSITION_TABLE,
+)
+
+
+PRICE_CENTS = np.array([p.price_cents for p in PRODUCTS], dtype=np.int64)
+NO_PRODUCT = -1
+
+# The compiled table split into three (state, event) lookup arrays.
+_cells = np.array(TRANSITION_TABLE, dtype=np.int8).reshape(N_STATES, N_EVENTS, 3)
+GUARD = _cells[:, :, 0].copy()
+ACTION = _cells[:, :, 1].copy()
+NEXT_STATE = _cells[:, :, 2].copy()
+del _cells
+
+
+def validate_batch(size, machine_ids, events, args):
+    """Raise ValueError if any machine id, event or EV_SELECT product index is out of range"""
+    if len(machine_ids) and (machine_ids.min() < 0 or machine_ids.max() >= size):
+        bad = machine_ids[(machine_ids < 0) | (machine_ids >= size)][0]
+        raise ValueError(f"machine id {bad} out of range for a fleet of {size}")
+    if len(events) and (events.min() < 0 or events.max() >= N_EVENTS):
+        bad = events[(events < 0) | (events >= N_EVENTS)][0]
+        raise ValueError(f"unknown event {bad}")
+    products = args[events == EV_SELECT]
+    if len(products) and (products.min() < 0 or products.max() >= len(PRODUCTS)):
+        bad = products[(products < 0) | (products >= len(PRODUCTS))][0]
+        raise ValueError(f"product index {bad} out of range for {len(PRODUCTS)} products")
+
+
+def product_index(product):
+    """Index of a Product in PRODUCTS (the EV_SELECT argument)"""
+    return PRODUCTS.index(product)
+
+
+def occurrence_rank(machine_ids):
+    """For each event, how many earlier events in the batch hit the same machine.
+
+    Events with equal rank touch distinct machines and can be applied together;
+    applying rank 0, then rank 1, ... preserves per-machine ordering.
+    """
+    n = len(machine_ids)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    order = np.argsort(machine_ids, kind="stable")
+    sorted_ids = machine_ids[order]
+    starts = np.ones(n, dtype=bool)
+    starts[1:] = sorted_ids[1:] != sorted_ids[:-1]
+    run_start = np.maximum.accumulate(np.where(starts, np.arange(n), 0))
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n) - run_start
+    return rank
+
+
+class VendingFleet:
+    """A fleet of vending machines stored as parallel arrays"""
+
+    def __init__(self, size):
+        self.size = size
+        self.state = np.full(size, S_IDLE, dtype=np.int8)
+        self.balance = np.zeros(size, dtype=np.int64)
+        self.selected = np.full(size, NO_PRODUCT, dtype=np.int16)
+
+    @classmethod
+    def from_arrays(cls, state, balance, selected):
+        """Wrap existing int8/int64/int16 arrays (e.g. shared memory views) without copying"""
+        fleet = cls.__new__(cls)
+        fleet.size = len(state)
+        fleet.state = state
+        fleet.balance = balance
+        fleet.selected = selected
+        return fleet
+
+    def apply(self, machine_ids, events, args, ledger=None, inventory=None):
+        """Apply a batch of events and return ``(outcomes, change)`` arrays.
+
+        ``outcomes[i]`` is R_OK or R_REJECTED for event ``i`` and ``change[i]``
+        is the money (in cents) handed back by that event.  Events for the same
+        machine are applied in batch order.  If ``ledger`` (a
+        ``vending_ledger.MoneyLedger``) is given, the batch's credits, sales
+        and refunds are appended to it.  If ``inventory`` (a
+        ``vending_inventory.FleetInventory``) is given, selecting a sold-out
+        product is rejected and every dispense takes one unit.
+
+        Raises ValueError, before any event is applied, if the batch fails
+        ``validate_batch``.
+        """
+        machine_ids = np.asarray(machine_ids, dtype=np.int64)
+        events = np.asarray(events, dtype=np.int8)
+        args = np.asarray(args, dtype=np.int64)
+        validate_batch(self.size, machine_ids, events, args)
+
+        outcomes = np.empty(len(machine_ids), dtype=np.int8)
+        change = np.zeros(len(machine_ids), dtype=np.int64)
+        sold = np.full(len(machine_ids), NO_PRODUCT, dtype=np.int16)
+
+        rank = occurrence_rank(machine_ids)
+        if len(rank) == 0:
+            return outcomes, change
+        if rank.max() == 0:
+            self._apply_unique(machine_ids, events, args, outcomes, change, sold, slice(None), inventory)
+        else:
+            order = np.argsort(rank, kind="stable")
+            bounds = np.searchsorted(rank[order], np.arange(rank.max() + 2))
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                idx = order[lo:hi]
+                self._apply_unique(machine_ids[idx], events[idx], args[idx], outcomes, change, sold, idx, inventory)
+        if ledger is not None:
+            ledger.record_batch(machine_ids, events, args, outcomes, change, sold)
+        return outcomes, change
+
+    def _apply_unique(self, ids, events, args, outcomes, change_out, sold_out, where, inventory=None):
+        """Apply events that each touch a different machine"""
+        state = self.state[ids]
+        balance = self.balance[ids]
+        selected = self.selected[ids].astype(np.int64)
+
+        guard = GUARD[state, events]
+        action = ACTION[state, events]
+
+        arg_product = np.where(events == EV_SELECT, args, 0)
+        arg_price = PRICE_CENTS[arg_product]
+        selected_price = PRICE_CENTS[np.maximum(selected, 0)]
+
+        rejected = guard == G_NEVER
+        rejected |= (guard == G_POSITIVE) & (args <= 0)
+        rejected |= (guard == G_CAN_AFFORD) & (balance < arg_price)
+        rejected |= (guard == G_CAN_DISPENSE) & ((selected == NO_PRODUCT) | (balance < selected_price))
+        rejected |= (guard == G_HAS_BALANCE) & (balance <= 0)
+        if inventory is not None:
+            rejected |= (guard == G_CAN_AFFORD) & inventory.sold_out(ids, arg_product)
+        action = np.where(rejected, 0, action)
+
+        change = np.zeros(len(ids), dtype=np.int64)
+
+        balance = balance + np.where(action == A_CREDIT, args, 0)
+
+        pick = action == A_SELECT
+        selected = np.where(pick, args, selected)
+
+        dispense = action == A_DISPENSE
+        change = np.where(dispense, balance - selected_price, change)
+        sold = np.where(dispense, selected, NO_PRODUCT)
+        if inventory is not None and dispense.any():
+            inventory.take_many(ids[dispense], selected[dispense])
+
+        refund = (action == A_REFUND) | (action == A_REFUND_CLEAR)
+        change = np.where(refund, balance, change)
+
+        balance = np.where(dispense | refund, 0, balance)
+        selected = np.where(dispense | (action == A_REFUND_CLEAR), NO_PRODUCT, selected)
+
+        self.state[ids] = np.where(rejected, state, NEXT_STATE[state, events])
+        self.balance[ids] = balance
+        self.selected[ids] = selected
+        outcomes[where] = np.where(rejected, R_REJECTED, R_OK)
+        change_out[where] = change
+        sold_out[where] = sold
+
+    def state_counts(self):
+        """Number of machines in each state, keyed by state name"""
+        counts = np.bincount(self.state, minlength=len(STATE_NAMES))
+        return dict(zip(STATE_NAMES, counts.tolist()))
+
+    def total_balance(self):
+        """Money currently held across the fleet, in cents"""
+        return int(self.balance.sum())
+
+
+def random_fleet_events(rng, fleet_size, count, fault_rate=0.01):
+    """Generate a seeded batch of (machine_ids, events, args) arrays.
+
+    ``rng`` is a ``numpy.random.Generator``.  The event mix matches
+    ``vending_engine.random_events``.
+    """
+    machine_ids = rng.integers(0, fleet_size, size=count)
+    roll = rng.random(count)
+    events = np.select(
+        [roll < fault_rate, roll < 2 * fault_rate, roll < 0.45, roll < 0.70, roll < 0.90],
+        [EV_FAULT, EV_REPAIR, EV_INSERT, EV_SELECT, EV_DISPENSE],
+        default=EV_RETURN,
+    ).astype(np.int8)
+    coins = np.array([25, 50, 100, 200, 0], dtype=np.int64)
+    args = np.where(
+        events == EV_INSERT,
+        coins[rng.integers(0, len(coins), size=count)],
+        rng.integers(0, len(PRODUCTS), size=count),
+    )
+    return machine_ids, events, args
+
+
+def demonstrate_vending_fleet():
+    """Step a million machines through a few batches of random events"""
+    print("=== NumPy Vending Fleet ===\n")
+
+    rng = np.random.default_rng(42)
+    fleet = VendingFleet(1_000_000)
+    for batch in range(3):
+        ids, events, args = random_fleet_events(rng, fleet.size, 1_000_000)
+        outcomes, change = fleet.apply(ids, events, args)
+        print(f"Batch {batch + 1}: {int((outcomes == R_OK).sum()):,} accepted, "
+              f"${change.sum() / 100:,.2f} change owed")
+    print(f"\nStates: {fleet.state_counts()}")
+    print(f"Balance held: ${fleet.total_balance() / 100:,.2f}")
+
+
+if __name__ == "__main__":
+    demonstrate_vending_fleet()
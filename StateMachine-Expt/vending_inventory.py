@@ -0,0 +1,203 @@
+"""
+Product Inventory and Restock Index
+===================================
+
+``FleetInventory`` keeps the stock of every product in every machine in one
+``(machines x products)`` uint16 NumPy array, plus two bucketed indexes
+that are updated on each dispense or restock rather than rebuilt:
+
+- machines by their lowest product level, for "which machines have any
+  product below N" (``below(n)``)
+- machines by total units left, for "the k emptiest machines"
+  (``emptiest(k)``)
+
+A bucket is the set of machines with one key value.  Keys are small
+integers (0..capacity, 0..products * capacity), so moving a machine is two
+set operations and a query only visits the buckets below its threshold.
+
+Stock reaches the state machines in two ways:
+
+- ``VendingMachine(stock=inventory.machine(i))``: selecting a sold-out
+  product is refused with a ``sold_out`` event and a dispense takes one unit.
+  Columns are the stable indices of the inventory's ``catalog`` (the
+  ``PRODUCTS`` order for the default one), so give the machine the same
+  catalog.  A product added to the catalog later gets a new column, empty
+  until restocked.
+- ``VendingFleet.apply(..., inventory=inventory)``: the same rules applied to
+  a whole batch.
+
+Requires NumPy.
+"""
+
+import numpy as np
+
+from state_pattern_example import DEFAULT_CATALOG, Product, VendingMachine
+from vending_fleet import VendingFleet, random_fleet_events
+
+
+class BucketIndex:
+    """Machine ids grouped by a small non-negative integer key"""
+
+    def __init__(self, keys, max_key):
+        self.key = list(keys)
+        self.buckets = [set() for _ in range(max_key + 1)]
+        for machine_id, key in enumerate(self.key):
+            self.buckets[key].add(machine_id)
+
+    def move(self, machine_id, key):
+        old = self.key[machine_id]
+        if old != key:
+            self.buckets[old].discard(machine_id)
+            self.buckets[key].add(machine_id)
+            self.key[machine_id] = key
+
+    def below(self, limit):
+        """Ids whose key is below ``limit``"""
+        found = []
+        for bucket in self.buckets[:max(limit, 0)]:
+            found.extend(bucket)
+        return found
+
+    def smallest(self, count):
+        """Up to ``count`` ``(key, id)`` pairs with the smallest keys"""
+        found = []
+        for key, bucket in enumerate(self.buckets):
+            for machine_id in bucket:
+                if len(found) == count:
+                    return found
+                found.append((key, machine_id))
+        return found
+
+
+class MachineStock:
+    """One machine's row of a FleetInventory, as used by VendingMachine"""
+
+    __slots__ = ("inventory", "machine_id")
+
+    def __init__(self, inventory, machine_id):
+        self.inventory = inventory
+        self.machine_id = machine_id
+
+    def remaining(self, product):
+        inventory = self.inventory
+        column = inventory.column(product)  # may grow levels
+        return int(inventory.levels[self.machine_id, column])
+
+    def take(self, product):
+        inventory = self.inventory
+        inventory.take(self.machine_id, inventory.column(product))
+
+
+class FleetInventory:
+    """Per-machine, per-product stock with an incrementally updated restock index"""
+
+    def __init__(self, size, capacity=20, fill=True, catalog=DEFAULT_CATALOG):
+        self.size = size
+        self.capacity = capacity
+        self.catalog = catalog
+        self.levels = np.full((size, catalog.index_count()), capacity if fill else 0, dtype=np.uint16)
+        self._build_indexes()
+
+    def _build_indexes(self):
+        capacity = self.capacity
+        self._by_min = BucketIndex(self.levels.min(axis=1, initial=capacity).tolist(), capacity)
+        self._by_total = BucketIndex(self.levels.sum(axis=1).tolist(), capacity * self.levels.shape[1])
+
+    def machine(self, machine_id):
+        """Stock view for ``VendingMachine(stock=...)``"""
+        return MachineStock(self, machine_id)
+
+    def column(self, product):
+        """Column of ``product``, adding empty columns for products added to
+        the catalog since; ValueError if it was never in the catalog"""
+        column = self.catalog.index(product)
+        if column >= self.levels.shape[1]:
+            grown = np.zeros((self.size, self.catalog.index_count()), dtype=np.uint16)
+            grown[:, :self.levels.shape[1]] = self.levels
+            self.levels = grown
+            self._build_indexes()
+        return column
+
+    def _reindex(self, machine_id):
+        row = self.levels[machine_id]
+        self._by_min.move(machine_id, int(row.min(initial=self.capacity)))
+        self._by_total.move(machine_id, int(row.sum()))
+
+    def take(self, machine_id, product_index):
+        """Remove one unit (after a dispense); ValueError if there is none"""
+        level = int(self.levels[machine_id, product_index]) - 1
+        if level < 0:
+            raise ValueError(f"machine {machine_id} has no units of product {product_index}")
+        self.levels[machine_id, product_index] = level
+        # A decrement can only lower the minimum, so no row scan is needed.
+        if level < self._by_min.key[machine_id]:
+            self._by_min.move(machine_id, level)
+        self._by_total.move(machine_id, self._by_total.key[machine_id] - 1)
+
+    def take_many(self, machine_ids, product_indices):
+        """Remove one unit per ``(machine, product)`` pair; ValueError, before
+        anything is taken, if a pair asks for more units than are left"""
+        machine_ids = np.asarray(machine_ids, dtype=np.int64)
+        product_indices = np.asarray(product_indices, dtype=np.int64)
+        cells, wanted = np.unique(machine_ids * self.levels.shape[1] + product_indices, return_counts=True)
+        short = self.levels.ravel()[cells] < wanted
+        if short.any():
+            machine_id, product_index = divmod(int(cells[short][0]), self.levels.shape[1])
+            raise ValueError(f"machine {machine_id} has too few units of product {product_index}")
+        np.subtract.at(self.levels, (machine_ids, product_indices), 1)
+        for machine_id in np.unique(machine_ids).tolist():
+            self._reindex(machine_id)
+
+    def restock(self, machine_id, product_index=None, count=None):
+        """Add ``count`` units (default: fill to capacity) of one or all products"""
+        columns = slice(None) if product_index is None else product_index
+        if count is None:
+            self.levels[machine_id, columns] = self.capacity
+        else:
+            level = np.minimum(self.levels[machine_id, columns].astype(np.int64) + count, self.capacity)
+            self.levels[machine_id, columns] = level
+        self._reindex(machine_id)
+
+    def below(self, level):
+        """Ids of machines with any product below ``level`` units"""
+        return self._by_min.below(level)
+
+    def emptiest(self, count):
+        """``(units left, machine id)`` for the ``count`` machines with the least stock"""
+        return self._by_total.smallest(count)
+
+    def sold_out(self, machine_ids, product_indices):
+        """Boolean array: is each ``(machine, product)`` pair out of stock"""
+        return self.levels[machine_ids, product_indices] == 0
+
+
+def demonstrate_inventory():
+    """Sell from a small fleet and ask where to restock"""
+    print("=== Product Inventory and Restock Index ===\n")
+
+    inventory = FleetInventory(1, capacity=1)
+    machine = VendingMachine(stock=inventory.machine(0))
+    for _ in range(2):
+        machine.insert_coin(1.00)
+        machine.select_product(Product.WATER)
+        machine.dispense_product()
+    machine.return_change()
+
+    rng = np.random.default_rng(3)
+    fleet = VendingFleet(10_000)
+    inventory = FleetInventory(fleet.size, capacity=10)
+    for _ in range(10):
+        ids, events, args = random_fleet_events(rng, fleet.size, 200_000)
+        fleet.apply(ids, events, args, inventory=inventory)
+
+    print(f"\nUnits left: {int(inventory.levels.sum()):,} of {inventory.levels.size * inventory.capacity:,}")
+    print(f"Machines with a product below 3 units: {len(inventory.below(3)):,}")
+    print(f"Machines with a sold-out product: {len(inventory.below(1)):,}")
+    print(f"Five emptiest (units, machine): {inventory.emptiest(5)}")
+    for _, machine_id in inventory.emptiest(5):
+        inventory.restock(machine_id)
+    print(f"After restocking them: {inventory.emptiest(5)}")
+
+
+if __name__ == "__main__":
+    demonstrate_inventory()
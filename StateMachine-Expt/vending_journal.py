@@ -0,0 +1,272 @@
+"""
+Vending Machine Event Journal
+=============================
+
+A durable, append-only binary journal for a ``VendingMachine`` so balance and
+selection survive a crash.
+
+Every record is 16 bytes (``RECORD``: kind, code, product, amount, balance):
+
+- event records    - kind R_EVENT, code = event (``vending_engine.EV_*``),
+                     product index for EV_SELECT, amount in cents for EV_INSERT
+- snapshot records - kind R_SNAPSHOT, code = state (``vending_engine.S_*``),
+                     selected product index (-1 for none), balance in cents
+
+Product indices are the machine catalog's stable indices
+(``ProductCatalog.index``), the ``PRODUCTS`` order for the default catalog;
+recover with the same catalog.
+
+A snapshot is written every ``snapshot_interval`` events.  Recovery maps the
+file, walks back from the end to the latest snapshot, and replays only the
+events after it through the compiled transition table, so recovery time is
+bounded by the snapshot interval rather than by the length of the history.
+
+Recovery replays through the compiled engine, which knows nothing of coin
+tubes, so ``record`` applies each event first and journals it only if it
+changed the machine's state, balance or selection.  A dispense refused with
+``exact_change_only`` or a select refused with ``sold_out`` therefore never
+reaches the journal and cannot be replayed as a success.  Coin tubes and
+stock levels themselves are not journaled; pass the machine's current
+``coins`` and ``stock`` to ``recover``.
+
+Writes are buffered and written in batches; ``sync_every`` sets how many
+records may be written between ``fsync`` calls (group commit, 0 = never fsync
+until ``close``).  A torn record at the end of the file is ignored; any
+other record with an unknown kind, event, state or product index makes
+recovery raise ValueError naming the file and offset.
+"""
+
+import mmap
+import os
+import struct
+
+from event_sinks import CONSOLE_SINK, NULL_SINK
+from state_pattern_example import (
+    COIN_INSERTED_STATE,
+    DEFAULT_CATALOG,
+    IDLE_STATE,
+    OUT_OF_ORDER_STATE,
+    PRODUCT_SELECTED_STATE,
+    Product,
+    VendingMachine,
+)
+from vending_engine import (
+    EV_DISPENSE,
+    EV_INSERT,
+    EV_SELECT,
+    N_EVENTS,
+    N_STATES,
+    STATE_NAMES,
+    CompiledVendingMachine,
+    apply_to_machine,
+)
+
+
+MAGIC = b"VMJOURNAL\x00\x02"
+RECORD = struct.Struct("<BBhiq")
+RECORD_SIZE = RECORD.size  # 16 bytes
+HEADER = MAGIC.ljust(RECORD_SIZE, b"\x00")
+
+R_EVENT = 1
+R_SNAPSHOT = 2
+
+NO_PRODUCT = -1
+
+# State objects in state-code order
+STATES = (IDLE_STATE, COIN_INSERTED_STATE, PRODUCT_SELECTED_STATE, OUT_OF_ORDER_STATE)
+
+
+class VendingJournal:
+    """Append-only writer of event and snapshot records"""
+
+    def __init__(self, path, snapshot_interval=100_000, sync_every=0, buffer_records=8192):
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(HEADER)
+        self.snapshot_interval = snapshot_interval
+        self.sync_every = sync_every
+        self._buffer_bytes = buffer_records * RECORD_SIZE
+        self._buffer = bytearray()
+        self._since_snapshot = 0
+        self._unsynced = 0
+
+    def record(self, machine, event, arg=None):
+        """Apply an event to ``machine`` and journal it if it took effect"""
+        before = machine.snapshot()
+        apply_to_machine(machine, event, arg)
+        after = machine.snapshot()
+        if after == before:
+            return  # refused; replaying it could not reproduce the refusal
+
+        if event == EV_INSERT:
+            self.append_event(event, NO_PRODUCT, after[1] - before[1])
+        elif event == EV_SELECT:
+            self.append_event(event, machine.catalog.index(after[2]), 0)
+        else:
+            self.append_event(event, NO_PRODUCT, 0)
+
+        if self._since_snapshot >= self.snapshot_interval:
+            self.write_snapshot(machine)
+
+    def append_event(self, event, product_index, amount_cents):
+        """Append one raw event record"""
+        self._buffer += RECORD.pack(R_EVENT, event, product_index, amount_cents, 0)
+        self._since_snapshot += 1
+        if len(self._buffer) >= self._buffer_bytes:
+            self._write_buffer()
+
+    def write_snapshot(self, machine):
+        """Append a snapshot of ``machine`` as of all records written so far"""
+        product = machine.get_selected_product()
+        self._buffer += RECORD.pack(
+            R_SNAPSHOT,
+            STATE_NAMES.index(machine.get_current_state()),
+            machine.catalog.index(product) if product else NO_PRODUCT,
+            0,
+            machine.get_balance_cents(),
+        )
+        self._since_snapshot = 0
+
+    def _write_buffer(self):
+        if not self._buffer:
+            return
+        self._file.write(self._buffer)
+        self._unsynced += len(self._buffer) // RECORD_SIZE
+        self._buffer.clear()
+        if self.sync_every and self._unsynced >= self.sync_every:
+            self.sync()
+
+    def flush(self):
+        """Hand buffered records to the OS"""
+        self._write_buffer()
+        self._file.flush()
+
+    def sync(self):
+        """Flush and fsync everything written so far"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        if not self._file.closed:
+            self._write_buffer()
+            self.sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _find_latest_snapshot(view, end):
+    """Offset of the last snapshot record before ``end``, or None"""
+    offset = end - RECORD_SIZE
+    while offset >= RECORD_SIZE:
+        if view[offset] == R_SNAPSHOT:
+            return offset
+        offset -= RECORD_SIZE
+    return None
+
+
+def _corrupt(path, offset, what):
+    return ValueError(f"{path}: {what} at offset {offset}")
+
+
+def recover_engine(path, catalog=DEFAULT_CATALOG):
+    """Rebuild a CompiledVendingMachine from the journal at ``path``, decoding
+    product indices through ``catalog``.
+
+    Raises ValueError if the file is not a journal or holds a record this
+    module could not have written (or one naming a product ``catalog`` lacks).
+    """
+    engine = CompiledVendingMachine()
+    size = os.path.getsize(path)
+    if size <= RECORD_SIZE:
+        with open(path, "rb") as file:
+            head = file.read()
+        if head != HEADER[:len(head)]:  # empty, or a header torn at creation
+            raise ValueError(f"{path} is not a vending machine journal")
+        return engine
+
+    products = catalog.index_count()
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a vending machine journal")
+        view = memoryview(mm)
+        try:
+            end = size - size % RECORD_SIZE  # ignore a torn final record
+            start = RECORD_SIZE
+            snapshot = _find_latest_snapshot(view, end)
+            if snapshot is not None:
+                _, state, product, _, balance = RECORD.unpack_from(view, snapshot)
+                if state >= N_STATES:
+                    raise _corrupt(path, snapshot, f"unknown state {state}")
+                if not NO_PRODUCT <= product < products:
+                    raise _corrupt(path, snapshot, f"product index {product} not in the catalog")
+                engine.state = state
+                engine.balance = balance
+                engine.selected = catalog.product_at(product) if product != NO_PRODUCT else None
+                start = snapshot + RECORD_SIZE
+
+            fire = engine.fire
+            product_at = catalog.product_at
+            offset = start
+            for kind, event, product, amount, _ in RECORD.iter_unpack(view[start:end]):
+                if kind != R_EVENT:
+                    if kind != R_SNAPSHOT:
+                        raise _corrupt(path, offset, f"unknown record kind {kind}")
+                elif event == EV_INSERT:
+                    fire(event, amount / 100)
+                elif event == EV_SELECT:
+                    if not 0 <= product < products:
+                        raise _corrupt(path, offset, f"product index {product} not in the catalog")
+                    fire(event, product_at(product))
+                elif event < N_EVENTS:
+                    fire(event)
+                else:
+                    raise _corrupt(path, offset, f"unknown event {event}")
+                offset += RECORD_SIZE
+        finally:
+            view.release()
+    return engine
+
+
+def recover(path, sink=CONSOLE_SINK, coins=None, stock=None, catalog=DEFAULT_CATALOG):
+    """Rebuild a VendingMachine from the journal at ``path``, using ``coins``
+    (a ``vending_change.CoinInventory``) as its coin tubes, ``stock`` (a
+    ``vending_inventory.MachineStock``) as its product stock and ``catalog``
+    as the catalog it was journaled with"""
+    engine = recover_engine(path, catalog)
+    machine = VendingMachine(sink=sink, coins=coins, stock=stock, catalog=catalog)
+    machine.restore(STATES[engine.state], engine.balance, engine.selected)
+    return machine
+
+
+def demonstrate_journal():
+    """Journal a few purchases, 'crash', and recover the machine"""
+    import tempfile
+
+    print("=== Vending Machine Event Journal ===\n")
+    path = os.path.join(tempfile.mkdtemp(), "machine.journal")
+
+    machine = VendingMachine(sink=NULL_SINK)
+    with VendingJournal(path, snapshot_interval=3) as journal:
+        journal.record(machine, EV_INSERT, 1.00)
+        journal.record(machine, EV_INSERT, 0.50)
+        journal.record(machine, EV_SELECT, Product.SODA)
+        journal.record(machine, EV_DISPENSE)
+        journal.record(machine, EV_INSERT, 2.00)
+        journal.record(machine, EV_SELECT, Product.CHIPS)
+    print(f"Before crash: {machine.get_current_state()}, ${machine.get_balance():.2f}, "
+          f"{machine.get_selected_product().product_name}")
+
+    recovered = recover(path)
+    print(f"Recovered:    {recovered.get_current_state()}, ${recovered.get_balance():.2f}, "
+          f"{recovered.get_selected_product().product_name}")
+    recovered.dispense_product()
+
+
+if __name__ == "__main__":
+    demonstrate_journal()
@@ -0,0 +1,222 @@
+"""
+Vending Money Ledger
+====================
+
+Money is integer cents everywhere: ``Product.price_cents``,
+``VendingMachine.get_balance_cents()``, the compiled engine and the fleet
+arrays.  ``MoneyLedger`` records every credit and debit for any number of
+machines as four parallel NumPy columns (15 bytes per entry):
+
+- ``machine`` - machine id (int32)
+- ``kind``    - K_CREDIT, K_SALE, K_CHANGE or K_REFUND (int8)
+- ``product`` - catalog index (``ProductCatalog.index``; the ``PRODUCTS``
+                order for the default catalog) for K_SALE, -1 otherwise (int16)
+- ``cents``   - amount, always positive (int64)
+
+A coin insert is a credit; a dispense is a sale of the product's price plus
+the change handed back; a return or cancellation is a refund.  So for every
+machine, credits minus sales, change and refunds equals the balance it holds.
+
+``VendingFleet.apply(..., ledger=ledger)`` appends a whole batch in one
+vectorized step, and ``record(machine_id, machine, event, arg)`` journals one
+event for a class-based ``VendingMachine``.  ``settle()`` totals revenue and
+units per product across the fleet in one pass over the columns.
+
+Requires NumPy.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from event_sinks import NULL_SINK
+from state_pattern_example import VendingMachine
+from vending_engine import EV_DISPENSE, EV_INSERT, R_OK, apply_to_machine
+from vending_fleet import NO_PRODUCT, PRICE_CENTS, PRODUCTS, VendingFleet, random_fleet_events
+
+
+# Entry kinds
+K_CREDIT = 0   # coins inserted
+K_SALE = 1     # price of a dispensed product
+K_CHANGE = 2   # change handed back with a sale
+K_REFUND = 3   # balance returned without a sale
+
+KIND_NAMES = ("credit", "sale", "change", "refund")
+
+# Sign of each kind in a machine's running balance
+_SIGN = np.array([1, -1, -1, -1], dtype=np.int64)
+
+Settlement = namedtuple(
+    "Settlement",
+    "revenue_cents units_sold credits_cents change_cents refunds_cents",
+)
+Settlement.__doc__ = """Ledger totals; ``revenue_cents``/``units_sold`` are int64 arrays indexed by catalog index"""
+
+
+class MoneyLedger:
+    """Append-only credits and debits for many machines, in compact arrays"""
+
+    def __init__(self, capacity=1024):
+        capacity = max(capacity, 1)
+        self.machine = np.empty(capacity, dtype=np.int32)
+        self.kind = np.empty(capacity, dtype=np.int8)
+        self.product = np.empty(capacity, dtype=np.int16)
+        self.cents = np.empty(capacity, dtype=np.int64)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _reserve(self, extra):
+        """Grow the columns (by doubling) to fit ``extra`` more entries"""
+        needed = self._count + extra
+        capacity = len(self.machine)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("machine", "kind", "product", "cents"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._count] = column[:self._count]
+            setattr(self, name, grown)
+
+    def append(self, machine_id, kind, cents, product=NO_PRODUCT):
+        """Append one entry"""
+        if self._count == len(self.machine):
+            self._reserve(1)
+        i = self._count
+        self.machine[i] = machine_id
+        self.kind[i] = kind
+        self.product[i] = product
+        self.cents[i] = cents
+        self._count = i + 1
+
+    def extend(self, machine_ids, kinds, cents, products):
+        """Append equal-length arrays of entries"""
+        n = len(machine_ids)
+        self._reserve(n)
+        lo, hi = self._count, self._count + n
+        self.machine[lo:hi] = machine_ids
+        self.kind[lo:hi] = kinds
+        self.product[lo:hi] = products
+        self.cents[lo:hi] = cents
+        self._count = hi
+
+    def record(self, machine_id, machine, event, arg=None):
+        """Apply an event to a ``VendingMachine`` and journal the money it moved"""
+        balance = machine.get_balance_cents()
+        product = machine.get_selected_product()
+        apply_to_machine(machine, event, arg)
+        after = machine.get_balance_cents()
+        if after > balance:
+            self.append(machine_id, K_CREDIT, after - balance)
+        elif after < balance:
+            if event == EV_DISPENSE:
+                self.append(machine_id, K_SALE, product.price_cents, machine.catalog.index(product))
+                if balance > product.price_cents:
+                    self.append(machine_id, K_CHANGE, balance - product.price_cents)
+            else:
+                self.append(machine_id, K_REFUND, balance - after)
+
+    def record_batch(self, machine_ids, events, args, outcomes, change, sold):
+        """Journal one ``VendingFleet.apply`` batch.
+
+        ``sold`` holds the product index dispensed by each event (-1 for
+        none).  Entries are grouped by kind within the batch.
+        """
+        ok = outcomes == R_OK
+        credit = ok & (events == EV_INSERT)
+        sale = sold != NO_PRODUCT
+        paid_change = sale & (change > 0)
+        refund = ~sale & (change > 0)
+
+        sold_products = sold[sale]
+        parts = (
+            (credit, K_CREDIT, args[credit], NO_PRODUCT),
+            (sale, K_SALE, PRICE_CENTS[sold_products], sold_products),
+            (paid_change, K_CHANGE, change[paid_change], NO_PRODUCT),
+            (refund, K_REFUND, change[refund], NO_PRODUCT),
+        )
+        for mask, kind, cents, products in parts:
+            ids = machine_ids[mask]
+            self.extend(ids, kind, cents, products)
+
+    def entries(self):
+        """Views of the recorded ``(machine, kind, product, cents)`` columns"""
+        n = self._count
+        return self.machine[:n], self.kind[:n], self.product[:n], self.cents[:n]
+
+    def settle(self, reset=False):
+        """Total the ledger into a ``Settlement``; ``reset`` empties it afterwards"""
+        _, kind, product, cents = self.entries()
+        n_products = len(PRODUCTS)
+        # One pass: bucket each entry by kind, and sales additionally by
+        # product.  Keys 0..3 are the kinds, 4.. the products sold.
+        keys = np.where(kind == K_SALE, 4 + product, kind)
+        units = np.bincount(keys, minlength=4 + n_products)
+        totals = _sum_by(keys, cents, 4 + n_products)
+        settlement = Settlement(
+            revenue_cents=totals[4:],
+            units_sold=units[4:],
+            credits_cents=int(totals[K_CREDIT]),
+            change_cents=int(totals[K_CHANGE]),
+            refunds_cents=int(totals[K_REFUND]),
+        )
+        if reset:
+            self._count = 0
+        return settlement
+
+    def machine_net(self, size):
+        """Net cents per machine (credits minus debits) for machines ``0..size-1``"""
+        machine, kind, _, cents = self.entries()
+        return _sum_by(machine, cents * _SIGN[kind], size)
+
+    def machine_revenue(self, size):
+        """Sales in cents per machine for machines ``0..size-1``"""
+        machine, kind, _, cents = self.entries()
+        sale = kind == K_SALE
+        return _sum_by(machine[sale], cents[sale], size)
+
+
+def _sum_by(keys, cents, size):
+    """Exact int64 totals of ``cents`` grouped by ``keys`` in ``0..size-1``.
+
+    ``np.bincount(weights=...)`` would sum in float64, which loses cents
+    once a total passes 2**53.
+    """
+    totals = np.zeros(max(size, int(keys.max()) + 1 if len(keys) else 0), dtype=np.int64)
+    np.add.at(totals, keys, cents)
+    return totals
+
+
+def demonstrate_ledger():
+    """Run a fleet with a ledger attached and settle it"""
+    print("=== Vending Money Ledger ===\n")
+
+    machine = VendingMachine(sink=NULL_SINK)
+    ledger = MoneyLedger()
+    for event, arg in ((EV_INSERT, 0.10), (EV_INSERT, 0.20)):
+        ledger.record(0, machine, event, arg)
+    print(f"0.10 + 0.20 held as {machine.get_balance_cents()} cents "
+          f"(float sum: {0.10 + 0.20!r})\n")
+
+    rng = np.random.default_rng(7)
+    fleet = VendingFleet(100_000)
+    ledger = MoneyLedger()
+    for _ in range(5):
+        fleet.apply(*random_fleet_events(rng, fleet.size, 200_000), ledger=ledger)
+
+    settlement = ledger.settle()
+    print(f"Ledger entries: {len(ledger):,}")
+    for product, cents, units in zip(PRODUCTS, settlement.revenue_cents.tolist(),
+                                     settlement.units_sold.tolist()):
+        print(f"  {product.product_name:<6} {units:>8,} sold  ${cents / 100:>12,.2f}")
+    print(f"Credits ${settlement.credits_cents / 100:,.2f}, change ${settlement.change_cents / 100:,.2f}, "
+          f"refunds ${settlement.refunds_cents / 100:,.2f}")
+    balanced = np.array_equal(ledger.machine_net(fleet.size), fleet.balance)
+    print(f"Ledger matches fleet balances: {balanced}")
+
+
+if __name__ == "__main__":
+    demonstrate_ledger()
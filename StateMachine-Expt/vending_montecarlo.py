@@ -0,0 +1,169 @@
+"""
+Monte Carlo Vending Scenarios
+=============================
+
+Estimates revenue, change-owed distribution and failure exposure by running
+many seeded random customer streams against ``VendingMachine``.
+
+Scenarios are split into fixed-size shards and the shards are spread over a
+``ProcessPoolExecutor``.  Each shard runs its scenarios in-process with
+``NULL_SINK`` (no printing) and returns a ``ScenarioAggregate``.  Every
+aggregate field is an integer count or an integer number of cents, and
+``merge`` only adds them, so merging is associative and commutative: the
+result is bit-identical whatever the worker count or completion order.
+
+Scenario ``i`` is always seeded from ``(seed, i)`` and shard boundaries depend
+only on ``shard_size``, never on the number of workers.
+"""
+
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from event_sinks import NULL_SINK
+from state_pattern_example import PRODUCT_SELECTED_STATE, VendingMachine
+from vending_engine import EV_DISPENSE, EV_FAULT, apply_to_machine, random_events
+
+
+def scenario_rng(seed, scenario):
+    """Independent, reproducible RNG for one scenario"""
+    return random.Random(seed * 1_000_003 + scenario)
+
+
+class ScenarioAggregate:
+    """Mergeable totals over a set of scenarios (all integers)"""
+
+    def __init__(self):
+        self.scenarios = 0
+        self.events = 0
+        self.units_sold = Counter()        # product name -> units
+        self.revenue_cents = Counter()     # product name -> cents
+        self.change_cents = Counter()      # change given on a sale -> occurrences
+        self.final_balance_cents = Counter()  # balance left at scenario end -> scenarios
+        self.dwell_events = Counter()      # state name -> events handled in that state
+        self.faults = 0
+        self.fault_exposure_cents = 0      # balance held when the machine faulted
+
+    def merge(self, other):
+        """Add ``other`` into this aggregate and return self"""
+        self.scenarios += other.scenarios
+        self.events += other.events
+        self.units_sold.update(other.units_sold)
+        self.revenue_cents.update(other.revenue_cents)
+        self.change_cents.update(other.change_cents)
+        self.final_balance_cents.update(other.final_balance_cents)
+        self.dwell_events.update(other.dwell_events)
+        self.faults += other.faults
+        self.fault_exposure_cents += other.fault_exposure_cents
+        return self
+
+    def total_revenue_cents(self):
+        return sum(self.revenue_cents.values())
+
+    @staticmethod
+    def _quantile(histogram, fraction):
+        total = sum(histogram.values())
+        if not total:
+            return 0
+        target = fraction * total
+        seen = 0
+        for value in sorted(histogram):
+            seen += histogram[value]
+            if seen >= target:
+                return value
+        return max(histogram)
+
+    @staticmethod
+    def _mean(histogram):
+        total = sum(histogram.values())
+        return sum(value * n for value, n in histogram.items()) / total if total else 0.0
+
+    def summary(self):
+        """Plain dict of headline figures (money in dollars)"""
+        return {
+            "scenarios": self.scenarios,
+            "events": self.events,
+            "revenue": self.total_revenue_cents() / 100,
+            "revenue_by_product": {name: cents / 100 for name, cents in sorted(self.revenue_cents.items())},
+            "units_sold": dict(sorted(self.units_sold.items())),
+            "change_mean": self._mean(self.change_cents) / 100,
+            "change_p50": self._quantile(self.change_cents, 0.50) / 100,
+            "change_p95": self._quantile(self.change_cents, 0.95) / 100,
+            "final_balance_mean": self._mean(self.final_balance_cents) / 100,
+            "final_balance_p95": self._quantile(self.final_balance_cents, 0.95) / 100,
+            "dwell_events": dict(sorted(self.dwell_events.items())),
+            "faults": self.faults,
+            "fault_exposure": self.fault_exposure_cents / 100,
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, ScenarioAggregate) and vars(self) == vars(other)
+
+
+def run_scenario(seed, scenario, events_per_scenario, aggregate):
+    """Run one customer stream and add its figures to ``aggregate``"""
+    machine = VendingMachine(sink=NULL_SINK)
+    events = random_events(scenario_rng(seed, scenario), events_per_scenario)
+    dwell = aggregate.dwell_events
+    product_selected = PRODUCT_SELECTED_STATE.get_state_name()
+
+    for event, arg in events:
+        state = machine.get_current_state()
+        dwell[state] += 1
+        if event == EV_DISPENSE and state == product_selected:
+            product = machine.get_selected_product()
+            balance = machine.get_balance_cents()
+            apply_to_machine(machine, event, arg)
+            if machine.get_selected_product() is None:
+                price = product.price_cents
+                aggregate.units_sold[product.product_name] += 1
+                aggregate.revenue_cents[product.product_name] += price
+                aggregate.change_cents[balance - price] += 1
+            continue
+        if event == EV_FAULT:
+            aggregate.faults += 1
+            aggregate.fault_exposure_cents += machine.get_balance_cents()
+        apply_to_machine(machine, event, arg)
+
+    aggregate.scenarios += 1
+    aggregate.events += len(events)
+    aggregate.final_balance_cents[machine.get_balance_cents()] += 1
+
+
+def run_shard(seed, first, last, events_per_scenario):
+    """Aggregate scenarios ``first`` .. ``last - 1`` (runs in a worker process)"""
+    aggregate = ScenarioAggregate()
+    for scenario in range(first, last):
+        run_scenario(seed, scenario, events_per_scenario, aggregate)
+    return aggregate
+
+
+def run_monte_carlo(scenarios, events_per_scenario=100, seed=0, workers=None, shard_size=250):
+    """Run ``scenarios`` seeded scenarios on ``workers`` processes (default: all cores)"""
+    shards = [(start, min(start + shard_size, scenarios)) for start in range(0, scenarios, shard_size)]
+    total = ScenarioAggregate()
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for first, last in shards:
+            total.merge(run_shard(seed, first, last, events_per_scenario))
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_shard, seed, first, last, events_per_scenario) for first, last in shards]
+        for future in futures:
+            total.merge(future.result())
+    return total
+
+
+def demonstrate_monte_carlo():
+    """Estimate revenue and exposure over a few thousand customer streams"""
+    print("=== Monte Carlo Vending Scenarios ===\n")
+    result = run_monte_carlo(2000, events_per_scenario=100, seed=42)
+    for key, value in result.summary().items():
+        print(f"{key:>20}: {value}")
+
+
+if __name__ == "__main__":
+    demonstrate_monte_carlo()
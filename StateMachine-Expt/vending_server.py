@@ -0,0 +1,422 @@
+"""
+Vending Fleet Network Server
+============================
+
+Serves a fleet of ``VendingMachine`` objects over TCP so other processes can
+drive it.  The protocol is one ASCII line per request:
+
+    <machine id> <command> [arg]\\n
+
+``command`` is ``insert <cents>``, ``select <product index | slot | SKU>``,
+``dispense``, ``return``, ``fault``, ``repair`` or ``status``.  Every request
+gets one reply line, in request order:
+
+    OK <state code> <balance cents> <selected product index or -1>\\n
+    ERR <reason>\\n
+
+Product indices are the server catalog's stable indices
+(``ProductCatalog.index``), the ``PRODUCTS`` order for the default catalog.
+
+Clients may pipeline: write many requests, then read the replies.
+
+The server is an ``asyncio.Protocol``.  ``data_received`` only parses lines
+and queues them.  The first request of a loop iteration schedules a flush
+with ``call_soon``, so every request that arrives in that iteration, from
+any connection, is applied in one batch.  Each connection then gets its
+replies in a single ``write``.
+
+With a journal path, each batch's events are packed into 11-byte
+``FLEET_RECORD``s (machine, event, product, cents), after a one-record
+``FLEET_HEADER``, and written by one background thread, so the event loop never blocks on the file.  A batch's
+replies are sent once its records are written (not fsynced); every batch,
+even one with nothing to journal, goes through that thread, so replies keep
+request order.
+``replay_journal`` rebuilds a fleet from the file, given the same catalog,
+and raises ValueError for a file without the header or a record naming an
+unknown event, product or a machine outside the fleet.
+
+``run_load`` is the load generator: many concurrent connections, each
+pipelining requests, reporting requests/sec and latency percentiles.
+"""
+
+import asyncio
+import os
+import random
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from event_sinks import NULL_SINK
+from state_pattern_example import DEFAULT_CATALOG, VendingMachine
+from vending_engine import (
+    EV_DISPENSE,
+    EV_FAULT,
+    EV_INSERT,
+    EV_REPAIR,
+    EV_RETURN,
+    EV_SELECT,
+    N_EVENTS,
+    PRODUCTS,
+    STATE_NAMES,
+    apply_to_machine,
+)
+
+
+FLEET_RECORD = struct.Struct("<IBhi")  # machine, event, product index, cents
+FLEET_MAGIC = b"VMFLEET\x00\x01"
+FLEET_HEADER = FLEET_MAGIC.ljust(FLEET_RECORD.size, b"\x00")
+NO_PRODUCT = -1
+EV_STATUS = -1  # read-only; never journaled
+
+COMMANDS = {
+    b"insert": EV_INSERT,
+    b"select": EV_SELECT,
+    b"dispense": EV_DISPENSE,
+    b"return": EV_RETURN,
+    b"fault": EV_FAULT,
+    b"repair": EV_REPAIR,
+    b"status": EV_STATUS,
+}
+
+_STATE_CODES = {name: code for code, name in enumerate(STATE_NAMES)}
+
+# Stop reading from a client whose unsent replies exceed this many bytes.
+HIGH_WATER = 256 * 1024
+
+# Disconnect a client whose unfinished line grows past this many bytes.
+MAX_LINE_BYTES = 1024
+
+
+def _parse(line, catalog):
+    """``(machine id, event, product index, cents)`` for one request line.
+
+    Raises ValueError with the reply reason for a malformed request.
+    """
+    parts = line.split()
+    if len(parts) < 2:
+        raise ValueError("expected '<machine> <command> [arg]'")
+    event = COMMANDS.get(parts[1])
+    if event is None:
+        raise ValueError(f"unknown command {parts[1].decode(errors='replace')}")
+    machine_id = int(parts[0])
+    product, cents = NO_PRODUCT, 0
+    if event == EV_INSERT or event == EV_SELECT:
+        if len(parts) != 3:
+            raise ValueError(f"{parts[1].decode()} needs an argument")
+        arg = parts[2]
+        if event == EV_INSERT:
+            cents = int(arg)
+            if not -(1 << 31) <= cents < 1 << 31:
+                raise ValueError("amount out of range")
+        elif arg.isdigit():
+            product = int(arg)
+            if product >= catalog.index_count():
+                raise ValueError(f"no product {product}")
+        else:
+            found = catalog.get(arg.decode(errors="replace"))
+            if found is None:
+                raise ValueError(f"no product {arg.decode(errors='replace')}")
+            product = catalog.index(found)
+    return machine_id, event, product, cents
+
+
+def _reply(machine, catalog):
+    state, balance, selected = machine.snapshot()
+    code = catalog.index(selected) if selected is not None else NO_PRODUCT
+    return b"OK %d %d %d\n" % (_STATE_CODES[state], balance, code)
+
+
+class _JournalWriter:
+    """Appends packed batches from a single background thread"""
+
+    def __init__(self, path, sync_every=0):
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(FLEET_HEADER)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vending-journal")
+        self.sync_every = sync_every
+        self._batches = 0
+
+    def submit(self, data):
+        return self._executor.submit(self._write, data)
+
+    def _write(self, data):
+        if not data:
+            return  # an empty batch only keeps its replies in order
+        self._file.write(data)
+        self._file.flush()
+        self._batches += 1
+        if self.sync_every and self._batches % self.sync_every == 0:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._file.close()
+
+
+class _Connection(asyncio.Protocol):
+    """One client: splits lines and queues them on the server"""
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.partial = b""
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.set_write_buffer_limits(high=HIGH_WATER)
+        self.server.connections += 1
+
+    def connection_lost(self, exc):
+        self.server.connections -= 1
+        self.transport = None
+
+    def data_received(self, data):
+        if self.partial:
+            data = self.partial + data
+        lines = data.split(b"\n")
+        self.partial = lines.pop()
+        if lines:
+            self.server.enqueue(self, lines)
+        if len(self.partial) > MAX_LINE_BYTES:
+            self.partial = b""
+            self.transport.close()
+
+    def pause_writing(self):
+        # Replies are piling up: stop reading requests until the client catches up
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+
+class VendingServer:
+    """A fleet of VendingMachines behind a pipelined line protocol"""
+
+    def __init__(self, size, journal_path=None, sync_every=0, catalog=DEFAULT_CATALOG):
+        self.machines = [VendingMachine(sink=NULL_SINK, catalog=catalog) for _ in range(size)]
+        self.catalog = catalog
+        self.connections = 0
+        self.requests = 0
+        self.batches = 0
+        self._pending = []   # (connection, [lines]) in arrival order
+        self._flush_scheduled = False
+        self._journal = _JournalWriter(journal_path, sync_every) if journal_path else None
+        self._server = None
+        self._loop = None
+
+    async def start(self, host="127.0.0.1", port=0, backlog=4096):
+        """Start listening; returns the bound port"""
+        self._loop = asyncio.get_running_loop()
+        self._server = await self._loop.create_server(
+            lambda: _Connection(self), host, port, backlog=backlog, reuse_address=True
+        )
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._journal is not None:
+            await self._loop.run_in_executor(None, self._journal.close)
+
+    def enqueue(self, connection, lines):
+        self._pending.append((connection, lines))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_soon(self._flush)
+
+    def _flush(self):
+        """Apply every request queued during this loop iteration"""
+        self._flush_scheduled = False
+        pending, self._pending = self._pending, []
+        machines = self.machines
+        size = len(machines)
+        catalog = self.catalog
+        records = bytearray() if self._journal is not None else None
+        replies = {}
+
+        for connection, lines in pending:
+            out = replies.get(connection)
+            if out is None:
+                out = replies[connection] = []
+            for line in lines:
+                self.requests += 1
+                try:
+                    machine_id, event, product, cents = _parse(line, catalog)
+                    if not 0 <= machine_id < size:
+                        raise ValueError(f"no machine {machine_id}")
+                except ValueError as exc:
+                    out.append(b"ERR %s\n" % str(exc).encode())
+                    continue
+                machine = machines[machine_id]
+                if event != EV_STATUS:
+                    if event == EV_INSERT:
+                        arg = cents / 100
+                    elif event == EV_SELECT:
+                        arg = catalog.product_at(product)
+                    else:
+                        arg = None
+                    apply_to_machine(machine, event, arg)
+                    if records is not None:
+                        records += FLEET_RECORD.pack(machine_id, event, product, cents)
+                out.append(_reply(machine, catalog))
+        self.batches += 1
+
+        if records is not None:
+            # Even an empty batch is queued behind the pending writes, so a
+            # connection never gets its replies ahead of an earlier batch's.
+            future = self._journal.submit(bytes(records))
+            future.add_done_callback(
+                lambda _: self._loop.call_soon_threadsafe(self._send, replies)
+            )
+        else:
+            self._send(replies)
+
+    @staticmethod
+    def _send(replies):
+        for connection, out in replies.items():
+            if connection.transport is not None:
+                connection.transport.write(b"".join(out))
+
+
+def replay_journal(path, size, catalog=DEFAULT_CATALOG):
+    """Rebuild a fleet of ``size`` VendingMachines from a server journal
+    written with ``catalog``; ValueError names the offset of a bad record"""
+    machines = [VendingMachine(sink=NULL_SINK, catalog=catalog) for _ in range(size)]
+    with open(path, "rb") as file:
+        data = file.read()
+    record_size = FLEET_RECORD.size
+    if len(data) < record_size:
+        if data != FLEET_HEADER[:len(data)]:  # empty, or a header torn at creation
+            raise ValueError(f"{path} is not a vending server journal")
+        return machines
+    if not data.startswith(FLEET_MAGIC):
+        raise ValueError(f"{path} is not a vending server journal")
+
+    products = catalog.index_count()
+    usable = len(data) - len(data) % record_size  # ignore a torn final record
+    offset = record_size
+    for machine_id, event, product, cents in FLEET_RECORD.iter_unpack(memoryview(data)[offset:usable]):
+        if machine_id >= size:
+            raise ValueError(f"{path}: machine {machine_id} at offset {offset} is outside a fleet of {size}")
+        if event == EV_INSERT:
+            arg = cents / 100
+        elif event == EV_SELECT:
+            if not 0 <= product < products:
+                raise ValueError(f"{path}: product index {product} not in the catalog at offset {offset}")
+            arg = catalog.product_at(product)
+        elif event < N_EVENTS:
+            arg = None
+        else:
+            raise ValueError(f"{path}: unknown event {event} at offset {offset}")
+        apply_to_machine(machines[machine_id], event, arg)
+        offset += record_size
+    return machines
+
+
+def random_request(rng, size):
+    """One request line with the same event mix as ``vending_engine.random_events``"""
+    machine_id = rng.randrange(size)
+    roll = rng.random()
+    if roll < 0.01:
+        return b"%d fault\n" % machine_id
+    if roll < 0.02:
+        return b"%d repair\n" % machine_id
+    if roll < 0.45:
+        return b"%d insert %d\n" % (machine_id, rng.choice((25, 50, 100, 200, 0)))
+    if roll < 0.70:
+        return b"%d select %d\n" % (machine_id, rng.randrange(len(PRODUCTS)))
+    if roll < 0.90:
+        return b"%d dispense\n" % machine_id
+    return b"%d return\n" % machine_id
+
+
+async def _client(host, port, fleet_size, requests, pipeline, seed, latencies, errors, ready):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    await ready.wait()
+    try:
+        sent = 0
+        while sent < requests:
+            depth = min(pipeline, requests - sent)
+            writer.write(b"".join(random_request(rng, fleet_size) for _ in range(depth)))
+            # Each request of a burst is timed from when the burst was written
+            start = time.perf_counter()
+            for _ in range(depth):
+                line = await reader.readline()
+                latencies.append(time.perf_counter() - start)
+                if not line.startswith(b"OK"):
+                    errors.append(line)
+            sent += depth
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, connections, requests_per_connection, pipeline=8,
+                   fleet_size=10_000, seed=0, connect_batch=500):
+    """Drive a server from ``connections`` concurrent clients.
+
+    Returns a dict with ``requests``, ``seconds``, ``requests_per_sec``,
+    ``errors`` and latency percentiles ``p50``/``p99``/``p999`` (seconds).
+    """
+    latencies = []
+    errors = []
+    ready = asyncio.Event()
+    tasks = []
+    # Open connections in waves so the listen backlog is not overrun.
+    for first in range(0, connections, connect_batch):
+        wave = [
+            asyncio.create_task(_client(host, port, fleet_size, requests_per_connection, pipeline,
+                                        seed * 1_000_003 + i, latencies, errors, ready))
+            for i in range(first, min(first + connect_batch, connections))
+        ]
+        tasks += wave
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.2)
+
+    start = time.perf_counter()
+    ready.set()
+    await asyncio.gather(*tasks)
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+
+    def percentile(fraction):
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] if latencies else 0.0
+
+    return {
+        "requests": len(latencies),
+        "seconds": seconds,
+        "requests_per_sec": len(latencies) / seconds if seconds else 0.0,
+        "errors": len(errors),
+        "p50": percentile(0.50),
+        "p99": percentile(0.99),
+        "p999": percentile(0.999),
+    }
+
+
+async def _demonstrate():
+    server = VendingServer(1_000)
+    port = await server.start()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    requests = [b"7 insert 100", b"7 insert 50", b"7 select A1", b"7 dispense", b"7 status", b"7 explode"]
+    writer.write(b"".join(line + b"\n" for line in requests))  # pipelined
+    for line in requests:
+        print(f"{line.decode():<14} -> {(await reader.readline()).decode().rstrip()}")
+    writer.close()
+
+    stats = await run_load("127.0.0.1", port, connections=200, requests_per_connection=200, fleet_size=1_000)
+    print(f"\n200 connections: {stats['requests_per_sec']:,.0f} requests/sec, "
+          f"p99 {stats['p99'] * 1e3:.2f} ms, {server.batches:,} batches")
+    await server.close()
+
+
+def demonstrate_server():
+    """Pipeline a purchase over a socket, then run a short load test"""
+    print("=== Vending Fleet Server ===\n")
+    asyncio.run(_demonstrate())
+
+
+if __name__ == "__main__":
+    demonstrate_server()
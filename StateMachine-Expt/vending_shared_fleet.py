@@ -0,0 +1,180 @@
+"""
+Shared-Memory Vending Fleet
+===========================
+
+The ``VendingFleet`` arrays (state code, balance in cents, selected product)
+placed in one ``multiprocessing.shared_memory`` block so several worker
+processes can update a single fleet without copying its state around.
+
+Machine ids are partitioned into contiguous ranges, one per worker.  For each
+batch the coordinator groups the events by partition (a stable sort, so every
+machine still sees its events in batch order) and each worker applies its
+group through a ``VendingFleet`` built over its own slice of the shared
+arrays: the fleet state is never pickled or copied, only the event arrays are
+sent.  Partitions are disjoint, so workers never write the same memory.
+
+``apply`` returns only when every partition has finished its part of the
+batch, so between calls the shared arrays always reflect whole batches.
+``snapshot()`` copies them at that point, giving the coordinator a consistent
+view of the fleet tagged with the number of batches applied.
+
+Requires NumPy.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from vending_fleet import NO_PRODUCT, VendingFleet, random_fleet_events, validate_batch
+from vending_engine import STATE_NAMES, S_IDLE
+
+
+def _layout(size):
+    """Byte offsets of (balance, selected, state) in the shared block and its total size"""
+    balance = 0
+    selected = balance + 8 * size
+    state = selected + 2 * size
+    return balance, selected, state, state + size
+
+
+def _fleet_arrays(buffer, size):
+    """(state, balance, selected) NumPy views over ``buffer``"""
+    balance_at, selected_at, state_at, _ = _layout(size)
+    return (
+        np.ndarray(size, dtype=np.int8, buffer=buffer, offset=state_at),
+        np.ndarray(size, dtype=np.int64, buffer=buffer, offset=balance_at),
+        np.ndarray(size, dtype=np.int16, buffer=buffer, offset=selected_at),
+    )
+
+
+# Per worker process: the attached block and its size, set by _attach_worker.
+_worker_shm = None
+_worker_size = 0
+
+
+def _attach_worker(name, size):
+    global _worker_shm, _worker_size
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    _worker_size = size
+
+
+def _apply_partition(lo, hi, machine_ids, events, args):
+    """Apply events for machines ``lo`` .. ``hi - 1`` in place (worker side)"""
+    state, balance, selected = _fleet_arrays(_worker_shm.buf, _worker_size)
+    fleet = VendingFleet.from_arrays(state[lo:hi], balance[lo:hi], selected[lo:hi])
+    outcomes, change = fleet.apply(machine_ids - lo, events, args)
+    del state, balance, selected, fleet  # release the buffer exports
+    return outcomes, change
+
+
+class SharedVendingFleet:
+    """A VendingFleet in shared memory, updated by a pool of worker processes"""
+
+    def __init__(self, size, workers=None):
+        self.size = size
+        self.workers = workers or os.cpu_count() or 1
+        self.batches = 0
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, _layout(size)[3]))
+        self.state, self.balance, self.selected = _fleet_arrays(self._shm.buf, size)
+        self.state[:] = S_IDLE
+        self.balance[:] = 0
+        self.selected[:] = NO_PRODUCT
+
+        # Partition p owns machine ids bounds[p] .. bounds[p + 1] - 1
+        self.bounds = np.linspace(0, size, self.workers + 1).astype(np.int64)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_attach_worker,
+            initargs=(self._shm.name, size),
+        )
+
+    def apply(self, machine_ids, events, args):
+        """Apply a batch across the workers; returns ``(outcomes, change)`` like VendingFleet.apply.
+
+        Raises ValueError, before any event is applied, if the batch fails
+        ``vending_fleet.validate_batch``.
+        """
+        machine_ids = np.asarray(machine_ids, dtype=np.int64)
+        events = np.asarray(events, dtype=np.int8)
+        args = np.asarray(args, dtype=np.int64)
+        validate_batch(self.size, machine_ids, events, args)
+
+        partition = np.searchsorted(self.bounds, machine_ids, side="right") - 1
+        order = np.argsort(partition, kind="stable")
+        cuts = np.searchsorted(partition[order], np.arange(self.workers + 1))
+
+        jobs = []
+        for p in range(self.workers):
+            idx = order[cuts[p]:cuts[p + 1]]
+            if len(idx):
+                lo, hi = int(self.bounds[p]), int(self.bounds[p + 1])
+                job = self._pool.submit(_apply_partition, lo, hi, machine_ids[idx], events[idx], args[idx])
+                jobs.append((idx, job))
+
+        outcomes = np.empty(len(machine_ids), dtype=np.int8)
+        change = np.zeros(len(machine_ids), dtype=np.int64)
+        for idx, job in jobs:
+            outcomes[idx], change[idx] = job.result()
+        self.batches += 1
+        return outcomes, change
+
+    def snapshot(self):
+        """Consistent copy of the fleet as of the last completed batch"""
+        return {
+            "batches": self.batches,
+            "state": self.state.copy(),
+            "balance": self.balance.copy(),
+            "selected": self.selected.copy(),
+        }
+
+    def state_counts(self):
+        """Number of machines in each state, keyed by state name"""
+        counts = np.bincount(self.state, minlength=len(STATE_NAMES))
+        return dict(zip(STATE_NAMES, counts.tolist()))
+
+    def total_balance(self):
+        """Money currently held across the fleet, in cents"""
+        return int(self.balance.sum())
+
+    def close(self):
+        """Stop the workers and free the shared block"""
+        if self._pool is None:
+            return
+        self._pool.shutdown()
+        self._pool = None
+        del self.state, self.balance, self.selected
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def demonstrate_shared_fleet():
+    """Apply random batches with several workers and check against one process"""
+    print("=== Shared-Memory Vending Fleet ===\n")
+
+    size = 200_000
+    reference = VendingFleet(size)
+    rng = np.random.default_rng(42)
+    with SharedVendingFleet(size, workers=4) as fleet:
+        for batch in range(3):
+            ids, events, args = random_fleet_events(rng, size, 500_000)
+            fleet.apply(ids, events, args)
+            reference.apply(ids, events, args)
+            snap = fleet.snapshot()
+            same = all(np.array_equal(snap[key], getattr(reference, key))
+                       for key in ("state", "balance", "selected"))
+            print(f"Batch {snap['batches']}: ${int(snap['balance'].sum()) / 100:,.2f} held, "
+                  f"matches single-process fleet: {same}")
+        print(f"\nStates: {fleet.state_counts()}")
+
+
+if __name__ == "__main__":
+    demonstrate_shared_fleet()